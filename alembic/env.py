@@ -5,6 +5,7 @@ from sqlmodel import SQLModel
 
 from alembic import context
 from app.config import database_config
+from app.database.job import ProcessingJob, ProcessingStage  # noqa
 from app.database.resource import StreamingResource  # noqa
 
 # this is the Alembic Config object, which provides
@@ -0,0 +1,311 @@
+import http.client
+import json
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import urljoin, urlsplit
+
+from app.config import config
+from app.logger import get_logger
+
+logger = get_logger(__name__)
+
+PART_SUFFIX = ".part"
+PROGRESS_SUFFIX = ".progress"
+READ_BLOCK_SIZE = 1 << 20
+MAX_REDIRECTS = 5
+
+
+class Downloader:
+    """
+    Fetches a remote file to a local path.
+    """
+
+    def download(self, url: str, path: str, size: Optional[int] = None) -> int:
+        """
+        Download a file.
+
+        Args:
+            url (str): The URL of the file.
+            path (str): The local path to write the file to.
+            size (Optional[int], optional): The expected size in bytes, None asks the server.
+
+        Raises:
+            RuntimeError: If the file could not be downloaded completely.
+
+        Returns:
+            int: The size of the downloaded file in bytes.
+        """
+        raise NotImplementedError
+
+
+class ConnectionPool:
+    """
+    Keeps idle HTTP connections open for reuse, one pool per scheme, host and port.
+
+    Attributes:
+        timeout (float): The socket timeout of new connections in seconds.
+    """
+
+    def __init__(self, timeout: float = 30.0):
+        self.timeout = timeout
+        self._idle: Dict[Tuple[str, str], queue.LifoQueue] = {}
+        self._lock = threading.Lock()
+
+    def request(
+        self, method: str, url: str, headers: Optional[dict] = None
+    ) -> Tuple[http.client.HTTPConnection, http.client.HTTPResponse]:
+        """
+        Send a request, following redirects, over a pooled connection.
+
+        The caller reads the response and hands the connection back with
+        ``release``, or closes it on failure.
+        """
+        for _ in range(MAX_REDIRECTS + 1):
+            connection = self._acquire(url)
+            parts = urlsplit(url)
+            target = parts.path or "/"
+            if parts.query:
+                target += f"?{parts.query}"
+
+            try:
+                connection.request(method, target, headers=headers or {})
+                response = connection.getresponse()
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                raise
+
+            if response.status not in (301, 302, 303, 307, 308):
+                return connection, response
+
+            response.read()
+            self.release(url, connection)
+            url = urljoin(url, response.getheader("Location"))
+
+        raise RuntimeError(f"Too many redirects downloading {url}")
+
+    def release(self, url: str, connection: http.client.HTTPConnection) -> None:
+        self._queue(url).put(connection)
+
+    def close(self) -> None:
+        with self._lock:
+            pools, self._idle = list(self._idle.values()), {}
+        for pool in pools:
+            while not pool.empty():
+                pool.get_nowait().close()
+
+    def _queue(self, url: str) -> queue.LifoQueue:
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.netloc)
+        with self._lock:
+            if key not in self._idle:
+                self._idle[key] = queue.LifoQueue()
+            return self._idle[key]
+
+    def _acquire(self, url: str) -> http.client.HTTPConnection:
+        try:
+            return self._queue(url).get_nowait()
+        except queue.Empty:
+            parts = urlsplit(url)
+            if parts.scheme == "https":
+                return http.client.HTTPSConnection(parts.netloc, timeout=self.timeout)
+            return http.client.HTTPConnection(parts.netloc, timeout=self.timeout)
+
+
+class RangeDownloader(Downloader):
+    """
+    Downloads a file in chunks fetched concurrently with HTTP range requests.
+
+    The file is preallocated under a ``.part`` name and every chunk is written
+    at its offset with positional writes, so the workers never share a file
+    position. Completed chunks are appended to a ``.progress`` file next to it;
+    downloading to the same path again, e.g. when a failed job is retried,
+    fetches only the missing chunks. A chunk is recorded only once all of its
+    bytes are written, and the file is renamed into place only after every
+    chunk was. Servers that do not support ranges are read sequentially.
+
+    Attributes:
+        workers (int): The number of chunks fetched at the same time.
+        chunk_size (int): The size of a range request in bytes.
+        retries (int): The number of attempts per chunk.
+        pool (ConnectionPool): The kept-alive connections shared by the workers.
+    """
+
+    def __init__(
+        self,
+        workers: int = 4,
+        chunk_size: int = 8 << 20,
+        timeout: float = 30.0,
+        retries: int = 3,
+    ):
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.retries = retries
+        self.pool = ConnectionPool(timeout=timeout)
+
+    def download(self, url: str, path: str, size: Optional[int] = None) -> int:
+        ranges_supported, remote_size = self._probe(url)
+        size = size or remote_size
+
+        if not ranges_supported or not size:
+            return self._download_sequentially(url, path, size)
+
+        if remote_size is not None and remote_size != size:
+            raise RuntimeError(
+                f"Expected {size} bytes but the server has {remote_size} for {url}"
+            )
+
+        chunks = self.chunks(size)
+        part_path = path + PART_SUFFIX
+        progress_path = path + PROGRESS_SUFFIX
+        done = self._read_progress(part_path, progress_path, size)
+        missing = [chunk for index, chunk in enumerate(chunks) if index not in done]
+
+        if done:
+            logger.info(
+                f"Resuming {os.path.basename(path)}, {len(missing)} of {len(chunks)} chunks left"
+            )
+
+        fd = os.open(part_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            os.ftruncate(fd, size)
+            with open(progress_path, "a", encoding="utf-8") as progress:
+                if not done:
+                    progress.write(json.dumps({"size": size}) + "\n")
+                    progress.flush()
+
+                lock = threading.Lock()
+
+                def fetch(chunk: Tuple[int, int, int]) -> None:
+                    index, start, end = chunk
+                    # Raises unless every byte of the range was written.
+                    self._fetch_range(url, fd, start, end)
+                    with lock:
+                        progress.write(f"{index}\n")
+                        progress.flush()
+
+                with ThreadPoolExecutor(
+                    max_workers=max(1, min(self.workers, len(missing))),
+                    thread_name_prefix="download",
+                ) as executor:
+                    list(executor.map(fetch, missing))
+        finally:
+            os.close(fd)
+
+        os.replace(part_path, path)
+        os.remove(progress_path)
+        return size
+
+    def chunks(self, size: int) -> List[Tuple[int, int, int]]:
+        """The index, first and last byte of every range request covering ``size`` bytes."""
+        return [
+            (index, start, min(start + self.chunk_size, size) - 1)
+            for index, start in enumerate(range(0, size, self.chunk_size))
+        ]
+
+    def close(self) -> None:
+        self.pool.close()
+
+    def _probe(self, url: str) -> Tuple[bool, Optional[int]]:
+        connection, response = self.pool.request("HEAD", url)
+        response.read()
+        self.pool.release(url, connection)
+
+        if response.status == 405:
+            return False, None
+        if response.status >= 400:
+            raise RuntimeError(f"Cannot download {url}: HTTP {response.status}")
+
+        length = response.getheader("Content-Length")
+        ranges = response.getheader("Accept-Ranges", "none").lower() == "bytes"
+        return ranges, int(length) if length else None
+
+    def _fetch_range(self, url: str, fd: int, start: int, end: int) -> None:
+        for attempt in range(1, self.retries + 1):
+            try:
+                self._write_range(url, fd, start, end)
+                return
+            except (OSError, http.client.HTTPException, RuntimeError) as e:
+                if attempt == self.retries:
+                    raise RuntimeError(
+                        f"Failed to download bytes {start}-{end} of {url}: {e}"
+                    ) from e
+                logger.warning(
+                    f"Retrying bytes {start}-{end} of {url} after attempt {attempt}: {e}"
+                )
+                time.sleep(0.5 * 2 ** (attempt - 1))
+
+    def _write_range(self, url: str, fd: int, start: int, end: int) -> None:
+        connection, response = self.pool.request(
+            "GET", url, headers={"Range": f"bytes={start}-{end}"}
+        )
+        try:
+            if response.status != 206:
+                raise RuntimeError(
+                    f"Expected a partial response, got HTTP {response.status}"
+                )
+
+            offset = start
+            while offset <= end:
+                block = response.read(min(READ_BLOCK_SIZE, end + 1 - offset))
+                if not block:
+                    break
+                offset += os.pwrite(fd, block, offset)
+        except BaseException:
+            connection.close()
+            raise
+
+        self.pool.release(url, connection)
+        if offset != end + 1:
+            raise RuntimeError(f"Received {offset - start} of {end + 1 - start} bytes")
+
+    def _download_sequentially(self, url: str, path: str, size: Optional[int]) -> int:
+        connection, response = self.pool.request("GET", url)
+        part_path = path + PART_SUFFIX
+        written = 0
+        try:
+            if response.status != 200:
+                raise RuntimeError(f"Cannot download {url}: HTTP {response.status}")
+
+            with open(part_path, "wb") as f:
+                for block in iter(lambda: response.read(READ_BLOCK_SIZE), b""):
+                    written += f.write(block)
+        finally:
+            connection.close()
+
+        if size is not None and written != size:
+            raise RuntimeError(
+                f"Downloaded {written} bytes instead of {size} from {url}"
+            )
+
+        os.replace(part_path, path)
+        return written
+
+    @staticmethod
+    def _read_progress(part_path: str, progress_path: str, size: int) -> Set[int]:
+        try:
+            with open(progress_path, "r", encoding="utf-8") as f:
+                # The last element is empty, or a line torn by a dying worker.
+                lines = f.read().split("\n")[:-1]
+        except FileNotFoundError:
+            return set()
+
+        stale = (
+            not lines
+            or not os.path.exists(part_path)
+            or json.loads(lines[0]).get("size") != size
+        )
+        if stale:
+            os.remove(progress_path)
+            return set()
+
+        return {int(line) for line in lines[1:] if line.isdigit()}
+
+
+range_downloader = RangeDownloader(
+    workers=config.download_workers,
+    chunk_size=config.download_chunk_mb << 20,
+)
@@ -0,0 +1,147 @@
+import os
+import shutil
+import threading
+from typing import Optional
+
+from app.config import config
+from app.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def link_or_copy(source: str, destination: str) -> str:
+    """
+    Hard link a file, or copy it when the destination is on another file system.
+
+    Returns:
+        str: The destination path.
+    """
+    if os.path.exists(destination):
+        os.remove(destination)
+
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copyfile(source, destination)
+    return destination
+
+
+class MediaStore:
+    """
+    An on-disk store of downloaded media keyed by video id.
+
+    Every entry is a directory holding a single file. Files enter and leave the
+    store as hard links, so a job keeps its copy even when the entry is evicted
+    while the job is still running. The modification time of an entry is
+    refreshed on every hit, so evicting the oldest entries first keeps the store
+    in least-recently-used order within ``max_size_mb``. Lookups and evictions
+    take the same lock, so an entry is never refreshed while it is being
+    deleted; a hit that loses the race to eviction anyway, e.g. against another
+    process sharing the directory, is reported as a miss.
+
+    Attributes:
+        directory (str): The directory holding the entries.
+        max_size_mb (int): The size limit of the store in megabytes, 0 disables the limit.
+    """
+
+    def __init__(self, directory: str, max_size_mb: int = 0):
+        self.directory = directory
+        self.max_size_mb = max_size_mb
+        self._lock = threading.Lock()
+
+    def lookup(self, key: str) -> Optional[str]:
+        """
+        Find the stored file of an entry.
+
+        Args:
+            key (str): The key of the entry, e.g. a video id.
+
+        Returns:
+            Optional[str]: The path of the stored file, or None on a miss.
+        """
+        entry = self._entry(key)
+        with self._lock:
+            try:
+                names = [name for name in os.listdir(entry) if not name.startswith(".")]
+                if len(names) != 1:
+                    return None
+                os.utime(entry)
+            except FileNotFoundError:
+                return None
+
+        return os.path.join(entry, names[0])
+
+    def store(self, key: str, path: str) -> str:
+        """
+        Add a file to the store and evict old entries beyond the size limit.
+
+        Args:
+            key (str): The key of the entry, e.g. a video id.
+            path (str): The file to store, it is left in place.
+
+        Returns:
+            str: The path of the stored file.
+        """
+        entry = self._entry(key)
+        temporary_entry = f"{entry}.{threading.get_ident()}.tmp"
+        shutil.rmtree(temporary_entry, ignore_errors=True)
+        os.makedirs(temporary_entry)
+        link_or_copy(path, os.path.join(temporary_entry, os.path.basename(path)))
+
+        with self._lock:
+            shutil.rmtree(entry, ignore_errors=True)
+            os.replace(temporary_entry, entry)
+
+        self._evict(keep=entry)
+        return os.path.join(entry, os.path.basename(path))
+
+    def checkout(self, key: str, directory: str) -> Optional[str]:
+        """
+        Link the stored file of an entry into a directory, e.g. a job workspace.
+
+        Returns:
+            Optional[str]: The path of the linked file, or None on a miss.
+        """
+        stored = self.lookup(key)
+        if stored is None:
+            return None
+
+        try:
+            return link_or_copy(
+                stored, os.path.join(directory, os.path.basename(stored))
+            )
+        except FileNotFoundError:
+            return None
+
+    def _entry(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    def _evict(self, keep: str) -> None:
+        if not self.max_size_mb:
+            return
+
+        with self._lock:
+            entries = []
+            for entry in os.scandir(self.directory):
+                if not entry.is_dir() or entry.name.endswith(".tmp"):
+                    continue
+                size = sum(f.stat().st_size for f in os.scandir(entry.path))
+                entries.append((entry.stat().st_mtime, size, entry.path))
+
+            total = sum(size for _, size, _ in entries)
+            limit = self.max_size_mb * 1024 * 1024
+
+            for _, size, path in sorted(entries):
+                if total <= limit:
+                    break
+                if path == keep:
+                    continue
+                shutil.rmtree(path, ignore_errors=True)
+                total -= size
+                logger.info(f"Evicted media store entry {path}")
+
+
+media_store = MediaStore(
+    config.media_store_directory,
+    max_size_mb=config.media_store_max_mb,
+)
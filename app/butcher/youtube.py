@@ -1,18 +1,115 @@
+import os
+import re
+from dataclasses import dataclass
+from typing import Any, Optional
+
 from pytube import YouTube
 from unidecode import unidecode
 
+from app.butcher.downloader import Downloader
 from app.logger import get_logger
 from app.utils import clean_file_name
 
 logger = get_logger(__name__)
 
+AUDIO_EXTENSIONS = {"mp4": "m4a"}
+
+VIDEO_ID_PATTERN = re.compile(
+    r"(?:[?&]v=|/(?:shorts|embed|live|v)/|youtu\.be/)([A-Za-z0-9_-]{11})(?![A-Za-z0-9_-])"
+)
+
+
+def extract_video_id(url: str) -> Optional[str]:
+    """
+    Extract the 11 character id of a YouTube video from any of its URLs.
+
+    Watch, short, embed, live and youtu.be links are recognized regardless of the
+    host variant, scheme and extra query parameters.
+
+    Args:
+        url (str): The URL of the video.
+
+    Returns:
+        Optional[str]: The id of the video, or None if the URL does not name one.
+    """
+    match = VIDEO_ID_PATTERN.search(url.strip())
+    return match.group(1) if match else None
+
+
+def normalize_url(url: str) -> str:
+    """
+    Return the canonical watch URL of a YouTube video, or the stripped URL if it names none.
+    """
+    video_id = extract_video_id(url)
+    if video_id is None:
+        return url.strip()
+    return f"https://www.youtube.com/watch?v={video_id}"
+
+
+@dataclass
+class DownloadedSource:
+    """
+    A handle to a downloaded video.
+
+    Attributes:
+        source (str): The URL the video was downloaded from.
+        title (str): The title of the video.
+        path (str): The path to the downloaded file.
+    """
+
+    source: str
+    title: str
+    path: str
+
 
 class YoutubeButcher:
+    @staticmethod
+    def select_audio_stream(streams: Any, min_abr_kbps: int = 48) -> Optional[Any]:
+        """
+        Pick the smallest audio-only stream that is still good enough for transcription.
+
+        Args:
+            streams (Any): The streams of a video, e.g. ``YouTube.streams``.
+            min_abr_kbps (int, optional): The lowest acceptable bitrate. Defaults to 48.
+
+        Returns:
+            Optional[Any]: The stream with the lowest bitrate of at least ``min_abr_kbps``,
+                the best one if none reaches it, or None if the video has no audio-only stream.
+        """
+        candidates = sorted(
+            (int(stream.abr.rstrip("kbps")), stream)
+            for stream in streams.filter(only_audio=True)
+            if stream.abr
+        )
+        if not candidates:
+            return None
+
+        adequate = [stream for abr, stream in candidates if abr >= min_abr_kbps]
+        return adequate[0] if adequate else candidates[-1][1]
+
     @staticmethod
     def download_source(
         output_path: str,
         source: str,
-    ) -> None:
+        downloader: Optional[Downloader] = None,
+        audio_only: bool = False,
+        min_abr_kbps: int = 48,
+    ) -> Optional[DownloadedSource]:
+        """
+        Download the highest resolution progressive MP4 stream of a video.
+
+        Args:
+            output_path (str): The directory where the video will be saved.
+            source (str): The URL of the video.
+            downloader (Optional[Downloader], optional): Fetches the stream, e.g. a
+                ``RangeDownloader``. Defaults to the sequential pytube download.
+            audio_only (bool, optional): Download the smallest adequate audio-only stream
+                instead of the video, see ``select_audio_stream``. Defaults to False.
+            min_abr_kbps (int, optional): The lowest acceptable audio bitrate. Defaults to 48.
+
+        Returns:
+            Optional[DownloadedSource]: The downloaded file, or None if nothing was downloaded.
+        """
         try:
             provider = YouTube(
                 source,
@@ -20,22 +117,37 @@ class YoutubeButcher:
                 allow_oauth_cache=True,
             )
 
-            obj = (
-                provider.streams.filter(progressive=True, file_extension="mp4")
-                .order_by("resolution")
-                .desc()
-                .first()
-            )
+            if audio_only:
+                obj = YoutubeButcher.select_audio_stream(provider.streams, min_abr_kbps)
+            else:
+                obj = (
+                    provider.streams.filter(progressive=True, file_extension="mp4")
+                    .order_by("resolution")
+                    .desc()
+                    .first()
+                )
 
             if not obj:
-                logger.warn("Not downloadable object!")
-                return
+                logger.warning("Not downloadable object!")
+                return None
 
             title = clean_file_name(unidecode(obj.title))
-            filename = f"{title}.mp4"
-            obj.download(output_path=output_path, filename=filename)
+            extension = AUDIO_EXTENSIONS.get(obj.subtype, obj.subtype)
+            filename = f"{title}.{extension}" if audio_only else f"{title}.mp4"
+            if downloader is None:
+                obj.download(output_path=output_path, filename=filename)
+            else:
+                downloader.download(
+                    obj.url, os.path.join(output_path, filename), size=obj.filesize
+                )
 
             logger.info(f"The element {filename} from {source} has been downloaded!")
 
+            return DownloadedSource(
+                source=source,
+                title=obj.title,
+                path=os.path.join(output_path, filename),
+            )
         except Exception as e:
             logger.exception(f"There is an error occurred: {e}")
+            return None
@@ -1,4 +1,27 @@
 import os
+import socket
+from typing import Dict, List, Optional
+
+# Azure neural voices of the languages most jobs are delivered in.
+DEFAULT_LOCALE_VOICES = {
+    "en": "en-US-DavisNeural",
+    "pl": "pl-PL-MarekNeural",
+    "de": "de-DE-ConradNeural",
+    "fr": "fr-FR-HenriNeural",
+    "es": "es-ES-AlvaroNeural",
+    "it": "it-IT-DiegoNeural",
+    "uk": "uk-UA-OstapNeural",
+}
+
+TRUE_VALUES = ("1", "true", "yes")
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    """Read a flag from the environment, accepting 1, true or yes in any case."""
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in TRUE_VALUES
 
 
 class Config:
@@ -38,11 +61,413 @@ class Config:
         default = os.path.join(self.project_root, "out/downloads")
         return os.environ.get("DOWNLOADS_DIR", default)
 
+    @property
+    def media_store_directory(self) -> str:
+        """
+        Downloads kept by video id, so resubmitted videos are not downloaded again
+        """
+        default = os.path.join(self.project_root, "out/media")
+        return os.environ.get("MEDIA_STORE_DIR", default)
+
+    @property
+    def media_store_max_mb(self) -> int:
+        """
+        Size limit of the media store, 0 disables the limit
+        """
+        return int(os.environ.get("MEDIA_STORE_MAX_MB", "10240"))
+
+    @property
+    def download_workers(self) -> int:
+        """
+        Number of range requests fetching a video at the same time, 1 keeps the sequential pytube download
+        """
+        return int(os.environ.get("DOWNLOAD_WORKERS", "4"))
+
+    @property
+    def download_chunk_mb(self) -> int:
+        return int(os.environ.get("DOWNLOAD_CHUNK_MB", "8"))
+
+    @property
+    def audio_only(self) -> bool:
+        """
+        Download only the audio of jobs not asking otherwise and skip muxing, for transcript-only deliveries
+        """
+        return _env_bool("AUDIO_ONLY", False)
+
+    @property
+    def audio_min_abr_kbps(self) -> int:
+        """
+        Lowest bitrate of the audio stream downloaded in audio-only mode
+        """
+        return int(os.environ.get("AUDIO_MIN_ABR_KBPS", "48"))
+
+    @property
+    def scratch_directory(self) -> str:
+        """
+        Parent of the per-job working directories, point it to a tmpfs mount to keep them in memory
+        """
+        default = os.path.join(self.project_root, "out/jobs")
+        return os.environ.get("SCRATCH_DIR", default)
+
+    @property
+    def checkpoint_jobs(self) -> bool:
+        """
+        Keep the workspace of a failed job so that its retry resumes at the first incomplete stage
+        """
+        return _env_bool("CHECKPOINT_JOBS", True)
+
+    @property
+    def checkpoint_audio(self) -> bool:
+        """
+        Also checkpoint the decoded audio, so a retry skips decoding at the cost of writing the whole PCM to the workspace
+        """
+        return _env_bool("CHECKPOINT_AUDIO", False)
+
+    @property
+    def workspace_ttl_hours(self) -> float:
+        """
+        Age after which a workspace kept for a retry is removed, 0 keeps them forever
+        """
+        return float(os.environ.get("WORKSPACE_TTL_HOURS", "24"))
+
     @property
     def ssml_directory(self) -> str:
         default = os.path.join(self.project_root, "out/ssml")
         return os.environ.get("SSML_DIR", default)
 
+    @property
+    def ssml_default_voice(self) -> str:
+        """
+        Voice of SSML in languages without a voice of their own
+        """
+        return os.environ.get("SSML_DEFAULT_VOICE", "en-US-DavisNeural")
+
+    @property
+    def ssml_locale_voices(self) -> Dict[str, str]:
+        """
+        Voice per language on top of the built-in ones, e.g. "pl:pl-PL-ZofiaNeural,pt-BR:pt-BR-AntonioNeural"
+        """
+        value = os.environ.get("SSML_LOCALE_VOICES", "")
+        pairs = (item.split(":", 1) for item in value.split(",") if ":" in item)
+        return {
+            **DEFAULT_LOCALE_VOICES,
+            **{locale.strip(): voice.strip() for locale, voice in pairs},
+        }
+
+    def ssml_voice(self, locale: Optional[str]) -> str:
+        """
+        Voice of SSML in a language, looked up by the full locale and then by its language
+        """
+        voices = self.ssml_locale_voices
+        if locale:
+            for key in (locale, locale.split("-")[0]):
+                if key in voices:
+                    return voices[key]
+        return self.ssml_default_voice
+
+    def ssml_language(self, locale: Optional[str]) -> str:
+        """
+        BCP-47 tag of SSML in a language, the region taken from its voice when the locale has none
+        """
+        if not locale:
+            return self.ssml_voice(locale).rsplit("-", 1)[0]
+        if "-" in locale:
+            return locale
+
+        region_tag = "-".join(self.ssml_voice(locale).split("-")[:2])
+        if region_tag.split("-")[0].lower() == locale.lower():
+            return region_tag
+        return locale
+
+    @property
+    def keep_audio_files(self) -> bool:
+        """
+        Write extracted audio to the audio directory instead of decoding it in memory
+        """
+        return _env_bool("KEEP_AUDIO_FILES", False)
+
+    @property
+    def transcribe_chunk_workers(self) -> int:
+        """
+        Number of processes transcribing chunks of long audio in parallel
+        """
+        return int(os.environ.get("TRANSCRIBE_CHUNK_WORKERS", "1"))
+
+    @property
+    def transcribe_batch_workers(self) -> int:
+        """
+        Number of jobs transcribed concurrently through one shared model, 1 disables batching
+        """
+        return int(os.environ.get("TRANSCRIBE_BATCH_WORKERS", "1"))
+
+    @property
+    def transcribe_batch_max_minutes(self) -> float:
+        """
+        Longest clip transcribed through the shared batch model, longer ones stream on their own
+        """
+        return float(os.environ.get("TRANSCRIBE_BATCH_MAX_MINUTES", "10"))
+
+    @property
+    def language_detection(self) -> bool:
+        """
+        Detect the spoken language on a short probe instead of always transcribing in LOCALE
+        """
+        return _env_bool("LANGUAGE_DETECTION", False)
+
+    @property
+    def language_detection_model(self) -> str:
+        return os.environ.get("LANGUAGE_DETECTION_MODEL", "tiny")
+
+    @property
+    def language_detection_threshold(self) -> float:
+        """
+        Lowest confidence of a detected language, less confident guesses fall back to LOCALE
+        """
+        return float(os.environ.get("LANGUAGE_DETECTION_THRESHOLD", "0.6"))
+
+    @property
+    def language_probe_seconds(self) -> float:
+        return float(os.environ.get("LANGUAGE_PROBE_SECONDS", "30"))
+
+    @property
+    def language_probe_offset_seconds(self) -> float:
+        """
+        Start of the language probe, skips intros and music that open many videos
+        """
+        return float(os.environ.get("LANGUAGE_PROBE_OFFSET_SECONDS", "0"))
+
+    @property
+    def vad_prefilter(self) -> bool:
+        """
+        Stream the audio through voice activity detection and transcribe only the speech
+        """
+        return _env_bool("VAD_PREFILTER", False)
+
+    @property
+    def vad_energy_threshold_db(self) -> float:
+        """
+        Level in dBFS below which audio is dropped as silence before the Silero model runs
+        """
+        return float(os.environ.get("VAD_ENERGY_THRESHOLD_DB", "-45"))
+
+    @property
+    def vad_use_silero(self) -> bool:
+        return _env_bool("VAD_USE_SILERO", True)
+
+    @property
+    def vad_pad_ms(self) -> int:
+        return int(os.environ.get("VAD_PAD_MS", "300"))
+
+    @property
+    def vad_max_stretch_ms(self) -> int:
+        """
+        Longest loud stretch held in memory before the VAD confirms it
+        """
+        return int(os.environ.get("VAD_MAX_STRETCH_MS", "30000"))
+
+    @property
+    def transcribe_tier(self) -> str:
+        """
+        Quality tier of jobs before any downgrade, one of "high", "medium" or "low"
+        """
+        return os.environ.get("TRANSCRIBE_TIER", "high")
+
+    @property
+    def transcribe_locale_tiers(self) -> Dict[str, str]:
+        """
+        Starting tier per language, e.g. "en:medium,pl:high"
+        """
+        value = os.environ.get("TRANSCRIBE_LOCALE_TIERS", "")
+        pairs = (item.split(":", 1) for item in value.split(",") if ":" in item)
+        return {locale.strip(): tier.strip() for locale, tier in pairs}
+
+    @property
+    def transcribe_long_clip_minutes(self) -> float:
+        """
+        Clips longer than this are transcribed one tier lower, 0 disables the rule
+        """
+        return float(os.environ.get("TRANSCRIBE_LONG_CLIP_MINUTES", "0"))
+
+    @property
+    def transcribe_backlog_thresholds(self) -> List[int]:
+        """
+        Queued messages at which jobs drop one more tier, e.g. "10,30"
+        """
+        value = os.environ.get("TRANSCRIBE_BACKLOG_THRESHOLDS", "10,30")
+        return [int(item) for item in value.split(",") if item.strip()]
+
+    @property
+    def transcription_cache_directory(self) -> str:
+        default = os.path.join(self.project_root, "out/cache/transcriptions")
+        return os.environ.get("TRANSCRIPTION_CACHE_DIR", default)
+
+    @property
+    def transcription_cache_max_mb(self) -> int:
+        """
+        Size limit of the transcription cache, 0 disables the limit
+        """
+        return int(os.environ.get("TRANSCRIPTION_CACHE_MAX_MB", "1024"))
+
+    @property
+    def resegment_subtitles(self) -> bool:
+        """
+        Rebuild the subtitle cues from word timings under the CAPTION_* limits instead of one cue per segment
+        """
+        return _env_bool("RESEGMENT_SUBTITLES", False)
+
+    @property
+    def caption_max_line_chars(self) -> int:
+        return int(os.environ.get("CAPTION_MAX_LINE_CHARS", "42"))
+
+    @property
+    def caption_max_lines(self) -> int:
+        return int(os.environ.get("CAPTION_MAX_LINES", "2"))
+
+    @property
+    def caption_max_duration(self) -> float:
+        return float(os.environ.get("CAPTION_MAX_DURATION", "7"))
+
+    @property
+    def caption_min_duration(self) -> float:
+        return float(os.environ.get("CAPTION_MIN_DURATION", "1"))
+
+    @property
+    def caption_max_chars_per_second(self) -> float:
+        """
+        Fastest reading speed, cues are held on screen longer to meet it
+        """
+        return float(os.environ.get("CAPTION_MAX_CHARS_PER_SECOND", "17"))
+
+    @property
+    def export_word_timestamps(self) -> bool:
+        """
+        Write the word timings of the transcription to a JSON file next to the SRT
+        """
+        return _env_bool("EXPORT_WORD_TIMESTAMPS", True)
+
+    @property
+    def burn_in_subtitles(self) -> bool:
+        """
+        Render subtitles into the video frames instead of muxing a soft subtitle track
+        """
+        return _env_bool("BURN_IN_SUBTITLES", False)
+
+    @property
+    def burn_in_preset(self) -> str:
+        return os.environ.get("BURN_IN_PRESET", "veryfast")
+
+    @property
+    def burn_in_crf(self) -> int:
+        return int(os.environ.get("BURN_IN_CRF", "23"))
+
+    @property
+    def burn_in_threads(self) -> int:
+        return int(os.environ.get("BURN_IN_THREADS", "0"))
+
+    @property
+    def translation_language(self) -> str:
+        """
+        Translate the subtitles to this language before SSML conversion, empty disables translation
+        """
+        return os.environ.get("TRANSLATION_LANGUAGE", "")
+
+    @property
+    def translation_backend(self) -> str:
+        """
+        Translation service, "google" uses googletrans, "fake" tags the texts offline
+        """
+        return os.environ.get("TRANSLATION_BACKEND", "google")
+
+    @property
+    def translation_workers(self) -> int:
+        """
+        Number of translation requests in flight at the same time
+        """
+        return int(os.environ.get("TRANSLATION_WORKERS", "4"))
+
+    @property
+    def translation_batch_chars(self) -> int:
+        """
+        Size limit of a single translation request in characters
+        """
+        return int(os.environ.get("TRANSLATION_BATCH_CHARS", "4500"))
+
+    @property
+    def translation_cache_path(self) -> str:
+        default = os.path.join(self.project_root, "out/cache/translations.sqlite3")
+        return os.environ.get("TRANSLATION_CACHE_PATH", default)
+
+    @property
+    def translation_cache_max_entries(self) -> int:
+        """
+        Number of phrases kept in the translation cache, 0 disables the limit
+        """
+        return int(os.environ.get("TRANSLATION_CACHE_MAX_ENTRIES", "200000"))
+
+    @property
+    def synthesize_speech(self) -> bool:
+        """
+        Voice the subtitles and mux the synthesized speech as an extra audio track
+        """
+        return _env_bool("SYNTHESIZE_SPEECH", False)
+
+    @property
+    def speech_engine(self) -> str:
+        """
+        Speech engine voicing the subtitles, "coqui" runs offline, "fake" produces tones
+        """
+        return os.environ.get("SPEECH_ENGINE", "coqui")
+
+    @property
+    def speech_model(self) -> str:
+        return os.environ.get("SPEECH_MODEL", "tts_models/en/ljspeech/vits")
+
+    @property
+    def speech_workers(self) -> int:
+        """
+        Number of processes synthesizing cues in parallel, 0 uses every core
+        """
+        return int(os.environ.get("SPEECH_WORKERS", "0")) or os.cpu_count() or 1
+
+    @property
+    def speech_sample_rate(self) -> int:
+        return int(os.environ.get("SPEECH_SAMPLE_RATE", "24000"))
+
+    @property
+    def pipeline_max_jobs(self) -> int:
+        """
+        Number of jobs travelling through the pipeline stages at the same time
+        """
+        return int(os.environ.get("PIPELINE_MAX_JOBS", "3"))
+
+    @property
+    def pipeline_report_interval(self) -> float:
+        """
+        Seconds between pipeline queue depth reports, 0 disables reporting
+        """
+        return float(os.environ.get("PIPELINE_REPORT_INTERVAL", "60"))
+
+    def stage_concurrency(self, stage: str, default: int = 1) -> int:
+        """
+        Number of jobs a pipeline stage processes at once, e.g. PIPELINE_DOWNLOAD_CONCURRENCY
+        """
+        return int(os.environ.get(f"PIPELINE_{stage.upper()}_CONCURRENCY", default))
+
+    @property
+    def worker_id(self) -> str:
+        """
+        Identifies this worker in the job tracking table
+        """
+        default = f"{socket.gethostname()}-{os.getpid()}"
+        return os.environ.get("WORKER_ID", default)
+
+    @property
+    def whisper_pool_memory_mb(self) -> int:
+        """
+        Memory budget of the shared Whisper model pool, 0 disables eviction
+        """
+        return int(os.environ.get("WHISPER_POOL_MEMORY_MB", "8192"))
+
 
 class DatabaseConfig:
     DATABASE_URL: str = os.environ.get("DATABASE_URL", "sqlite:///database.db")
@@ -56,6 +481,10 @@ class RabbitMQConfig:
     PORT = os.environ.get("RABBITMQ_PORT", "5672")
     USERNAME = os.environ.get("RABBITMQ_USERNAME", "admin")
     PASSWORD = os.environ.get("RABBIT_MQ_PASSWORD", "secret")
+    WORKERS = int(os.environ.get("RABBITMQ_WORKERS", "1"))
+    PREFETCH_COUNT = int(os.environ.get("RABBITMQ_PREFETCH_COUNT", "0"))
+    BATCH_SIZE = int(os.environ.get("RABBITMQ_BATCH_SIZE", "1"))
+    BATCH_WINDOW_MS = int(os.environ.get("RABBITMQ_BATCH_WINDOW_MS", "500"))
 
 
 config = Config()
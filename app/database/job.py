@@ -0,0 +1,37 @@
+from datetime import datetime
+from typing import List, Optional
+from uuid import UUID, uuid4
+
+from sqlmodel import Field, Relationship, SQLModel
+
+
+class ProcessingJob(SQLModel, table=True):
+    __tablename__: str = "processing_jobs"
+
+    id: UUID = Field(default_factory=uuid4, primary_key=True)
+    source: str = Field(..., index=True)
+    status: str = Field(default="running", index=True)
+    worker_id: str
+    model_name: Optional[str] = None
+    tier: Optional[str] = None
+    error: Optional[str] = None
+    started_at: datetime = Field(default_factory=datetime.now)
+    finished_at: Optional[datetime] = None
+    duration_ms: Optional[int] = None
+
+    stages: List["ProcessingStage"] = Relationship(back_populates="job")
+
+
+class ProcessingStage(SQLModel, table=True):
+    __tablename__: str = "processing_stages"
+
+    id: UUID = Field(default_factory=uuid4, primary_key=True)
+    job_id: UUID = Field(..., foreign_key="processing_jobs.id", index=True)
+    name: str = Field(..., index=True)
+    status: str
+    started_at: datetime
+    finished_at: datetime
+    duration_ms: int
+    size_bytes: Optional[int] = None
+
+    job: Optional[ProcessingJob] = Relationship(back_populates="stages")
@@ -1,7 +1,11 @@
+from datetime import datetime
+from typing import Optional, Tuple
 from uuid import UUID
 
+from sqlalchemy.exc import IntegrityError
 from sqlmodel import Session, select
 
+from app.database.job import ProcessingJob, ProcessingStage
 from app.database.resource import StreamingResource
 
 
@@ -21,6 +25,36 @@ def get_resource(session: Session, resource_id: UUID) -> StreamingResource:
     return session.get(StreamingResource, resource_id)
 
 
+def get_resource_by_url(session: Session, url: str) -> StreamingResource:
+    statement = select(StreamingResource).where(StreamingResource.url == url)
+    return session.exec(statement).first()
+
+
+def get_or_create_resource(
+    session: Session,
+    url: str,
+    title: str,
+) -> Tuple[StreamingResource, bool]:
+    """
+    Return the resource of a URL, creating it if there is none.
+
+    The unique URL constraint makes this safe against concurrent workers: the
+    one losing the race rolls back its insert and reads the winner's row.
+
+    Returns:
+        Tuple[StreamingResource, bool]: The resource and whether it was created.
+    """
+    resource = get_resource_by_url(session, url)
+    if resource is not None:
+        return resource, False
+
+    try:
+        return create_resource(session, url=url, title=title), True
+    except IntegrityError:
+        session.rollback()
+        return get_resource_by_url(session, url), False
+
+
 def get_all_resources(session: Session) -> list[StreamingResource]:
     statement = select(StreamingResource)
     return session.exec(statement).all()
@@ -47,3 +81,88 @@ def delete_resource(session: Session, resource_id: UUID) -> StreamingResource:
         session.delete(resource)
         session.commit()
     return resource
+
+
+def create_job(
+    session: Session,
+    source: str,
+    worker_id: str,
+    model_name: Optional[str] = None,
+) -> ProcessingJob:
+    job = ProcessingJob(source=source, worker_id=worker_id, model_name=model_name)
+    session.add(job)
+    session.commit()
+    session.refresh(job)
+    return job
+
+
+def get_job(session: Session, job_id: UUID) -> ProcessingJob:
+    return session.get(ProcessingJob, job_id)
+
+
+def add_job_stage(
+    session: Session,
+    job_id: UUID,
+    name: str,
+    status: str,
+    started_at: datetime,
+    finished_at: datetime,
+    size_bytes: Optional[int] = None,
+    duration_ms: Optional[int] = None,
+) -> ProcessingStage:
+    if duration_ms is None:
+        duration_ms = round((finished_at - started_at).total_seconds() * 1000)
+
+    stage = ProcessingStage(
+        job_id=job_id,
+        name=name,
+        status=status,
+        started_at=started_at,
+        finished_at=finished_at,
+        duration_ms=duration_ms,
+        size_bytes=size_bytes,
+    )
+    session.add(stage)
+    session.commit()
+    session.refresh(stage)
+    return stage
+
+
+def set_job_tier(
+    session: Session,
+    job_id: UUID,
+    tier: str,
+    model_name: str,
+) -> ProcessingJob:
+    job = get_job(session, job_id)
+    if job:
+        job.tier = tier
+        job.model_name = model_name
+        session.commit()
+        session.refresh(job)
+
+    return job
+
+
+def finish_job(
+    session: Session,
+    job_id: UUID,
+    status: str,
+    model_name: Optional[str] = None,
+    error: Optional[str] = None,
+) -> ProcessingJob:
+    job = get_job(session, job_id)
+    if job:
+        job.status = status
+        job.finished_at = datetime.now()
+        job.duration_ms = round(
+            (job.finished_at - job.started_at).total_seconds() * 1000
+        )
+        if model_name:
+            job.model_name = model_name
+        if error:
+            job.error = error
+        session.commit()
+        session.refresh(job)
+
+    return job
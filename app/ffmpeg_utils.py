@@ -1,32 +1,106 @@
-from typing import Any
+import asyncio
+import subprocess
+from dataclasses import dataclass
+from typing import Any, Iterator, Optional, Sequence, Tuple
 
 import ffmpeg
+import numpy as np
 
 from app.utils import get_logger
 
 logger = get_logger(__name__)
 
+SAMPLE_RATE = 16000
+
+
+@dataclass
+class BurnInOptions:
+    """
+    Encoder settings used when subtitles are rendered into the video frames.
+
+    Attributes:
+        preset (str): The x264 preset trading encoding speed for compression.
+        crf (int): The x264 constant rate factor, lower is better quality.
+        threads (int): The number of encoder threads, 0 lets FFmpeg decide.
+        force_style (str): The ASS style applied to the rendered subtitles.
+    """
+
+    preset: str = "veryfast"
+    crf: int = 23
+    threads: int = 0
+    force_style: str = "FontName=Display,FontSize=14,PrimaryColour=&HFFFFFF&,Bold=1"
+
 
 class FFmpegProcessor:
     def run(
         self,
         stream_spec: Any,
         overwrite_output: bool = False,
+        input_data: Optional[bytes] = None,
     ) -> tuple[bytes, bytes]:
         """
         Run a given FFmpeg stream specific command.
+
+        ``input_data`` is written to FFmpeg's stdin, for commands reading "pipe:".
         """
+        stdin = {} if input_data is None else {"input": input_data}
+
         try:
             return ffmpeg.run(
                 stream_spec,
                 overwrite_output=overwrite_output,
                 capture_stdout=True,
                 capture_stderr=True,
+                **stdin,
             )
         except ffmpeg.Error as e:
             logger.exception("An ffmpeg error occurred: %s", e.stderr.decode("utf-8"))
             raise RuntimeError(f"Failed to execute FFmpeg command: {e}")
 
+    async def run_async(
+        self,
+        stream_spec: Any,
+        overwrite_output: bool = False,
+    ) -> tuple[bytes, bytes]:
+        """
+        Run a given FFmpeg stream specific command as an asyncio subprocess.
+
+        The event loop stays free while FFmpeg runs, so other pipeline stages keep
+        making progress.
+        """
+        args = ffmpeg.compile(stream_spec, overwrite_output=overwrite_output)
+
+        process = await asyncio.create_subprocess_exec(
+            *args,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        stdout, stderr = await process.communicate()
+
+        if process.returncode != 0:
+            logger.error("An ffmpeg error occurred: %s", stderr.decode("utf-8"))
+            raise RuntimeError(
+                f"Failed to execute FFmpeg command: exit code {process.returncode}"
+            )
+
+        return stdout, stderr
+
+    def probe_duration(self, file_path: str) -> float:
+        """
+        Read the duration of a media file in seconds with ffprobe.
+
+        Raises:
+            RuntimeError: If the file cannot be probed or has no duration.
+        """
+        try:
+            return float(ffmpeg.probe(file_path)["format"]["duration"])
+        except ffmpeg.Error as e:
+            logger.exception("An ffprobe error occurred: %s", e.stderr.decode("utf-8"))
+            raise RuntimeError(f"Failed to probe {file_path}: {e}")
+        except (KeyError, ValueError) as e:
+            raise RuntimeError(f"No duration in {file_path}: {e}")
+
     def input(
         self,
         file_path: str,
@@ -88,3 +162,222 @@ class FFmpegProcessor:
         except ffmpeg.Error as e:
             logger.exception("An ffmpeg error occurred: %s", e.stderr.decode("utf-8"))
             raise RuntimeError(f"Failed to create FFmpeg output stream: {e}")
+
+    def read_pcm(
+        self,
+        file_path: str,
+        sample_rate: int = SAMPLE_RATE,
+        **kwargs: Any,
+    ) -> np.ndarray:
+        """Decode the audio track of a media file into memory.
+
+        The audio is downmixed to mono, resampled to ``sample_rate`` and piped
+        through FFmpeg's stdout as 32-bit float PCM, so nothing is written to disk.
+
+        Args:
+            file_path (str): The path to the input file.
+            sample_rate (int, optional): The output sampling rate. Defaults to 16000.
+            **kwargs (Any): Additional input options passed to ffmpeg verbatim (e.g. ``ss=60``, ``t=30``).
+
+        Returns:
+            np.ndarray: A one-dimensional float32 array of samples in the [-1, 1] range.
+
+        Raises:
+            RuntimeError: If FFmpeg fails to decode the input.
+
+        Example:
+            To decode the first 30 seconds of a video:
+            >>> samples = self.read_pcm(file_path, t=30)
+        """
+        stdout, _ = self.run(self._pcm_output(file_path, sample_rate, **kwargs))
+
+        return np.frombuffer(stdout, dtype=np.float32)
+
+    async def read_pcm_async(
+        self,
+        file_path: str,
+        sample_rate: int = SAMPLE_RATE,
+        **kwargs: Any,
+    ) -> np.ndarray:
+        """Decode the audio track of a media file into memory without blocking the event loop.
+
+        See ``read_pcm`` for the arguments.
+        """
+        stream = self._pcm_output(file_path, sample_rate, **kwargs)
+        stdout, _ = await self.run_async(stream)
+
+        return np.frombuffer(stdout, dtype=np.float32)
+
+    def stream_pcm(
+        self,
+        file_path: str,
+        block_seconds: float = 10.0,
+        sample_rate: int = SAMPLE_RATE,
+        **kwargs: Any,
+    ) -> Iterator[np.ndarray]:
+        """Decode the audio track of a media file block by block.
+
+        Unlike ``read_pcm`` the whole track is never held in memory at once, so
+        the consumer can drop the parts it does not need as they arrive.
+
+        Args:
+            file_path (str): The path to the input file.
+            block_seconds (float, optional): The length of every block but the last. Defaults to 10.
+            sample_rate (int, optional): The output sampling rate. Defaults to 16000.
+            **kwargs (Any): Additional input options passed to ffmpeg verbatim.
+
+        Yields:
+            np.ndarray: Consecutive blocks of mono float32 samples.
+
+        Raises:
+            RuntimeError: If FFmpeg fails to decode the input.
+        """
+        stream = self._pcm_output(file_path, sample_rate, **kwargs)
+        args = ffmpeg.compile(stream.global_args("-loglevel", "error"))
+        block_bytes = int(block_seconds * sample_rate) * 4
+
+        process = subprocess.Popen(
+            args,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        try:
+            for data in iter(lambda: process.stdout.read(block_bytes), b""):
+                yield np.frombuffer(data[: len(data) // 4 * 4], dtype=np.float32)
+        finally:
+            process.stdout.close()
+            stderr = process.stderr.read()
+            process.stderr.close()
+            returncode = process.wait()
+
+        if returncode != 0:
+            logger.error("An ffmpeg error occurred: %s", stderr.decode("utf-8"))
+            raise RuntimeError(
+                f"Failed to execute FFmpeg command: exit code {returncode}"
+            )
+
+    def write_pcm(
+        self,
+        samples: np.ndarray,
+        output_path: str,
+        sample_rate: int = SAMPLE_RATE,
+        codec: str = "aac",
+    ) -> None:
+        """Encode mono float32 samples into an audio file.
+
+        The samples are piped straight into the encoder, so no intermediate WAV
+        file is written.
+
+        Args:
+            samples (np.ndarray): Mono float32 samples in the [-1, 1] range.
+            output_path (str): The path of the audio file.
+            sample_rate (int, optional): The sampling rate of the samples. Defaults to 16000.
+            codec (str, optional): The audio codec of the file. Defaults to "aac".
+
+        Raises:
+            RuntimeError: If FFmpeg fails to encode the samples.
+        """
+        stream = self.input("pipe:", format="f32le", ar=sample_rate, ac=1)
+        stream = self.output(stream, output_path, acodec=codec)
+
+        self.run(
+            stream,
+            overwrite_output=True,
+            input_data=np.ascontiguousarray(samples, dtype=np.float32).tobytes(),
+        )
+
+    def _pcm_output(self, file_path: str, sample_rate: int, **kwargs: Any) -> Any:
+        stream = self.input(file_path, **kwargs)
+        return self.output(
+            stream,
+            "pipe:",
+            format="f32le",
+            acodec="pcm_f32le",
+            ac=1,
+            ar=sample_rate,
+            vn=None,
+        )
+
+    def subtitle_output(
+        self,
+        video_path: str,
+        subtitle_path: str,
+        output_path: str,
+        language: str,
+        burn_in: Optional[BurnInOptions] = None,
+        audio_tracks: Sequence[str] = (),
+        extra_subtitles: Sequence[Tuple[str, str]] = (),
+    ) -> Any:
+        """Plan the cheapest FFmpeg command adding subtitles to a video.
+
+        Unless the text has to be rendered into the frames, the video and audio
+        streams are copied untouched and the subtitles are muxed as a soft
+        ``mov_text`` track, which costs no decoding or encoding at all. Burning in
+        re-encodes the video only; the audio is still stream-copied. Extra
+        subtitles are always muxed as soft tracks after the first one.
+
+        Args:
+            video_path (str): The path to the input video.
+            subtitle_path (str): The path to the SRT subtitle file.
+            output_path (str): The path of the resulting video.
+            language (str): The language tag of the subtitle track.
+            burn_in (BurnInOptions, optional): The encoder settings when the subtitles must be
+                burned in. Defaults to None, which muxes a soft subtitle track.
+            audio_tracks (Sequence[str], optional): Audio files added as extra audio tracks,
+                e.g. a dubbed voice-over. They are stream-copied, so they must already be
+                encoded in a codec the container accepts. Defaults to none.
+            extra_subtitles (Sequence[Tuple[str, str]], optional): The paths and language tags
+                of further SRT files muxed as additional subtitle tracks. Defaults to none.
+
+        Returns:
+            Any: An FFmpeg output stream object.
+        """
+        video = self.input(video_path)
+        extra_audio = [self.input(path)["a"] for path in audio_tracks]
+
+        soft_subtitles = list(extra_subtitles)
+        if burn_in is None:
+            soft_subtitles.insert(0, (subtitle_path, language))
+
+        subtitle_inputs = [self.input(path) for path, _ in soft_subtitles]
+        subtitle_options = {
+            f"metadata:s:s:{index}": f"language={track_language}"
+            for index, (_, track_language) in enumerate(soft_subtitles)
+        }
+        if soft_subtitles:
+            subtitle_options["c:s"] = "mov_text"
+
+        if burn_in is None:
+            return self.output(
+                video,
+                *subtitle_inputs,
+                *extra_audio,
+                output_path,
+                c="copy",
+                **subtitle_options,
+            )
+
+        encoder_options = {
+            "vcodec": "libx264",
+            "preset": burn_in.preset,
+            "crf": burn_in.crf,
+            "acodec": "copy",
+        }
+        if burn_in.threads:
+            encoder_options["threads"] = burn_in.threads
+
+        frames = video.video.filter(
+            "subtitles",
+            subtitle_path,
+            force_style=burn_in.force_style,
+        )
+        return self.output(
+            frames,
+            video["a?"],
+            *subtitle_inputs,
+            *extra_audio,
+            output_path,
+            **encoder_options,
+            **subtitle_options,
+        )
@@ -0,0 +1,227 @@
+import functools
+import inspect
+import json
+import os
+from dataclasses import asdict
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from app.logger import get_logger
+from app.pipeline.orchestrator import StageHandler
+from app.subtitles.sinks import SegmentSink
+from app.transcriber.segments import Segment, Word
+
+logger = get_logger(__name__)
+
+MANIFEST_FILE = "manifest.json"
+SEGMENTS_FILE = "segments.jsonl"
+
+
+class Checkpoint:
+    """
+    A manifest of the stages a job already completed.
+
+    The manifest lives in the job workspace next to the stage outputs and maps
+    every completed stage to the outputs needed to resume after it. It is
+    rewritten atomically after each stage, so a worker dying at any point
+    leaves either the previous or the new manifest behind.
+
+    Attributes:
+        directory (str): The job workspace holding the manifest and the stage outputs.
+        source (str): The URL of the video, guards against reusing another job's manifest.
+    """
+
+    def __init__(self, directory: str, source: str):
+        self.directory = directory
+        self.source = source
+        self._stages = self._read()
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.directory, MANIFEST_FILE)
+
+    @property
+    def stages(self) -> List[str]:
+        """The completed stages in completion order."""
+        return list(self._stages)
+
+    def completed(self, stage: str) -> bool:
+        return stage in self._stages
+
+    def load(self, stage: str) -> Dict[str, Any]:
+        """Return the outputs recorded for a completed stage."""
+        return self._stages[stage]
+
+    def save(self, stage: str, outputs: Dict[str, Any]) -> None:
+        """
+        Mark a stage as completed.
+
+        Args:
+            stage (str): The name of the stage.
+            outputs (Dict[str, Any]): JSON serializable outputs of the stage.
+        """
+        self._stages[stage] = outputs
+        self._write()
+
+    def invalidate(self, stage: str) -> None:
+        """Forget a stage and every stage completed after it."""
+        stages = self.stages
+        if stage in stages:
+            for name in stages[stages.index(stage) :]:
+                self._stages.pop(name)
+            self._write()
+
+    def _write(self) -> None:
+        temporary_path = f"{self.path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as f:
+            json.dump({"source": self.source, "stages": self._stages}, f)
+        os.replace(temporary_path, self.path)
+
+    def _read(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except json.JSONDecodeError:
+            logger.warning(f"Ignoring corrupted checkpoint manifest {self.path}")
+            return {}
+
+        if manifest.get("source") != self.source:
+            logger.warning(f"Ignoring checkpoint manifest of {manifest.get('source')}")
+            return {}
+
+        return manifest["stages"]
+
+
+def resumable(
+    name: str,
+    handler: StageHandler,
+    dump: Callable[[Any], Dict[str, Any]],
+    restore: Callable[[Any, Dict[str, Any]], Optional[Any]],
+) -> StageHandler:
+    """
+    Wrap a stage handler so that it is skipped when ``job.checkpoint`` completed it.
+
+    ``restore`` puts the recorded outputs back on the job and returns None when
+    they are no longer usable (e.g. a file was removed), in which case the stage
+    runs again. After a successful run ``dump`` extracts the outputs to record.
+    Jobs without a checkpoint pass through untouched.
+
+    Args:
+        name (str): The name of the stage.
+        handler (StageHandler): The stage handler receiving and returning a job.
+        dump (Callable): Returns the JSON serializable outputs of the stage from the job.
+        restore (Callable): Applies recorded outputs to the job and returns it.
+
+    Returns:
+        StageHandler: The wrapped handler.
+    """
+
+    if inspect.iscoroutinefunction(handler):
+
+        @functools.wraps(handler)
+        async def run_async(job):
+            restored = _resume(name, job, restore)
+            if restored is not None:
+                return restored
+            return _complete(name, await handler(job), dump)
+
+        return run_async
+
+    @functools.wraps(handler)
+    def run(job):
+        restored = _resume(name, job, restore)
+        if restored is not None:
+            return restored
+        return _complete(name, handler(job), dump)
+
+    return run
+
+
+def _resume(name: str, job: Any, restore: Callable) -> Optional[Any]:
+    checkpoint = getattr(job, "checkpoint", None)
+    if checkpoint is None or not checkpoint.completed(name):
+        return None
+
+    restored = restore(job, checkpoint.load(name))
+    if restored is None:
+        logger.info(f"Checkpoint of stage {name} is stale, running it again")
+        checkpoint.invalidate(name)
+    else:
+        logger.info(f"Resuming {job.source} after stage {name}")
+    return restored
+
+
+def _complete(name: str, job: Any, dump: Callable) -> Any:
+    if getattr(job, "checkpoint", None) is not None:
+        job.checkpoint.save(name, dump(job))
+    return job
+
+
+class SegmentCheckpointSink(SegmentSink):
+    """
+    Writes every transcribed segment to a JSON lines file as it is produced.
+
+    The first line records the language, every following line one segment. The
+    file is flushed after each segment, so an interrupted transcription can be
+    resumed after the last segment written, see ``read_segment_checkpoint``.
+    """
+
+    def __init__(self, output_file: str, language: str):
+        self.file = open(output_file, "w", encoding="utf-8")
+        self._write_line({"language": language})
+
+    def write(self, segment: Any) -> None:
+        if not isinstance(segment, Segment):
+            segment = Segment.from_whisper(segment)
+        self._write_line(asdict(segment))
+
+    def close(self) -> None:
+        self.file.close()
+
+    def _write_line(self, value: dict) -> None:
+        self.file.write(json.dumps(value, ensure_ascii=False) + "\n")
+        self.file.flush()
+
+
+def read_segment_checkpoint(path: str) -> Tuple[Optional[str], List[Segment]]:
+    """
+    Read the segments checkpointed by a ``SegmentCheckpointSink``.
+
+    A torn last line, left by a worker dying mid-write, is dropped.
+
+    Args:
+        path (str): The checkpoint file.
+
+    Returns:
+        Tuple[Optional[str], List[Segment]]: The language and the segments, or (None, [])
+            when there is no checkpoint.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            lines = list(_read_lines(f))
+    except FileNotFoundError:
+        return None, []
+
+    if not lines:
+        return None, []
+
+    segments = [
+        Segment(
+            start=line["start"],
+            end=line["end"],
+            text=line["text"],
+            words=[Word(**word) for word in line["words"]],
+        )
+        for line in lines[1:]
+    ]
+    return lines[0]["language"], segments
+
+
+def _read_lines(f) -> Iterator[dict]:
+    for line in f:
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError:
+            logger.warning(f"Dropping torn segment checkpoint line in {f.name}")
+            return
@@ -0,0 +1,132 @@
+import json
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional, Union
+
+import numpy as np
+
+from app.config import config
+from app.pipeline.checkpoint import Checkpoint
+from app.pipeline.tracking import JobTracker
+from app.transcriber.policy import QualityTier
+from app.transcriber.vad import SpeechMap
+from app.transcriber.whisper import WhisperVideoProcessor
+
+
+@dataclass
+class Localization:
+    """
+    The outputs of a job in one target locale.
+
+    Attributes:
+        locale (str): The language of the subtitles.
+        subtitle_path (str): The SRT file in that language.
+        ssml_path (str): The SSML file in that language.
+        output_path (str): The video carrying these subtitles, once muxed.
+    """
+
+    locale: str
+    subtitle_path: str
+    ssml_path: str
+    output_path: Optional[str] = None
+
+
+@dataclass
+class Job:
+    """
+    The state of a single video travelling through the pipeline stages.
+
+    Attributes:
+        source (str): The URL of the video taken from the queue message.
+        workspace (str): The private scratch directory holding the intermediate files.
+        model_name (str): The Whisper model used for transcription, replaced by the model
+            of the chosen tier.
+        locales (List[str]): The languages to deliver subtitles in, empty uses the configured translation.
+        multi_track (bool): Mux the subtitles of all locales into a single video instead of one video per locale.
+        audio_only (bool): Download only the audio and deliver subtitles and SSML without a video.
+        deadline (float): The epoch time by which the job should be done, None if it has none.
+        queue_depth (int): The number of messages queued behind the job when it was received.
+        tier (QualityTier): The transcription settings chosen by the tier policy.
+        tracker (JobTracker): Records the stage timings, None disables tracking.
+        checkpoint (Checkpoint): Records the completed stages, None disables resuming.
+        title (str): The title of the downloaded video.
+        video_path (str): The downloaded video, or its audio in audio-only mode.
+        processor (WhisperVideoProcessor): The processor bound to the downloaded video.
+        audio (Union[str, np.ndarray]): The extracted audio, released after transcription.
+        speech_map (SpeechMap): The speech regions of the audio, when only the speech was kept.
+        source_language (str): The spoken language, detected on a probe when enabled.
+        language (str): The language of the transcription.
+        subtitle_path (str): The generated SRT file.
+        ssml_path (str): The generated SSML file.
+        words_path (str): The word timings of the transcription, when exported.
+        localizations (List[Localization]): The outputs in every target locale, the first
+            one mirrored by ``language``, ``subtitle_path`` and ``ssml_path``.
+        speech_path (str): The synthesized voice-over, when speech synthesis is enabled.
+        output_path (str): The video with subtitles.
+    """
+
+    source: str
+    workspace: Optional[str] = None
+    model_name: str = "large-v3"
+    locales: List[str] = field(default_factory=list)
+    multi_track: bool = False
+    audio_only: bool = False
+    deadline: Optional[float] = None
+    queue_depth: int = 0
+    tier: Optional[QualityTier] = None
+    tracker: Optional[JobTracker] = None
+    checkpoint: Optional[Checkpoint] = None
+    title: Optional[str] = None
+    video_path: Optional[str] = None
+    processor: Optional[WhisperVideoProcessor] = None
+    audio: Optional[Union[str, np.ndarray]] = None
+    speech_map: Optional[SpeechMap] = None
+    source_language: Optional[str] = None
+    language: Optional[str] = None
+    subtitle_path: Optional[str] = None
+    ssml_path: Optional[str] = None
+    words_path: Optional[str] = None
+    localizations: List[Localization] = field(default_factory=list)
+    speech_path: Optional[str] = None
+    output_path: Optional[str] = None
+
+    @classmethod
+    def from_message(cls, body: bytes, **kwargs) -> "Job":
+        """
+        Create a job from a queue message.
+
+        The message is either the URL of the video or a JSON object such as
+        ``{"source": URL, "locales": ["en", "de"], "multi_track": true}``.
+        ``audio_only`` defaults to the worker configuration, and ``deadline`` gives
+        the seconds the job may take from now.
+
+        Args:
+            body (bytes): The message body.
+            **kwargs: Further fields of the job, e.g. the workspace.
+
+        Raises:
+            ValueError: If a JSON message has no source.
+
+        Returns:
+            Job: The job.
+        """
+        text = body.decode("utf-8").strip()
+        if not text.startswith("{"):
+            return cls(source=text, audio_only=config.audio_only, **kwargs)
+
+        message = json.loads(text)
+        if not message.get("source"):
+            raise ValueError(f"Job message without a source: {text}")
+
+        deadline = message.get("deadline")
+        if deadline is not None:
+            deadline = time.time() + float(deadline)
+
+        return cls(
+            source=message["source"],
+            locales=list(dict.fromkeys(message.get("locales", []))),
+            multi_track=bool(message.get("multi_track", False)),
+            audio_only=bool(message.get("audio_only", config.audio_only)),
+            deadline=deadline,
+            **kwargs,
+        )
@@ -0,0 +1,199 @@
+import asyncio
+import inspect
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Union
+
+from app.logger import get_logger
+
+logger = get_logger(__name__)
+
+StageHandler = Callable[[Any], Union[Any, Awaitable[Any]]]
+
+
+class Stage:
+    """
+    A step of an AsyncPipeline.
+
+    Coroutine handlers run on the event loop (e.g. FFmpeg subprocesses), while
+    plain functions run in the pipeline's thread pool (e.g. Whisper inference).
+
+    Attributes:
+        name (str): The name used in logs and queue depth reports.
+        handler (StageHandler): Receives an item and returns the item for the next stage.
+        concurrency (int): The number of items processed by the stage at once.
+        queue_size (int): The number of items allowed to wait in front of the stage.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        handler: StageHandler,
+        concurrency: int = 1,
+        queue_size: int = 1,
+    ):
+        self.name = name
+        self.handler = handler
+        self.concurrency = max(1, concurrency)
+        self.queue_size = max(1, queue_size)
+        self.is_async = inspect.iscoroutinefunction(handler)
+
+
+class AsyncPipeline:
+    """
+    Runs items through a chain of stages connected by bounded asyncio queues.
+
+    Every stage has its own workers, so different items occupy different stages
+    at the same time: while one video is transcribed, the next one downloads and
+    the previous one is muxed. A full queue blocks the stage in front of it,
+    which bounds the number of items held in memory.
+    """
+
+    def __init__(
+        self,
+        stages: Sequence[Stage],
+        executor: Optional[Executor] = None,
+        report_interval: float = 0,
+    ):
+        """
+        Initializes the AsyncPipeline.
+
+        Args:
+            stages (Sequence[Stage]): The stages in processing order.
+            executor (Executor, optional): The executor running synchronous handlers. Defaults to
+                a thread pool with one thread per synchronous stage worker.
+            report_interval (float, optional): Seconds between queue depth log lines, 0 disables
+                reporting. Defaults to 0.
+        """
+        if not stages:
+            raise ValueError("A pipeline needs at least one stage.")
+
+        self.stages = list(stages)
+        self.report_interval = report_interval
+        self._executor = executor
+        self._owns_executor = executor is None
+        self._queues: List[asyncio.Queue] = []
+        self._active: Dict[str, int] = {stage.name: 0 for stage in self.stages}
+        self._tasks: List[asyncio.Task] = []
+        self._stopped = False
+
+    async def start(self) -> None:
+        """Create the queues and start the stage workers."""
+        if self._executor is None:
+            threads = sum(s.concurrency for s in self.stages if not s.is_async)
+            self._executor = ThreadPoolExecutor(
+                max_workers=max(1, threads),
+                thread_name_prefix="pipeline",
+            )
+
+        self._queues = [asyncio.Queue(maxsize=s.queue_size) for s in self.stages]
+
+        for index, stage in enumerate(self.stages):
+            for _ in range(stage.concurrency):
+                self._tasks.append(asyncio.create_task(self._work(index)))
+
+        if self.report_interval:
+            self._tasks.append(asyncio.create_task(self._report()))
+
+    async def submit(self, item: Any) -> Any:
+        """
+        Run an item through every stage.
+
+        Args:
+            item (Any): The item handed to the first stage.
+
+        Returns:
+            Any: The item returned by the last stage.
+
+        Raises:
+            Exception: The exception raised by the stage that failed.
+            asyncio.CancelledError: If the pipeline stopped before the item went through.
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self._queues[0].put((item, future))
+        if self._stopped:
+            future.cancel()
+        return await future
+
+    def queue_depths(self) -> Dict[str, dict]:
+        """
+        Report the number of items waiting for and processed by each stage.
+
+        Returns:
+            Dict[str, dict]: ``{"waiting": n, "active": n}`` keyed by stage name.
+        """
+        return {
+            stage.name: {"waiting": queue.qsize(), "active": self._active[stage.name]}
+            for stage, queue in zip(self.stages, self._queues)
+        }
+
+    async def stop(self) -> None:
+        """
+        Cancel the stage workers and release the thread pool.
+
+        Items still in the pipeline are cancelled, so their ``submit`` calls
+        raise ``asyncio.CancelledError`` instead of waiting forever. Handlers
+        already running in the thread pool are not interrupted.
+        """
+        self._stopped = True
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        for queue in self._queues:
+            while not queue.empty():
+                _, future = queue.get_nowait()
+                future.cancel()
+
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    async def _work(self, index: int) -> None:
+        stage = self.stages[index]
+        queue = self._queues[index]
+
+        while True:
+            item, future = await queue.get()
+            self._active[stage.name] += 1
+            try:
+                if future.done():
+                    continue
+
+                result = await self._run(stage, item, future)
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            finally:
+                self._active[stage.name] -= 1
+                queue.task_done()
+
+            if future.done():
+                continue
+            if index + 1 < len(self._queues):
+                await self._queues[index + 1].put((result, future))
+            else:
+                future.set_result(result)
+
+    async def _run(self, stage: Stage, item: Any, future: asyncio.Future) -> Any:
+        """
+        Run a stage handler, failing the item's future when it raises.
+
+        The exception is caught in this short-lived coroutine rather than in
+        the worker, so its traceback keeps the stage frames without holding the
+        suspended worker frame, which a caller clearing the frames would close.
+        """
+        try:
+            if stage.is_async:
+                return await stage.handler(item)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, stage.handler, item)
+        except Exception as e:
+            logger.exception(f"Stage '{stage.name}' failed: {e}")
+            if not future.done():
+                future.set_exception(e)
+
+    async def _report(self) -> None:
+        while True:
+            await asyncio.sleep(self.report_interval)
+            logger.info(f"Pipeline queue depths: {self.queue_depths()}")
@@ -0,0 +1,876 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+from itertools import chain
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+from faster_whisper import decode_audio
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlmodel import Session
+
+import app.utils as utils
+from app.butcher.downloader import range_downloader
+from app.butcher.store import media_store
+from app.butcher.youtube import YoutubeButcher, extract_video_id, normalize_url
+from app.config import config
+from app.database.base import engine
+from app.database.operations import get_or_create_resource, update_resource
+from app.ffmpeg_utils import SAMPLE_RATE, BurnInOptions
+from app.pipeline.checkpoint import (
+    SEGMENTS_FILE,
+    SegmentCheckpointSink,
+    read_segment_checkpoint,
+    resumable,
+)
+from app.pipeline.job import Job, Localization
+from app.pipeline.orchestrator import StageHandler
+from app.pipeline.tracking import COMPLETED, file_size, tracked
+from app.subtitles.resegment import CaptionLimits, ResegmentingSink
+from app.subtitles.sinks import TimedSink, broadcast
+from app.subtitles.srt import SrtSink
+from app.subtitles.track import SubtitleTrack
+from app.subtitles.words import WordJsonSink
+from app.synthesizer.ssml import SSMLConverter
+from app.synthesizer.synthesis import get_speech_synthesizer
+from app.transcriber.batch import get_batch_transcriber
+from app.transcriber.cache import transcription_cache
+from app.transcriber.language import language_detector
+from app.transcriber.policy import tier_policy
+from app.transcriber.segments import Segment
+from app.transcriber.vad import SpeechMap, voice_activity_detector
+from app.transcriber.whisper import WhisperVideoProcessor
+from app.translator.translator import get_translator
+
+logger = utils.get_logger(__name__)
+
+SPEECH_MAP_FILE = "speech.json"
+SPEECH_AUDIO_FILE = "speech.npy"
+
+# Downloads of the same media key take turns on one of these.
+_DOWNLOAD_LOCKS = [threading.Lock() for _ in range(64)]
+
+
+def download(job: Job) -> Job:
+    """
+    Download the source video into the job workspace and bind a processor to it.
+
+    The streaming resource of the video is claimed first, so the check and the
+    insert happen in one step. A video that was already claimed and is still
+    in the media store is linked into the workspace instead of being
+    downloaded again; fresh downloads are added to the store. Jobs of the same
+    video in this worker take turns, so the second one finds the download of
+    the first in the store.
+    """
+    key = _media_key(job)
+    if key is None:
+        _claim_resource(job)
+        return _download(job)
+
+    with _DOWNLOAD_LOCKS[hash(key) % len(_DOWNLOAD_LOCKS)]:
+        title, created = _claim_resource(job)
+        if not created and _reuse_download(job, key, title):
+            job.processor = WhisperVideoProcessor(job.video_path)
+            return job
+
+        job = _download(job)
+        media_store.store(key, job.video_path)
+    return job
+
+
+def _download(job: Job) -> Job:
+    downloaded = YoutubeButcher.download_source(
+        source=job.source,
+        output_path=job.workspace,
+        downloader=range_downloader if config.download_workers > 1 else None,
+        audio_only=job.audio_only,
+        min_abr_kbps=config.audio_min_abr_kbps,
+    )
+
+    if downloaded is None:
+        raise RuntimeError(f"Failed to download {job.source}")
+
+    job.title = downloaded.title
+    job.video_path = downloaded.path
+    job.processor = WhisperVideoProcessor(job.video_path)
+    return job
+
+
+def _media_key(job: Job) -> Optional[str]:
+    video_id = extract_video_id(job.source)
+    if video_id is None:
+        return None
+    return f"{video_id}.audio" if job.audio_only else video_id
+
+
+def _claim_resource(job: Job) -> Tuple[str, bool]:
+    with Session(engine) as session:
+        resource, created = get_or_create_resource(
+            session, url=normalize_url(job.source), title=job.title or ""
+        )
+        return resource.title, created
+
+
+def _reuse_download(job: Job, key: str, title: str) -> bool:
+    video_path = media_store.checkout(key, job.workspace)
+    if video_path is None:
+        return False
+
+    logger.info(f"Reusing the stored download of {job.source}")
+    job.title = title or job.title
+    job.video_path = video_path
+    return True
+
+
+def detect_language(job: Job) -> Job:
+    """
+    Detect the spoken language on a short probe of the audio.
+
+    The probe is decoded on its own, so the language is known before the full
+    audio is extracted and the transcription runs once, in the right language.
+    Probes that are silent or not confident fall back to the configured locale.
+    Does nothing unless language detection is enabled.
+    """
+    if not config.language_detection:
+        return job
+
+    probe = job.processor.load_audio(
+        config.language_probe_offset_seconds, config.language_probe_seconds
+    )
+    if len(probe) < SAMPLE_RATE and config.language_probe_offset_seconds:
+        probe = job.processor.load_audio(0, config.language_probe_seconds)
+
+    return _detect_language(job, probe)
+
+
+async def detect_language_async(job: Job) -> Job:
+    """Decode the language probe in an FFmpeg subprocess, see ``detect_language``."""
+    if not config.language_detection:
+        return job
+
+    probe = await job.processor.load_audio_async(
+        config.language_probe_offset_seconds, config.language_probe_seconds
+    )
+    if len(probe) < SAMPLE_RATE and config.language_probe_offset_seconds:
+        probe = await job.processor.load_audio_async(0, config.language_probe_seconds)
+
+    return await asyncio.to_thread(_detect_language, job, probe)
+
+
+def _detect_language(job: Job, probe: np.ndarray) -> Job:
+    detected = language_detector.detect(probe, fallback=config.localization)
+    job.source_language = detected.language
+    return job
+
+
+def _source_language(job: Job) -> str:
+    return job.source_language or config.localization
+
+
+def detect_speech(job: Job) -> Job:
+    """
+    Stream the audio through voice activity detection and keep only the speech.
+
+    The audio is decoded block by block and silent or non-speech stretches are
+    dropped as they arrive, so they are neither held in memory nor transcribed.
+    The speech-only samples replace the extracted audio, and the speech map,
+    which restores the original timestamps, is saved in the workspace for the
+    later stages. Does nothing unless the VAD pre-filter is enabled.
+    """
+    if not config.vad_prefilter:
+        return job
+
+    job.speech_map, job.audio = voice_activity_detector.detect_stream(
+        job.processor.stream_audio()
+    )
+    if job.workspace is not None:
+        job.speech_map.save(_speech_map_path(job))
+    return job
+
+
+def _speech_map_path(job: Job) -> str:
+    return os.path.join(job.workspace, SPEECH_MAP_FILE)
+
+
+def extract(job: Job) -> Job:
+    """
+    Decode the audio of the video, into memory unless audio files are kept.
+
+    In audio-only mode the downloaded file is handed to Whisper as it is. Audio
+    already reduced to its speech by ``detect_speech`` is kept.
+    """
+    if job.speech_map is not None:
+        return job
+
+    if job.audio_only:
+        job.audio = job.video_path
+    elif config.keep_audio_files:
+        job.audio = job.processor.extract_audio(config.audio_directory)
+    else:
+        job.audio = job.processor.load_audio()
+    return job
+
+
+async def extract_async(job: Job) -> Job:
+    """Decode the audio of the video in an FFmpeg subprocess."""
+    if job.speech_map is not None:
+        return job
+
+    if job.audio_only or config.keep_audio_files:
+        return await asyncio.to_thread(extract, job)
+
+    job.audio = await job.processor.load_audio_async()
+    return job
+
+
+def transcribe(job: Job) -> Job:
+    """
+    Transcribe the audio and stream the segments into the SRT and SSML files.
+
+    Both files are written in the same pass as the inference, so SSML
+    conversion needs no stage of its own. When the subtitles are translated the
+    SSML is left to the translate stage. Checkpointed jobs also record every
+    segment as it is produced, and a retry resumes the inference after the last
+    recorded segment. With batch workers configured, concurrent short clips
+    share one model decoding several of them at once. The model, beam size and precision
+    come from the quality tier the policy picks for the job. When enabled, the
+    SRT cues are rebuilt from the word timings, which are also exported to
+    JSON; the SSML keeps the transcribed segments.
+    """
+    _select_tier(job)
+    job.language, segments = _transcribe_segments(job)
+
+    job.subtitle_path = job.processor.subtitle_path(job.language, job.workspace)
+    job.ssml_path = None
+    job.words_path = None
+
+    srt_sink = SrtSink(job.subtitle_path)
+    if config.resegment_subtitles:
+        srt_sink = ResegmentingSink(srt_sink, CaptionLimits.from_config())
+
+    timed_sinks = [("srt", TimedSink(srt_sink), job.subtitle_path)]
+    if config.export_word_timestamps:
+        job.words_path = job.processor.words_path(job.language, job.workspace)
+        words_sink = WordJsonSink(job.words_path, job.language)
+        timed_sinks.append(("words", TimedSink(words_sink), job.words_path))
+    if not _target_locales(job):
+        job.ssml_path = _ssml_path(job)
+        converter = _ssml_converter(job.subtitle_path, job.ssml_path, job.language)
+        timed_sinks.append(("ssml", TimedSink(converter.sink()), job.ssml_path))
+
+    sinks = [sink for _, sink, _ in timed_sinks]
+    if job.checkpoint is not None:
+        sinks.append(SegmentCheckpointSink(_segments_path(job), job.language))
+
+    broadcast(segments, sinks)
+
+    if job.tracker is not None:
+        for name, sink, path in timed_sinks:
+            job.tracker.add_stage(
+                name,
+                COMPLETED,
+                sink.started_at,
+                sink.finished_at,
+                size_bytes=file_size(path),
+                duration_ms=round(sink.elapsed * 1000),
+            )
+
+    job.audio = None
+    return job
+
+
+def _select_tier(job: Job) -> None:
+    time_left = None if job.deadline is None else job.deadline - time.time()
+    decision = tier_policy.select(
+        duration=_audio_duration(job),
+        queue_depth=job.queue_depth,
+        time_left=time_left,
+        locale=_source_language(job),
+    )
+
+    job.tier = decision.tier
+    job.model_name = decision.tier.model_name
+
+    message = (
+        f"Transcribing {job.source} with the {job.tier.name} tier ({job.model_name})"
+    )
+    if decision.reasons:
+        message += f", downgraded for {', '.join(decision.reasons)}"
+    logger.info(message)
+
+    if job.tracker is not None:
+        job.tracker.record_tier(job.tier.name, job.model_name)
+
+
+def _audio_duration(job: Job) -> Optional[float]:
+    if isinstance(job.audio, np.ndarray):
+        return len(job.audio) / SAMPLE_RATE
+
+    try:
+        return job.processor.ffmpeg_processor.probe_duration(job.audio)
+    except RuntimeError as e:
+        logger.warning(f"Unknown duration of {job.audio}: {e}")
+        return None
+
+
+def _transcribe_segments(job: Job) -> Tuple[str, Iterable]:
+    options = {
+        "model_name": job.model_name,
+        "compute_type": job.tier.compute_type,
+        "beam_size": job.tier.beam_size,
+        "chunk_workers": config.transcribe_chunk_workers,
+    }
+
+    speech_map = job.speech_map
+    if speech_map is not None:
+        if not len(job.audio):
+            logger.info(f"No speech found in {job.source}")
+            return _source_language(job), []
+        options["speech"] = speech_map.compacted_regions()
+
+    language, done = (None, [])
+    if job.checkpoint is not None:
+        language, done = read_segment_checkpoint(_segments_path(job))
+
+    if not done and _batched(job):
+        transcriber = get_batch_transcriber(
+            job.model_name,
+            num_workers=config.transcribe_batch_workers,
+            cache=transcription_cache,
+            beam_size=job.tier.beam_size,
+            compute_type=job.tier.compute_type,
+        )
+        language, segments = transcriber.submit(
+            job.audio, _source_language(job)
+        ).result()
+        return language, _source_timeline(job, segments)
+
+    if not done:
+        language, segments = job.processor.transcribe(
+            audio=job.audio,
+            language=_source_language(job),
+            cache=transcription_cache,
+            **options,
+        )
+        return language, _source_timeline(job, segments)
+
+    offset = done[-1].end
+    logger.info(f"Resuming the transcription of {job.source} at {offset:.1f}s")
+
+    audio = job.audio
+    if isinstance(audio, str):
+        audio = decode_audio(audio, sampling_rate=SAMPLE_RATE)
+
+    if speech_map is not None:
+        offset = speech_map.compact_time(offset)
+        options.pop("speech")
+
+    _, remaining = job.processor.transcribe(
+        audio=audio[int(offset * SAMPLE_RATE) :],
+        language=language,
+        **options,
+    )
+    return language, chain(
+        done,
+        _source_timeline(
+            job, (Segment.from_whisper(segment, offset) for segment in remaining)
+        ),
+    )
+
+
+def _batched(job: Job) -> bool:
+    """
+    Short clips share the batch model; long ones keep chunking and streaming.
+
+    The batch path materializes every segment before returning, which only
+    pays off for clips that decode quickly.
+    """
+    if config.transcribe_batch_workers <= 1:
+        return False
+
+    duration = _audio_duration(job)
+    return duration is not None and duration <= config.transcribe_batch_max_minutes * 60
+
+
+def _source_timeline(job: Job, segments: Iterable) -> Iterable:
+    """Move segments transcribed from speech-only audio back to the original timestamps."""
+    if job.speech_map is None:
+        return segments
+    return (job.speech_map.restore(Segment.from_whisper(s)) for s in segments)
+
+
+def _segments_path(job: Job) -> str:
+    return os.path.join(job.workspace, SEGMENTS_FILE)
+
+
+def translate(job: Job) -> Job:
+    """
+    Translate the subtitles to every target locale and convert them to SSML.
+
+    Does nothing unless the job lists locales or a translation language is
+    configured. All locales are produced from the single transcription in
+    parallel; within a locale repeated cues are translated once, cues found in
+    the phrase cache are not sent at all, and the rest is translated in
+    concurrent size-bounded batches. The first locale becomes the primary
+    subtitles of the job.
+    """
+    locales = _target_locales(job)
+    if not locales:
+        return job
+
+    track = SubtitleTrack.from_srt(job.subtitle_path)
+    suffixed = len(locales) > 1
+
+    with ThreadPoolExecutor(
+        max_workers=len(locales), thread_name_prefix="localize"
+    ) as executor:
+        job.localizations = list(
+            executor.map(
+                lambda locale: _localize(job, track, locale, suffixed), locales
+            )
+        )
+
+    primary = job.localizations[0]
+    job.language = primary.locale
+    job.subtitle_path = primary.subtitle_path
+    job.ssml_path = primary.ssml_path
+    return job
+
+
+def _target_locales(job: Job) -> List[str]:
+    if job.locales:
+        return job.locales
+    return [config.translation_language] if config.translation_language else []
+
+
+def _localize(
+    job: Job, track: SubtitleTrack, locale: str, suffixed: bool
+) -> Localization:
+    subtitle_path = job.subtitle_path
+
+    if locale != job.language:
+        translator = get_translator(
+            config.translation_backend,
+            workers=config.translation_workers,
+            max_batch_chars=config.translation_batch_chars,
+        )
+        track = track.with_texts(
+            translator.translate(track.texts, job.language, locale)
+        )
+
+        subtitle_path = job.processor.subtitle_path(locale, job.workspace)
+        with open(subtitle_path, "w", encoding="utf-8") as f:
+            f.write(track.to_srt())
+
+    ssml_path = _ssml_path(job, locale if suffixed else None)
+    converter = _ssml_converter(subtitle_path, ssml_path, locale)
+    utils.create_directory_for_file(ssml_path)
+    with open(ssml_path, "w", encoding="utf-8-sig") as f:
+        f.write(track.to_ssml(converter))
+
+    return Localization(locale, subtitle_path, ssml_path)
+
+
+def _ssml_path(job: Job, locale: Optional[str] = None) -> str:
+    ssml_filename = utils.get_file_name_without_extension(job.video_path)
+    if locale is not None:
+        ssml_filename += f".{locale}"
+    return config.ssml_directory + f"/{ssml_filename}.txt"
+
+
+def _ssml_converter(subtitle_path: str, ssml_path: str, locale: str) -> SSMLConverter:
+    return SSMLConverter(
+        srt_file=subtitle_path,
+        output_file=ssml_path,
+        voice_name=config.ssml_voice(locale),
+        language=config.ssml_language(locale),
+    )
+
+
+def synthesize(job: Job) -> Job:
+    """
+    Voice the subtitles and encode the speech for the mux stage.
+
+    Does nothing unless speech synthesis is enabled. The cues are voiced in
+    parallel worker processes, stretched to their durations and placed at their
+    start times; the assembled samples are piped straight into the encoder.
+    """
+    if not config.synthesize_speech:
+        return job
+
+    options = {}
+    if config.speech_engine == "coqui":
+        options["model_name"] = config.speech_model
+
+    synthesizer = get_speech_synthesizer(
+        config.speech_engine,
+        workers=config.speech_workers,
+        sample_rate=config.speech_sample_rate,
+        **options,
+    )
+
+    track = SubtitleTrack.from_srt(job.subtitle_path)
+    speech = synthesizer.synthesize(track.ssml_values())
+
+    job.speech_path = os.path.join(job.workspace, "speech.m4a")
+    job.processor.ffmpeg_processor.write_pcm(
+        speech, job.speech_path, sample_rate=synthesizer.sample_rate
+    )
+    return job
+
+
+def mux(job: Job) -> Job:
+    """
+    Add the subtitles to the video.
+
+    Every locale gets its own video, muxed in parallel, unless the job asks for
+    a single video carrying the subtitle tracks of all locales. Audio-only jobs
+    have no video and are left untouched.
+    """
+    if job.audio_only:
+        return job
+
+    if _muxes_per_locale(job):
+        with ThreadPoolExecutor(
+            max_workers=len(job.localizations), thread_name_prefix="mux"
+        ) as executor:
+            output_paths = list(
+                executor.map(
+                    lambda localization: job.processor.add_subtitle_to_video(
+                        **_mux_options(job, localization)
+                    ),
+                    job.localizations,
+                )
+            )
+    else:
+        output_paths = [job.processor.add_subtitle_to_video(**_mux_options(job))]
+
+    _set_output_paths(job, output_paths)
+    return job
+
+
+async def mux_async(job: Job) -> Job:
+    """Add the subtitles to the video in FFmpeg subprocesses, see ``mux``."""
+    if job.audio_only:
+        return job
+
+    if _muxes_per_locale(job):
+        output_paths = await asyncio.gather(
+            *(
+                job.processor.add_subtitle_to_video_async(
+                    **_mux_options(job, localization)
+                )
+                for localization in job.localizations
+            )
+        )
+    else:
+        output_paths = [
+            await job.processor.add_subtitle_to_video_async(**_mux_options(job))
+        ]
+
+    _set_output_paths(job, output_paths)
+    return job
+
+
+def _muxes_per_locale(job: Job) -> bool:
+    return len(job.localizations) > 1 and not job.multi_track
+
+
+def _set_output_paths(job: Job, output_paths: List[str]) -> None:
+    job.output_path = output_paths[0]
+    for index, localization in enumerate(job.localizations):
+        localization.output_path = output_paths[min(index, len(output_paths) - 1)]
+
+
+def record(job: Job) -> Job:
+    """
+    Store the title of the processed video on its streaming resource.
+
+    The resource itself is claimed by the download stage, so this is only
+    bookkeeping: a database error is logged and does not fail a job whose
+    output already exists.
+    """
+    try:
+        with Session(engine) as session:
+            resource, _ = get_or_create_resource(
+                session, url=normalize_url(job.source), title=job.title or ""
+            )
+            if job.title and resource.title != job.title:
+                update_resource(session, resource.id, title=job.title)
+    except SQLAlchemyError as e:
+        logger.warning(f"Failed to record {job.source}: {e}")
+    return job
+
+
+def run_job(job: Job) -> Job:
+    """
+    Run every stage of a job one after another in the calling thread.
+
+    The job must have a workspace, see ``utils.JobWorkspace``.
+    """
+    for name, handler in (
+        ("download", download),
+        ("detect", detect_language),
+        ("vad", detect_speech),
+        ("extract", extract),
+        ("transcribe", transcribe),
+        ("translate", translate),
+        ("synthesize", synthesize),
+        ("mux", mux),
+        ("record", record),
+    ):
+        job = pipeline_stage(name, handler)(job)
+    return job
+
+
+def pipeline_stage(name: str, handler: StageHandler) -> StageHandler:
+    """
+    Wrap a stage handler for a tracked, checkpointed job.
+
+    The stage is skipped when the job checkpoint already completed it, and its
+    timing and output size are recorded on the job tracker otherwise.
+    """
+    dump, restore = _STAGE_CHECKPOINTS[name]
+    return resumable(
+        name,
+        tracked(name, handler, measure=_STAGE_OUTPUT_SIZES.get(name)),
+        dump=dump,
+        restore=restore,
+    )
+
+
+def _audio_size(job: Job) -> Optional[int]:
+    if isinstance(job.audio, str):
+        return file_size(job.audio)
+    return None if job.audio is None else job.audio.nbytes
+
+
+_STAGE_OUTPUT_SIZES = {
+    "download": lambda job: file_size(job.video_path),
+    "vad": _audio_size,
+    "extract": _audio_size,
+    "translate": lambda job: file_size(job.subtitle_path),
+    "synthesize": lambda job: file_size(job.speech_path),
+    "mux": lambda job: sum(
+        file_size(path) or 0
+        for path in {job.output_path}
+        | {localization.output_path for localization in job.localizations}
+    ),
+}
+
+
+def _files_exist(*paths: Optional[str]) -> bool:
+    return all(path and os.path.exists(path) for path in paths)
+
+
+def _dump_download(job: Job) -> dict:
+    return {"title": job.title, "video_path": job.video_path}
+
+
+def _restore_download(job: Job, outputs: dict) -> Optional[Job]:
+    if not _files_exist(outputs["video_path"]):
+        return None
+
+    job.title = outputs["title"]
+    job.video_path = outputs["video_path"]
+    job.processor = WhisperVideoProcessor(job.video_path)
+    return job
+
+
+def _dump_detect(job: Job) -> dict:
+    return {"source_language": job.source_language}
+
+
+def _restore_detect(job: Job, outputs: dict) -> Optional[Job]:
+    job.source_language = outputs["source_language"]
+    return job
+
+
+def _audio_needed(job: Job) -> bool:
+    """Whether a resumed job still has to transcribe, the only stage reading the audio."""
+    return not job.checkpoint.completed("transcribe")
+
+
+def _dump_vad(job: Job) -> dict:
+    if job.speech_map is None:
+        return {"speech_map_path": None}
+    if not config.checkpoint_audio:
+        return {"speech_map_path": _speech_map_path(job), "audio_path": None}
+
+    audio_path = os.path.join(job.workspace, SPEECH_AUDIO_FILE)
+    np.save(audio_path, job.audio)
+    return {"speech_map_path": _speech_map_path(job), "audio_path": audio_path}
+
+
+def _restore_vad(job: Job, outputs: dict) -> Optional[Job]:
+    speech_map_path = outputs["speech_map_path"]
+    if speech_map_path is None:
+        return job
+    if not _files_exist(speech_map_path):
+        return None
+
+    audio_path = outputs["audio_path"]
+    if audio_path is None or not _files_exist(audio_path):
+        if _audio_needed(job):
+            return None
+    else:
+        job.audio = np.load(audio_path, mmap_mode="r")
+
+    job.speech_map = SpeechMap.load(speech_map_path)
+    return job
+
+
+def _dump_extract(job: Job) -> dict:
+    if job.speech_map is not None:
+        if not config.checkpoint_audio:
+            return {"audio_path": None}
+        return {"audio_path": os.path.join(job.workspace, SPEECH_AUDIO_FILE)}
+    if isinstance(job.audio, np.ndarray):
+        if not config.checkpoint_audio:
+            return {"audio_path": None}
+        audio_path = os.path.join(job.workspace, "audio.npy")
+        np.save(audio_path, job.audio)
+        return {"audio_path": audio_path}
+    return {"audio_path": job.audio}
+
+
+def _restore_extract(job: Job, outputs: dict) -> Optional[Job]:
+    audio_path = outputs["audio_path"]
+    if audio_path is None or not _files_exist(audio_path):
+        return None if _audio_needed(job) else job
+
+    if audio_path.endswith(".npy"):
+        job.audio = np.load(audio_path, mmap_mode="r")
+    else:
+        job.audio = audio_path
+    return job
+
+
+def _dump_subtitles(job: Job) -> dict:
+    return {
+        "language": job.language,
+        "subtitle_path": job.subtitle_path,
+        "ssml_path": job.ssml_path,
+        "words_path": job.words_path,
+    }
+
+
+def _restore_transcribe(job: Job, outputs: dict) -> Optional[Job]:
+    if not _files_exist(outputs["subtitle_path"]):
+        return None
+    if outputs["ssml_path"] is not None and not _files_exist(outputs["ssml_path"]):
+        return None
+    words_path = outputs.get("words_path")
+    if words_path is not None and not _files_exist(words_path):
+        return None
+
+    job.language = outputs["language"]
+    job.subtitle_path = outputs["subtitle_path"]
+    job.ssml_path = outputs["ssml_path"]
+    job.words_path = words_path
+    job.audio = None
+    return job
+
+
+def _dump_translate(job: Job) -> dict:
+    return {
+        **_dump_subtitles(job),
+        "localizations": [asdict(localization) for localization in job.localizations],
+    }
+
+
+def _restore_translate(job: Job, outputs: dict) -> Optional[Job]:
+    localizations = [Localization(**value) for value in outputs["localizations"]]
+    paths = [(value.subtitle_path, value.ssml_path) for value in localizations]
+    if not _files_exist(*chain.from_iterable(paths)):
+        return None
+
+    job.language = outputs["language"]
+    job.subtitle_path = outputs["subtitle_path"]
+    job.ssml_path = outputs["ssml_path"]
+    job.words_path = outputs.get("words_path")
+    job.localizations = localizations
+    return job
+
+
+def _dump_synthesize(job: Job) -> dict:
+    return {"speech_path": job.speech_path}
+
+
+def _restore_synthesize(job: Job, outputs: dict) -> Optional[Job]:
+    speech_path = outputs["speech_path"]
+    if speech_path is not None and not _files_exist(speech_path):
+        return None
+
+    job.speech_path = speech_path
+    return job
+
+
+def _dump_mux(job: Job) -> dict:
+    return {
+        "output_paths": [job.output_path]
+        + [localization.output_path for localization in job.localizations]
+    }
+
+
+def _restore_mux(job: Job, outputs: dict) -> Optional[Job]:
+    output_paths = outputs["output_paths"]
+    if not _files_exist(*filter(None, output_paths)):
+        return None
+
+    job.output_path = output_paths[0]
+    for localization, output_path in zip(job.localizations, output_paths[1:]):
+        localization.output_path = output_path
+    return job
+
+
+_STAGE_CHECKPOINTS = {
+    "download": (_dump_download, _restore_download),
+    "detect": (_dump_detect, _restore_detect),
+    "vad": (_dump_vad, _restore_vad),
+    "extract": (_dump_extract, _restore_extract),
+    "transcribe": (_dump_subtitles, _restore_transcribe),
+    "translate": (_dump_translate, _restore_translate),
+    "synthesize": (_dump_synthesize, _restore_synthesize),
+    "mux": (_dump_mux, _restore_mux),
+    "record": (lambda job: {}, lambda job, outputs: job),
+}
+
+
+def _mux_options(job: Job, localization: Optional[Localization] = None) -> dict:
+    """
+    The arguments of ``add_subtitle_to_video`` for the primary video, or for the
+    video of one locale. The voice-over speaks the primary locale, so it is only
+    added to the video carrying the primary subtitles.
+    """
+    options = {
+        "embedded_subtitles": config.burn_in_subtitles,
+        "subtitle_file_path": job.subtitle_path,
+        "subtitle_language": job.language,
+        "output_directory": config.results_directory,
+        "burn_in_options": BurnInOptions(
+            preset=config.burn_in_preset,
+            crf=config.burn_in_crf,
+            threads=config.burn_in_threads,
+        ),
+        "audio_tracks": [job.speech_path] if job.speech_path else [],
+    }
+
+    if localization is not None:
+        options["subtitle_file_path"] = localization.subtitle_path
+        options["subtitle_language"] = localization.locale
+        options["output_filename"] = (
+            f"{job.processor.input_filename}.{localization.locale}.mp4"
+        )
+        if localization is not job.localizations[0]:
+            options["audio_tracks"] = []
+    elif job.multi_track:
+        options["extra_subtitles"] = [
+            (other.subtitle_path, other.locale) for other in job.localizations[1:]
+        ]
+
+    return options
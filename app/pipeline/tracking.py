@@ -0,0 +1,246 @@
+import functools
+import inspect
+import os
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Iterator, Optional
+from uuid import UUID
+
+from sqlalchemy.engine import Engine
+from sqlmodel import Session
+
+from app.database.base import engine as default_engine
+from app.database.operations import (
+    add_job_stage,
+    create_job,
+    finish_job,
+    set_job_tier,
+)
+from app.logger import get_logger
+from app.pipeline.orchestrator import StageHandler
+
+logger = get_logger(__name__)
+
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+
+def file_size(path: Optional[str]) -> Optional[int]:
+    """Return the size of a file in bytes, or None if there is no such file."""
+    if not isinstance(path, str):
+        return None
+
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return None
+
+
+class StageRecord:
+    """
+    The measurements of a stage while it runs.
+
+    Attributes:
+        name (str): The name of the stage.
+        size_bytes (Optional[int]): The size of the stage output, set by the stage.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.size_bytes: Optional[int] = None
+
+
+class JobTracker:
+    """
+    Records a job and the timings of its stages in the database.
+
+    Tracking is best effort: a failing database write is logged and never fails
+    the job itself.
+
+    Attributes:
+        source (str): The URL of the processed video.
+        worker_id (str): The worker processing the job.
+        job_id (Optional[UUID]): The id of the ProcessingJob row once started.
+    """
+
+    def __init__(self, source: str, worker_id: str, engine: Engine = default_engine):
+        self.source = source
+        self.worker_id = worker_id
+        self.job_id: Optional[UUID] = None
+        self._engine = engine
+
+    def start(self, model_name: Optional[str] = None) -> None:
+        """Insert the ProcessingJob row."""
+        with self._session() as session:
+            if session is not None:
+                job = create_job(session, self.source, self.worker_id, model_name)
+                self.job_id = job.id
+
+    @contextmanager
+    def run(self, model_name: Optional[str] = None) -> Iterator["JobTracker"]:
+        """
+        Record the enclosed block as the whole job.
+
+        Args:
+            model_name (Optional[str], optional): The Whisper model used by the job. Defaults to None.
+
+        Yields:
+            JobTracker: The tracker itself.
+        """
+        self.start(model_name)
+
+        try:
+            yield self
+        except BaseException as e:
+            self.finish(FAILED, error=str(e) or type(e).__name__)
+            raise
+
+        self.finish(COMPLETED)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageRecord]:
+        """
+        Time the enclosed block as a stage of the job.
+
+        The stage is recorded as failed if the block raises, and the exception
+        is propagated.
+
+        Args:
+            name (str): The name of the stage.
+
+        Yields:
+            StageRecord: The record the block fills in.
+        """
+        record = StageRecord(name)
+        started_at = datetime.now()
+        status = FAILED
+
+        try:
+            yield record
+            status = COMPLETED
+        finally:
+            self.add_stage(
+                name,
+                status,
+                started_at,
+                datetime.now(),
+                size_bytes=record.size_bytes,
+            )
+
+    def add_stage(
+        self,
+        name: str,
+        status: str,
+        started_at: datetime,
+        finished_at: datetime,
+        size_bytes: Optional[int] = None,
+        duration_ms: Optional[int] = None,
+    ) -> None:
+        """
+        Insert a ProcessingStage row for the job.
+
+        Args:
+            name (str): The name of the stage.
+            status (str): Either ``completed`` or ``failed``.
+            started_at (datetime): When the stage started.
+            finished_at (datetime): When the stage finished.
+            size_bytes (Optional[int], optional): The size of the stage output. Defaults to None.
+            duration_ms (Optional[int], optional): The time actually spent in the stage, when it
+                was interleaved with other work. Defaults to the wall time between start and finish.
+        """
+        if self.job_id is None:
+            return
+
+        with self._session() as session:
+            if session is not None:
+                add_job_stage(
+                    session,
+                    self.job_id,
+                    name,
+                    status,
+                    started_at,
+                    finished_at,
+                    size_bytes=size_bytes,
+                    duration_ms=duration_ms,
+                )
+
+    def record_tier(self, tier: str, model_name: str) -> None:
+        """Record the quality tier chosen for the job and the model it runs."""
+        if self.job_id is None:
+            return
+
+        with self._session() as session:
+            if session is not None:
+                set_job_tier(session, self.job_id, tier, model_name)
+
+    def finish(
+        self,
+        status: str,
+        model_name: Optional[str] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        """Mark the job as completed or failed."""
+        if self.job_id is None:
+            return
+
+        with self._session() as session:
+            if session is not None:
+                finish_job(session, self.job_id, status, model_name, error)
+
+    @contextmanager
+    def _session(self) -> Iterator[Optional[Session]]:
+        try:
+            with Session(self._engine) as session:
+                yield session
+        except Exception as e:
+            logger.exception(f"Failed to record job {self.source}: {e}")
+
+
+def tracked(
+    name: str,
+    handler: StageHandler,
+    measure: Optional[Callable[[Any], Optional[int]]] = None,
+) -> StageHandler:
+    """
+    Wrap a stage handler so that it records its timing on ``job.tracker``.
+
+    The wrapper keeps the handler sync or async, so the pipeline still runs it
+    on the event loop or in the thread pool accordingly. Jobs without a tracker
+    pass through untouched.
+
+    Args:
+        name (str): The name of the stage.
+        handler (StageHandler): The stage handler receiving and returning a job.
+        measure (Callable, optional): Returns the output size of the stage from the job.
+
+    Returns:
+        StageHandler: The wrapped handler.
+    """
+
+    def measured(record: StageRecord, job: Any) -> Any:
+        if measure is not None:
+            record.size_bytes = measure(job)
+        return job
+
+    if inspect.iscoroutinefunction(handler):
+
+        @functools.wraps(handler)
+        async def run_async(job):
+            if getattr(job, "tracker", None) is None:
+                return await handler(job)
+
+            with job.tracker.stage(name) as record:
+                return measured(record, await handler(job))
+
+        return run_async
+
+    @functools.wraps(handler)
+    def run(job):
+        if getattr(job, "tracker", None) is None:
+            return handler(job)
+
+        with job.tracker.stage(name) as record:
+            return measured(record, handler(job))
+
+    return run
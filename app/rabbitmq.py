@@ -1,3 +1,8 @@
+import functools
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, List, Optional, Tuple
+
 import pika
 
 from app.config import rabbitmq_config as config
@@ -24,9 +29,10 @@ class RabbitMQService:
             credentials=credentials,
         )
 
-        connection = pika.BlockingConnection(connection_params)
+        self.connection = pika.BlockingConnection(connection_params)
 
-        self.channel = connection.channel()
+        self.channel = self.connection.channel()
+        self.backlog = 0
 
     def send_message(self, message, queue_name=TASK_TOPIC):
         try:
@@ -42,6 +48,21 @@ class RabbitMQService:
         except Exception as e:
             logger.exception("Error sending message via RabbitMQ: ", e)
 
+    def queue_depth(self, queue_name=TASK_TOPIC) -> int:
+        """
+        Count the messages waiting in a queue, not including the ones delivered to consumers.
+
+        Must be called from the thread owning the connection, e.g. a consumer callback.
+        """
+        declared = self.channel.queue_declare(queue=queue_name, passive=True)
+        return declared.method.message_count
+
+    def _refresh_backlog(self, queue_name) -> None:
+        try:
+            self.backlog = self.queue_depth(queue_name)
+        except Exception as e:
+            logger.warning(f"Failed to read the depth of queue '{queue_name}': {e}")
+
     def consume_message(self, external_callback):
         try:
             self.channel.queue_declare(queue=TASK_TOPIC)
@@ -60,8 +81,214 @@ class RabbitMQService:
         except Exception as e:
             logger.exception("Error RabbitMQ consuming messages: ", e)
 
+    def consume_concurrently(
+        self,
+        external_callback,
+        prefetch_count=None,
+        max_workers=None,
+        queue_name=TASK_TOPIC,
+    ):
+        """
+        Consume messages with a bounded pool of worker threads.
+
+        At most ``prefetch_count`` unacknowledged messages are delivered to this
+        consumer. Every message is handed to the worker pool, so the pika I/O loop
+        keeps serving heartbeats while the callbacks run. ``backlog`` is refreshed
+        with the depth of the queue on every delivery. A message is acknowledged
+        only after the callback returns; a failing message is requeued once and
+        rejected when it fails again after redelivery.
+
+        Args:
+            external_callback (Callable[[bytes], None]): The function processing a message body.
+            prefetch_count (int, optional): The number of unacknowledged messages to prefetch.
+                Defaults to ``RABBITMQ_PREFETCH_COUNT``.
+            max_workers (int, optional): The number of messages processed concurrently.
+                Defaults to ``RABBITMQ_WORKERS``.
+            queue_name (str, optional): The queue to consume from. Defaults to ``TASKS``.
+        """
+        max_workers = max_workers or config.WORKERS
+        prefetch_count = prefetch_count or config.PREFETCH_COUNT or max_workers
+
+        try:
+            self.channel.queue_declare(queue=queue_name)
+            self.channel.basic_qos(prefetch_count=prefetch_count)
+
+            with ThreadPoolExecutor(
+                max_workers=max_workers,
+                thread_name_prefix="rabbitmq-worker",
+            ) as executor:
+
+                def callback(ch, method, properties, body):
+                    self._refresh_backlog(queue_name)
+                    future = executor.submit(external_callback, body)
+                    future.add_done_callback(
+                        functools.partial(self._settle_message, ch, method)
+                    )
+
+                self.channel.basic_consume(
+                    queue=queue_name,
+                    on_message_callback=callback,
+                    auto_ack=False,
+                )
+
+                logger.info(
+                    f"Waiting for messages with {max_workers} workers "
+                    f"(prefetch {prefetch_count}). To exit, press CTRL+C"
+                )
+                self.channel.start_consuming()
+        except Exception as e:
+            logger.exception(f"Error RabbitMQ consuming messages: {e}")
+
+    def consume_batches(
+        self,
+        external_callback,
+        max_batch: Optional[int] = None,
+        window_ms: Optional[int] = None,
+        prefetch_count=None,
+        queue_name=TASK_TOPIC,
+    ):
+        """
+        Consume messages in batches accumulated over a short time window.
+
+        A batch is dispatched once it holds ``max_batch`` messages or ``window_ms``
+        after its first message arrived, whichever comes first. The callback
+        starts every message of the batch at once and returns a future for each;
+        a message is settled as soon as its own future completes, like in
+        ``consume_concurrently``, so it does not wait for the slowest one.
+
+        Args:
+            external_callback (Callable[[List[bytes]], Sequence[Future]]):
+                Starts processing the bodies of a batch without blocking and returns
+                their futures in order. If it raises, every message of the batch fails.
+            max_batch (int, optional): The largest batch. Defaults to ``RABBITMQ_BATCH_SIZE``.
+            window_ms (int, optional): The longest wait for a batch to fill up in
+                milliseconds. Defaults to ``RABBITMQ_BATCH_WINDOW_MS``.
+            prefetch_count (int, optional): The number of unacknowledged messages to prefetch.
+                Defaults to ``RABBITMQ_PREFETCH_COUNT``, or two batches.
+            queue_name (str, optional): The queue to consume from. Defaults to ``TASKS``.
+        """
+        max_batch = max_batch or config.BATCH_SIZE
+        window_ms = config.BATCH_WINDOW_MS if window_ms is None else window_ms
+        prefetch_count = prefetch_count or config.PREFETCH_COUNT or 2 * max_batch
+
+        pending: List[Tuple[Any, Any, bytes]] = []
+        timer = None
+
+        def dispatch():
+            nonlocal timer
+            if timer is not None:
+                self.connection.remove_timeout(timer)
+                timer = None
+            if not pending:
+                return
+
+            batch = pending[:]
+            pending.clear()
+            self._start_batch(external_callback, batch)
+
+        def on_timeout():
+            nonlocal timer
+            timer = None
+            dispatch()
+
+        def callback(ch, method, properties, body):
+            nonlocal timer
+            self._refresh_backlog(queue_name)
+            pending.append((ch, method, body))
+            if len(pending) >= max_batch:
+                dispatch()
+            elif timer is None:
+                timer = self.connection.call_later(window_ms / 1000, on_timeout)
+
+        try:
+            self.channel.queue_declare(queue=queue_name)
+            self.channel.basic_qos(prefetch_count=prefetch_count)
+            self.channel.basic_consume(
+                queue=queue_name,
+                on_message_callback=callback,
+                auto_ack=False,
+            )
+
+            logger.info(
+                f"Waiting for batches of up to {max_batch} messages within "
+                f"{window_ms} ms (prefetch {prefetch_count}). To exit, press CTRL+C"
+            )
+            self.channel.start_consuming()
+            dispatch()
+        except Exception as e:
+            logger.exception(f"Error RabbitMQ consuming messages: {e}")
+
+    def _start_batch(
+        self, external_callback, batch: List[Tuple[Any, Any, bytes]]
+    ) -> None:
+        """
+        Hand a batch to the callback and settle each message once its future completes.
+        """
+        try:
+            futures = external_callback([body for _, _, body in batch])
+        except Exception as e:
+            for channel, method, _ in batch:
+                self._settle(channel, method, e)
+            return
+
+        for (channel, method, _), future in zip(batch, futures):
+            future.add_done_callback(
+                functools.partial(self._settle_message, channel, method)
+            )
+
+    def stop_when(self, event: threading.Event, interval: float = 0.5) -> None:
+        """
+        Stop consuming once ``event`` is set.
+
+        The event is polled on the connection thread, the only one allowed to
+        touch the channel, so another thread can end ``start_consuming`` by
+        setting it.
+
+        Args:
+            event (threading.Event): Set by the thread requesting the stop.
+            interval (float, optional): Seconds between two checks of the event. Defaults to 0.5.
+        """
+
+        def poll():
+            if event.is_set():
+                logger.info("Stopping the consumer")
+                self.channel.stop_consuming()
+            else:
+                self.connection.call_later(interval, poll)
+
+        self.connection.call_later(interval, poll)
+
+    def _settle_message(self, channel, method, future: Future) -> None:
+        """
+        Acknowledge or reject a processed message from the connection thread.
+        """
+        self._settle(channel, method, future.exception())
+
+    def _settle(self, channel, method, exception: Optional[BaseException]) -> None:
+        if exception is None:
+            settle = functools.partial(
+                channel.basic_ack, delivery_tag=method.delivery_tag
+            )
+        else:
+            requeue = not method.redelivered
+            logger.error(
+                f"Message {method.delivery_tag} failed (requeue={requeue}): {exception}"
+            )
+            settle = functools.partial(
+                channel.basic_nack,
+                delivery_tag=method.delivery_tag,
+                requeue=requeue,
+            )
+
+        def settle_if_open():
+            if channel.is_open:
+                settle()
+
+        self.connection.add_callback_threadsafe(settle_if_open)
+
     def close_connection(self):
         self.channel.close()
+        self.connection.close()
         logger.info("RabbitMQ connection closed.")
 
 
@@ -74,5 +301,5 @@ class RabbitMQContext:
 
     def __exit__(self, exc_type, exc_value, traceback):
         if exc_type:
-            logger.exception("RabbitMQ error occurred: ", exc_value)
-        self.server.close_connection()
+            logger.exception(f"RabbitMQ error occurred: {exc_value}")
+        self.service.close_connection()
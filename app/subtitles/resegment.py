@@ -0,0 +1,211 @@
+import re
+from dataclasses import dataclass
+from typing import Any, Iterable, Iterator, List, Optional
+
+from app.config import config
+from app.subtitles.sinks import SegmentSink
+from app.transcriber.segments import Segment, Word
+
+SENTENCE_END = re.compile(r"[.!?…。！？]['\")\]]*$")
+
+
+@dataclass
+class CaptionLimits:
+    """
+    The constraints every rebuilt cue satisfies.
+
+    Attributes:
+        max_line_chars (int): The longest line in characters.
+        max_lines (int): The number of lines of a cue.
+        max_duration (float): The longest time a cue stays on screen in seconds.
+        min_duration (float): The shortest time a cue stays on screen, when the next cue allows it.
+        max_chars_per_second (float): The fastest reading speed; cues are held longer
+            to meet it when the next cue allows it.
+        max_pause (float): The longest silence within a cue in seconds.
+        min_gap (float): The time left between a cue and the next one in seconds.
+    """
+
+    max_line_chars: int = 42
+    max_lines: int = 2
+    max_duration: float = 7.0
+    min_duration: float = 1.0
+    max_chars_per_second: float = 17.0
+    max_pause: float = 1.0
+    min_gap: float = 0.08
+
+    @classmethod
+    def from_config(cls) -> "CaptionLimits":
+        """Build the limits from the CAPTION_* settings."""
+        return cls(
+            max_line_chars=config.caption_max_line_chars,
+            max_lines=config.caption_max_lines,
+            max_duration=config.caption_max_duration,
+            min_duration=config.caption_min_duration,
+            max_chars_per_second=config.caption_max_chars_per_second,
+        )
+
+
+class _Cue:
+    """A cue being filled with words, wrapped into lines as they arrive."""
+
+    def __init__(self, word: Word):
+        self.words = [word]
+        self.lines = [word.word.strip()]
+
+    @property
+    def start(self) -> float:
+        return self.words[0].start
+
+    @property
+    def end(self) -> float:
+        return self.words[-1].end
+
+    @property
+    def chars(self) -> int:
+        return sum(len(line) for line in self.lines)
+
+    def wrapped(self, word: Word, max_line_chars: int) -> List[str]:
+        """
+        The lines after appending a word, wrapping it onto a new line when needed.
+
+        Whisper words carry their leading space, so words of languages written
+        without spaces are joined as they are.
+        """
+        line = self.lines[-1] + word.word
+        if len(line) <= max_line_chars:
+            return self.lines[:-1] + [line]
+        return self.lines + [word.word.strip()]
+
+    def add(self, word: Word, lines: List[str]) -> None:
+        self.words.append(word)
+        self.lines = lines
+
+    def to_segment(self, end: float) -> Segment:
+        return Segment(
+            start=self.start, end=end, text="\n".join(self.lines), words=self.words
+        )
+
+
+def resegment(words: Iterable[Word], limits: CaptionLimits) -> Iterator[Segment]:
+    """
+    Rebuild cues from word timings under the given limits.
+
+    Words are taken greedily: a word joins the current cue unless it would break
+    a line, line count, duration or pause limit, and a cue is also closed after
+    the end of a sentence once it lasted ``min_duration``. Closed cues are then
+    held on screen long enough to satisfy ``min_duration`` and the reading
+    speed, without running into the next cue. Every word is looked at once, so
+    the cost is linear in the number of words.
+
+    Args:
+        words (Iterable[Word]): The timed words in order, e.g. of every transcribed segment.
+        limits (CaptionLimits): The constraints of the cues.
+
+    Yields:
+        Segment: The rebuilt cues with their lines joined by newlines and their words.
+    """
+    cue: Optional[_Cue] = None
+    pending: Optional[_Cue] = None
+
+    def release(following_start: Optional[float]) -> Iterator[Segment]:
+        nonlocal pending
+        if pending is not None:
+            yield pending.to_segment(_hold(pending, following_start, limits))
+            pending = None
+
+    for word in words:
+        if not word.word.strip():
+            continue
+
+        if cue is None:
+            cue = _Cue(word)
+            continue
+
+        lines = cue.wrapped(word, limits.max_line_chars)
+        fits = (
+            len(lines) <= limits.max_lines
+            and word.end - cue.start <= limits.max_duration
+            and word.start - cue.end <= limits.max_pause
+            and not (
+                SENTENCE_END.search(cue.lines[-1])
+                and cue.end - cue.start >= limits.min_duration
+            )
+        )
+
+        if fits:
+            cue.add(word, lines)
+            continue
+
+        yield from release(cue.start)
+        pending, cue = cue, _Cue(word)
+
+    yield from release(cue.start if cue is not None else None)
+    if cue is not None:
+        pending = cue
+        yield from release(None)
+
+
+def _hold(cue: _Cue, following_start: Optional[float], limits: CaptionLimits) -> float:
+    """The end of a cue extended to meet the minimum duration and reading speed."""
+    wanted = max(
+        limits.min_duration,
+        cue.chars / limits.max_chars_per_second,
+    )
+    end = max(cue.end, min(cue.start + wanted, cue.start + limits.max_duration))
+    if following_start is not None:
+        end = min(end, max(cue.end, following_start - limits.min_gap))
+    return end
+
+
+class ResegmentingSink(SegmentSink):
+    """
+    Rebuilds the cues of the segments it receives before handing them to another sink.
+
+    Segments are split into words as they arrive, so the cues stream through in
+    the same single pass as the transcription. Segments without word timings
+    are passed through as they are.
+    """
+
+    def __init__(self, sink: SegmentSink, limits: CaptionLimits):
+        self.sink = sink
+        self.limits = limits
+        self._words: List[Word] = []
+
+    def write(self, segment: Any) -> None:
+        if not segment.words:
+            self._flush(final=True)
+            self.sink.write(segment)
+            return
+
+        self._words.extend(
+            Word(word.start, word.end, word.word, word.probability)
+            for word in segment.words
+        )
+        self._flush(final=False)
+
+    def close(self) -> None:
+        try:
+            self._flush(final=True)
+        finally:
+            self.sink.close()
+
+    def _flush(self, final: bool) -> None:
+        """
+        Emit the cues that can no longer change.
+
+        Unless no more words will arrive, the cue holding the last word is kept,
+        as later words may still join it. The words of the emitted cues are
+        dropped, so every word is buffered for at most one cue.
+        """
+        if not self._words:
+            return
+
+        cues = list(resegment(self._words, self.limits))
+        if not final:
+            cues = cues[:-1]
+
+        for cue in cues:
+            self.sink.write(cue)
+
+        consumed = sum(len(cue.words) for cue in cues)
+        self._words = self._words[consumed:]
@@ -0,0 +1,103 @@
+import time
+from datetime import datetime
+from typing import Any, Iterable, Optional, Sequence
+
+from app.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class SegmentSink:
+    """
+    A consumer of transcription segments.
+
+    Sinks receive segments one at a time as they are produced, so a single pass
+    over a lazy transcription can feed several outputs at once.
+
+    Methods:
+        write(segment): Consumes the next segment.
+        close(): Finalizes the output once no more segments will arrive.
+    """
+
+    def write(self, segment: Any) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class TimedSink(SegmentSink):
+    """
+    Measures the time a sink spends writing its output.
+
+    Sinks fed by ``broadcast`` interleave with the transcription, so their cost
+    is the time spent inside ``write`` and ``close`` rather than the wall time.
+
+    Attributes:
+        sink (SegmentSink): The wrapped sink.
+        elapsed (float): Seconds spent in the wrapped sink.
+        started_at (Optional[datetime]): When the first segment was written.
+        finished_at (Optional[datetime]): When the sink was closed.
+    """
+
+    def __init__(self, sink: SegmentSink):
+        self.sink = sink
+        self.elapsed = 0.0
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+
+    def write(self, segment: Any) -> None:
+        if self.started_at is None:
+            self.started_at = datetime.now()
+
+        started = time.perf_counter()
+        try:
+            self.sink.write(segment)
+        finally:
+            self.elapsed += time.perf_counter() - started
+
+    def close(self) -> None:
+        started = time.perf_counter()
+        try:
+            self.sink.close()
+        finally:
+            self.elapsed += time.perf_counter() - started
+            self.finished_at = datetime.now()
+            self.started_at = self.started_at or self.finished_at
+
+
+def broadcast(segments: Iterable[Any], sinks: Sequence[SegmentSink]) -> int:
+    """
+    Fan the segments out to every sink in a single pass.
+
+    The segments are consumed exactly once; every sink sees each segment before
+    the next one is pulled from the iterable. All sinks are closed afterwards,
+    including when the iterable raises.
+
+    Args:
+        segments (Iterable[Any]): The segments, typically the lazy generator returned by ``transcribe``.
+        sinks (Sequence[SegmentSink]): The consumers of the segments.
+
+    Returns:
+        int: The number of segments broadcast.
+    """
+    count = 0
+    try:
+        for segment in segments:
+            for sink in sinks:
+                sink.write(segment)
+            count += 1
+    finally:
+        for sink in sinks:
+            try:
+                sink.close()
+            except Exception as e:
+                logger.exception(f"Failed to close {type(sink).__name__}: {e}")
+
+    return count
@@ -0,0 +1,176 @@
+import mmap
+import re
+from typing import Any, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+import app.utils as utils
+from app.subtitles.sinks import SegmentSink
+
+# A whole cue: an optional index line, the timing line and the text lines up to
+# the next blank line. Text lines stop early at the index or timing line of a
+# following cue, so cues missing their separating blank line are still split.
+CUE_PATTERN = re.compile(
+    rb"(?:^|(?<=\xef\xbb\xbf))"
+    rb"[ \t]*(?:(\d+)[ \t]*\r?\n)?"
+    rb"[ \t]*(\d+):(\d\d):(\d\d)[,.](\d{1,3})[ \t]*-->"
+    rb"[ \t]*(\d+):(\d\d):(\d\d)[,.](\d{1,3})[^\r\n]*(?:\r?\n|\Z)"
+    rb"((?:(?![ \t]*\d+[ \t]*\r?\n[ \t]*\d+:\d\d:\d\d)"
+    rb"(?![^\r\n]*-->)[ \t]*\S[^\r\n]*(?:\r?\n|\Z))*)",
+    re.MULTILINE,
+)
+
+
+class SrtSink(SegmentSink):
+    """
+    Writes segments to an SRT file as they arrive.
+
+    The file is flushed after every cue, so the subtitles transcribed so far can
+    be read while a long transcription is still running.
+    """
+
+    def __init__(self, output_file: str):
+        """
+        Initializes the SrtSink and opens the output file.
+
+        Args:
+            output_file (str): The path of the SRT file to write.
+        """
+        utils.create_directory_for_file(output_file)
+
+        self.output_file = output_file
+        self.count = 0
+        self._file = open(output_file, "w", encoding="utf-8")
+
+    def write(self, segment: Any) -> None:
+        self.count += 1
+
+        start = utils.format_time(segment.start)
+        end = utils.format_time(segment.end)
+        text = segment.text.strip()
+
+        self._file.write(f"{self.count}\n{start} --> {end}\n{text}\n\n")
+        self._file.flush()
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+
+
+class Cue:
+    """
+    A single subtitle cue.
+
+    Attributes:
+        index (Optional[int]): The cue number as written in the file, None when missing.
+        start_ms (int): The start of the cue in milliseconds.
+        end_ms (int): The end of the cue in milliseconds.
+        text (str): The text lines of the cue joined with newlines.
+    """
+
+    __slots__ = ("index", "start_ms", "end_ms", "text")
+
+    def __init__(self, index: Optional[int], start_ms: int, end_ms: int, text: str):
+        self.index = index
+        self.start_ms = start_ms
+        self.end_ms = end_ms
+        self.text = text
+
+    @property
+    def duration_ms(self) -> int:
+        return self.end_ms - self.start_ms
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, Cue):
+            return NotImplemented
+        return (self.index, self.start_ms, self.end_ms, self.text) == (
+            other.index,
+            other.start_ms,
+            other.end_ms,
+            other.text,
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"Cue(index={self.index}, start_ms={self.start_ms}, "
+            f"end_ms={self.end_ms}, text={self.text!r})"
+        )
+
+
+def _milliseconds(hours: bytes, minutes: bytes, seconds: bytes, fraction: bytes) -> int:
+    return ((int(hours) * 60 + int(minutes)) * 60 + int(seconds)) * 1000 + int(
+        fraction.ljust(3, b"0")
+    )
+
+
+def iter_cues(buffer: Union[bytes, mmap.mmap]) -> Iterator[Cue]:
+    """
+    Lazily parse the cues of an SRT document.
+
+    The whole buffer is tokenized by a single compiled regular expression, so the
+    document is scanned once. Cue numbers are informational only: missing,
+    duplicated or out-of-order numbers are kept as written and the cues are
+    yielded in file order. Anything that is not a cue is skipped.
+
+    Args:
+        buffer (Union[bytes, mmap.mmap]): The UTF-8 encoded SRT document.
+
+    Yields:
+        Cue: The cues in file order.
+    """
+    for match in CUE_PATTERN.finditer(buffer):
+        index, h1, m1, s1, f1, h2, m2, s2, f2, text = match.groups()
+
+        if b"\r" in text:
+            text = text.replace(b"\r", b"")
+
+        yield Cue(
+            index=int(index) if index is not None else None,
+            start_ms=_milliseconds(h1, m1, s1, f1),
+            end_ms=_milliseconds(h2, m2, s2, f2),
+            text="\n".join(
+                map(str.strip, text.decode("utf-8", errors="replace").split("\n"))
+            ).strip(),
+        )
+
+
+def read_cues(file_path: str, sort: bool = False) -> List[Cue]:
+    """
+    Parse an SRT file through a memory map.
+
+    Args:
+        file_path (str): The path of the SRT file.
+        sort (bool, optional): Order the cues by start time instead of file order.
+            Defaults to False.
+
+    Returns:
+        List[Cue]: The parsed cues.
+    """
+    with open(file_path, "rb") as f:
+        try:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            return []
+
+        with buffer:
+            cues = list(iter_cues(buffer))
+
+    if sort:
+        cues.sort(key=lambda cue: cue.start_ms)
+
+    return cues
+
+
+def cue_times(cues: List[Cue]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Collect the cue timings into arrays.
+
+    Args:
+        cues (List[Cue]): The cues.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The start and end times in milliseconds as int64 arrays.
+    """
+    starts = np.fromiter((cue.start_ms for cue in cues), np.int64, len(cues))
+    ends = np.fromiter((cue.end_ms for cue in cues), np.int64, len(cues))
+    return starts, ends
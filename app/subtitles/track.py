@@ -0,0 +1,405 @@
+import copy
+from typing import Any, Iterable, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from app.subtitles.srt import Cue, read_cues
+from app.transcriber.segments import Segment, Word
+
+
+def _offsets(strings: Sequence[str]) -> np.ndarray:
+    offsets = np.zeros(len(strings) + 1, dtype=np.int64)
+    np.cumsum([len(string) for string in strings], out=offsets[1:])
+    return offsets
+
+
+def _slices(buffer: str, offsets: np.ndarray) -> List[str]:
+    bounds = offsets.tolist()
+    return [buffer[start:end] for start, end in zip(bounds, bounds[1:])]
+
+
+def _timestamps(milliseconds: np.ndarray, separator: str) -> List[str]:
+    hours, rest = np.divmod(np.maximum(milliseconds, 0), 3_600_000)
+    minutes, rest = np.divmod(rest, 60_000)
+    seconds, milliseconds = np.divmod(rest, 1000)
+    return [
+        f"{h:02d}:{m:02d}:{s:02d}{separator}{ms:03d}"
+        for h, m, s, ms in zip(
+            hours.tolist(), minutes.tolist(), seconds.tolist(), milliseconds.tolist()
+        )
+    ]
+
+
+class SSMLValues(NamedTuple):
+    """The cues of a track column by column, as rendered into SSML and voiced."""
+
+    starts_ms: List[int]
+    ends_ms: List[int]
+    durations_ms: List[int]
+    texts: List[str]
+    breaks_ms: List[int]
+
+
+class SubtitleTrack:
+    """
+    A subtitle track stored column by column.
+
+    Cue timings are int64 millisecond arrays and the cue texts are slices of a
+    single string buffer, so retiming a track of any length is a couple of array
+    operations. Word timings, when known, are stored the same way, with
+    ``word_offsets`` delimiting the words of every cue.
+
+    Tracks are immutable; every operation returns a new track.
+
+    Attributes:
+        starts (np.ndarray): The start of every cue in milliseconds.
+        ends (np.ndarray): The end of every cue in milliseconds.
+        text (str): The texts of all cues concatenated.
+        text_offsets (np.ndarray): The bounds of every cue text in ``text``, one more than the cues.
+        word_starts (np.ndarray): The start of every word in milliseconds.
+        word_ends (np.ndarray): The end of every word in milliseconds.
+        word_probabilities (np.ndarray): The probability of every word.
+        word_text (str): The texts of all words concatenated.
+        word_text_offsets (np.ndarray): The bounds of every word in ``word_text``.
+        word_offsets (np.ndarray): The bounds of the words of every cue, one more than the cues.
+    """
+
+    def __init__(
+        self,
+        starts: Iterable[int],
+        ends: Iterable[int],
+        texts: Sequence[str],
+        words: Optional[Sequence[Sequence[Word]]] = None,
+    ):
+        """
+        Initializes the SubtitleTrack.
+
+        Args:
+            starts (Iterable[int]): The start of every cue in milliseconds.
+            ends (Iterable[int]): The end of every cue in milliseconds.
+            texts (Sequence[str]): The text of every cue.
+            words (Sequence[Sequence[Word]], optional): The words of every cue with their
+                timestamps in seconds. Defaults to no word timings.
+        """
+        self.starts = np.asarray(starts, dtype=np.int64)
+        self.ends = np.asarray(ends, dtype=np.int64)
+        self.text = "".join(texts)
+        self.text_offsets = _offsets(texts)
+
+        words = words if words is not None else [[] for _ in texts]
+        flat = [word for cue_words in words for word in cue_words]
+
+        self.word_starts = np.array(
+            [round(word.start * 1000) for word in flat], dtype=np.int64
+        )
+        self.word_ends = np.array(
+            [round(word.end * 1000) for word in flat], dtype=np.int64
+        )
+        self.word_probabilities = np.array(
+            [word.probability for word in flat], dtype=np.float32
+        )
+        self.word_text = "".join(word.word for word in flat)
+        self.word_text_offsets = _offsets([word.word for word in flat])
+        self.word_offsets = _offsets(words)
+
+    @classmethod
+    def from_segments(cls, segments: Iterable[Any]) -> "SubtitleTrack":
+        """
+        Build a track from transcription segments.
+
+        Args:
+            segments (Iterable[Any]): ``Segment`` objects or faster-whisper segments.
+
+        Returns:
+            SubtitleTrack: The track with one cue per segment.
+        """
+        segments = [
+            segment if isinstance(segment, Segment) else Segment.from_whisper(segment)
+            for segment in segments
+        ]
+        return cls(
+            [round(segment.start * 1000) for segment in segments],
+            [round(segment.end * 1000) for segment in segments],
+            [segment.text.strip() for segment in segments],
+            [segment.words for segment in segments],
+        )
+
+    @classmethod
+    def from_cues(cls, cues: Sequence[Cue]) -> "SubtitleTrack":
+        """Build a track from parsed SRT cues."""
+        return cls(
+            [cue.start_ms for cue in cues],
+            [cue.end_ms for cue in cues],
+            [cue.text for cue in cues],
+        )
+
+    @classmethod
+    def from_srt(cls, file_path: str) -> "SubtitleTrack":
+        """Read a track from an SRT file."""
+        return cls.from_cues(read_cues(file_path))
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    @property
+    def texts(self) -> List[str]:
+        """The text of every cue."""
+        return _slices(self.text, self.text_offsets)
+
+    @property
+    def has_words(self) -> bool:
+        return len(self.word_starts) > 0
+
+    @property
+    def durations(self) -> np.ndarray:
+        """The duration of every cue in milliseconds."""
+        return self.ends - self.starts
+
+    @property
+    def gaps(self) -> np.ndarray:
+        """The pause after every cue in milliseconds, 0 after the last one."""
+        gaps = np.zeros(len(self), dtype=np.int64)
+        gaps[:-1] = self.starts[1:] - self.ends[:-1]
+        return gaps
+
+    def words(self, index: int) -> List[Word]:
+        """The words of a cue with their timestamps in seconds."""
+        start, end = self.word_offsets[index : index + 2].tolist()
+        texts = _slices(self.word_text, self.word_text_offsets[start : end + 1])
+        return [
+            Word(start=s / 1000, end=e / 1000, word=text, probability=p)
+            for s, e, p, text in zip(
+                self.word_starts[start:end].tolist(),
+                self.word_ends[start:end].tolist(),
+                self.word_probabilities[start:end].tolist(),
+                texts,
+            )
+        ]
+
+    def cues(self) -> List[Cue]:
+        """The track as SRT cues numbered from 1."""
+        return [
+            Cue(index, start, end, text)
+            for index, (start, end, text) in enumerate(
+                zip(self.starts.tolist(), self.ends.tolist(), self.texts), start=1
+            )
+        ]
+
+    def segments(self) -> List[Segment]:
+        """The track as transcription segments, including the word timings."""
+        return [
+            Segment(
+                start=start / 1000,
+                end=end / 1000,
+                text=text,
+                words=self.words(index),
+            )
+            for index, (start, end, text) in enumerate(
+                zip(self.starts.tolist(), self.ends.tolist(), self.texts)
+            )
+        ]
+
+    def shift(self, offset_ms: int) -> "SubtitleTrack":
+        """Move every cue and word by ``offset_ms`` milliseconds."""
+        return self._retime(lambda times: times + offset_ms)
+
+    def scale(self, factor: float, origin_ms: int = 0) -> "SubtitleTrack":
+        """
+        Stretch the timeline around ``origin_ms``, e.g. by 25 / 23.976 to convert frame rates.
+        """
+        return self._retime(
+            lambda times: (
+                np.rint((times - origin_ms) * factor).astype(np.int64) + origin_ms
+            )
+        )
+
+    def with_texts(self, texts: Sequence[str]) -> "SubtitleTrack":
+        """
+        Replace the text of every cue, e.g. with its translation.
+
+        The cue timings are kept; the word timings belong to the old texts and are dropped.
+        """
+        if len(texts) != len(self):
+            raise ValueError(f"Expected {len(self)} texts, got {len(texts)}")
+
+        return SubtitleTrack(self.starts, self.ends, texts)
+
+    def merge_short(
+        self,
+        min_duration_ms: int,
+        max_gap_ms: int = 500,
+        separator: str = " ",
+    ) -> "SubtitleTrack":
+        """
+        Join cues shorter than ``min_duration_ms`` with the cue following them.
+
+        A cue is joined only when the pause before the following cue is at most
+        ``max_gap_ms``. Consecutive short cues are chained into a single cue.
+
+        Returns:
+            SubtitleTrack: The track with the short cues merged.
+        """
+        if len(self) < 2:
+            return self
+
+        joins = np.zeros(len(self), dtype=bool)
+        joins[:-1] = (self.durations[:-1] < min_duration_ms) & (
+            self.gaps[:-1] <= max_gap_ms
+        )
+
+        firsts = np.flatnonzero(np.concatenate(([True], ~joins[:-1])))
+        lasts = np.append(firsts[1:] - 1, len(self) - 1)
+
+        texts = self.texts
+        merged = [
+            separator.join(texts[first : last + 1])
+            for first, last in zip(firsts.tolist(), lasts.tolist())
+        ]
+
+        track = copy.copy(self)
+        track.starts = self.starts[firsts]
+        track.ends = np.maximum.reduceat(self.ends, firsts)
+        track.text = "".join(merged)
+        track.text_offsets = _offsets(merged)
+        track.word_offsets = np.append(self.word_offsets[firsts], self.word_offsets[-1])
+        return track
+
+    def split_long(self, max_duration_ms: int) -> "SubtitleTrack":
+        """
+        Split cues longer than ``max_duration_ms`` into pieces of equal duration.
+
+        Words are assigned to the piece containing their midpoint when word
+        timings are known, and spread evenly over the pieces otherwise. Pieces
+        left without any text are dropped.
+
+        Raises:
+            ValueError: If ``max_duration_ms`` is not positive.
+
+        Returns:
+            SubtitleTrack: The track with the long cues split.
+        """
+        if max_duration_ms <= 0:
+            raise ValueError(f"Expected a positive duration, got {max_duration_ms}")
+
+        pieces = np.maximum(1, -(-self.durations // max_duration_ms))
+        if np.all(pieces == 1):
+            return self
+
+        owners = np.repeat(np.arange(len(self)), pieces)
+        piece_index = np.arange(len(owners)) - np.repeat(
+            np.cumsum(pieces) - pieces, pieces
+        )
+        lengths = self.durations[owners] / pieces[owners]
+        starts = self.starts[owners] + np.rint(piece_index * lengths).astype(np.int64)
+        ends = self.starts[owners] + np.rint((piece_index + 1) * lengths).astype(
+            np.int64
+        )
+
+        word_pieces = self._word_pieces(pieces, lengths)
+        texts = self._piece_texts(pieces, word_pieces)
+
+        keep = np.array([bool(text) for text in texts], dtype=bool)
+        kept = [text for text, flag in zip(texts, keep.tolist()) if flag]
+
+        track = copy.copy(self)
+        track.starts = starts[keep]
+        track.ends = ends[keep]
+        track.text = "".join(kept)
+        track.text_offsets = _offsets(kept)
+
+        counts = np.bincount(word_pieces, minlength=len(owners))[keep]
+        track.word_offsets = np.zeros(len(kept) + 1, dtype=np.int64)
+        np.cumsum(counts, out=track.word_offsets[1:])
+        return track
+
+    def to_srt(self) -> str:
+        """Serialize the track as an SRT document."""
+        return "".join(
+            f"{index}\n{start} --> {end}\n{text}\n\n"
+            for index, (start, end, text) in enumerate(
+                zip(
+                    _timestamps(self.starts, ","),
+                    _timestamps(self.ends, ","),
+                    self.texts,
+                ),
+                start=1,
+            )
+        )
+
+    def to_vtt(self) -> str:
+        """Serialize the track as a WebVTT document."""
+        return "WEBVTT\n\n" + "".join(
+            f"{start} --> {end}\n{text}\n\n"
+            for start, end, text in zip(
+                _timestamps(self.starts, "."),
+                _timestamps(self.ends, "."),
+                self.texts,
+            )
+        )
+
+    def to_ssml(self, converter: Any) -> str:
+        """
+        Serialize the track as an SSML document.
+
+        Args:
+            converter (SSMLConverter): Provides the SSML dialect and voice settings.
+
+        Returns:
+            str: The SSML document.
+        """
+        return converter.render_values(self.ssml_values())
+
+    def ssml_values(self) -> SSMLValues:
+        """The cues as the columns rendered by ``SSMLConverter.render_values``."""
+        # Replacing a character keeps the offsets of the buffer valid.
+        return SSMLValues(
+            starts_ms=self.starts.tolist(),
+            ends_ms=self.ends.tolist(),
+            durations_ms=self.durations.tolist(),
+            texts=_slices(self.text.replace("\n", " "), self.text_offsets),
+            breaks_ms=self.gaps.tolist(),
+        )
+
+    def _retime(self, transform) -> "SubtitleTrack":
+        track = copy.copy(self)
+        track.starts = transform(self.starts)
+        track.ends = transform(self.ends)
+        track.word_starts = transform(self.word_starts)
+        track.word_ends = transform(self.word_ends)
+        return track
+
+    def _word_pieces(self, pieces: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+        """The piece every word falls into after splitting."""
+        first_piece = np.cumsum(pieces) - pieces
+        word_cues = np.repeat(np.arange(len(self)), np.diff(self.word_offsets))
+
+        middles = (self.word_starts + self.word_ends) / 2
+        offsets = (middles - self.starts[word_cues]) // lengths[first_piece[word_cues]]
+        offsets = np.clip(offsets, 0, pieces[word_cues] - 1).astype(np.int64)
+        return first_piece[word_cues] + offsets
+
+    def _piece_texts(self, pieces: np.ndarray, word_pieces: np.ndarray) -> List[str]:
+        texts = []
+        words = _slices(self.word_text, self.word_text_offsets)
+        word_bounds = self.word_offsets.tolist()
+        first_pieces = (np.cumsum(pieces) - pieces).tolist()
+        word_pieces = word_pieces.tolist()
+
+        for index, (text, count) in enumerate(zip(self.texts, pieces.tolist())):
+            start, end = word_bounds[index], word_bounds[index + 1]
+
+            if count == 1:
+                texts.append(text)
+            elif start < end:
+                buckets = [[] for _ in range(count)]
+                for word, piece in zip(words[start:end], word_pieces[start:end]):
+                    buckets[piece - first_pieces[index]].append(word)
+                texts.extend("".join(bucket).strip() for bucket in buckets)
+            else:
+                tokens = text.split()
+                bounds = np.linspace(0, len(tokens), count + 1).round().astype(int)
+                texts.extend(
+                    " ".join(tokens[a:b]) for a, b in zip(bounds[:-1], bounds[1:])
+                )
+
+        return texts
@@ -0,0 +1,58 @@
+import json
+from typing import Any
+
+import app.utils as utils
+from app.subtitles.sinks import SegmentSink
+
+
+class WordJsonSink(SegmentSink):
+    """
+    Writes segments with their word timings to a JSON file as they arrive.
+
+    The document has the form ``{"language": ..., "segments": [...]}``, every
+    segment listing its ``start``, ``end``, ``text`` and ``words``, each word
+    with its own ``start``, ``end``, ``word`` and ``probability``. Segments are
+    appended one by one, so the document is valid only once the sink is closed.
+    """
+
+    def __init__(self, output_file: str, language: str):
+        """
+        Initializes the WordJsonSink and opens the output file.
+
+        Args:
+            output_file (str): The path of the JSON file to write.
+            language (str): The language of the transcription.
+        """
+        utils.create_directory_for_file(output_file)
+
+        self.output_file = output_file
+        self.count = 0
+        self._file = open(output_file, "w", encoding="utf-8")
+        self._file.write(
+            f'{{"language": {json.dumps(language)}, "segments": [',
+        )
+
+    def write(self, segment: Any) -> None:
+        document = {
+            "start": round(segment.start, 3),
+            "end": round(segment.end, 3),
+            "text": segment.text.strip(),
+            "words": [
+                {
+                    "start": round(word.start, 3),
+                    "end": round(word.end, 3),
+                    "word": word.word,
+                    "probability": round(word.probability, 4),
+                }
+                for word in (segment.words or [])
+            ],
+        }
+
+        separator = ",\n" if self.count else "\n"
+        self._file.write(separator + json.dumps(document, ensure_ascii=False))
+        self.count += 1
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self._file.write("\n]}\n")
+            self._file.close()
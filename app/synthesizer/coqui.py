@@ -1,5 +1,55 @@
-from gtts import gTTS  # noqa
+from typing import Optional
 
-from app.config import config  # noqa
+import numpy as np
 
-device = "cuda" if False else "cpu"
+from app.logger import get_logger
+from app.synthesizer.engines import SpeechEngine
+
+logger = get_logger(__name__)
+
+
+class CoquiSpeechEngine(SpeechEngine):
+    """
+    An offline engine running a Coqui TTS model on the local machine.
+
+    The ``TTS`` package is an optional dependency imported on first use, so the
+    rest of the application works without it.
+    """
+
+    name = "coqui"
+
+    def __init__(
+        self,
+        model_name: str = "tts_models/en/ljspeech/vits",
+        device: str = "cpu",
+        speaker: Optional[str] = None,
+        language: Optional[str] = None,
+    ):
+        self.model_name = model_name
+        self.device = device
+        self.speaker = speaker
+        self.language = language
+        self._tts = None
+
+    @property
+    def tts(self):
+        if self._tts is None:
+            try:
+                from TTS.api import TTS
+            except ImportError:
+                raise RuntimeError(
+                    "The coqui speech engine requires the TTS package, install it with `pip install TTS`"
+                )
+
+            logger.info(f"Loading Coqui TTS model {self.model_name}")
+            self._tts = TTS(self.model_name).to(self.device)
+
+        return self._tts
+
+    @property
+    def sample_rate(self) -> int:
+        return self.tts.synthesizer.output_sample_rate
+
+    def synthesize(self, text: str) -> np.ndarray:
+        samples = self.tts.tts(text=text, speaker=self.speaker, language=self.language)
+        return np.asarray(samples, dtype=np.float32)
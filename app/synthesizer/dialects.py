@@ -0,0 +1,176 @@
+from typing import Dict, Optional, Type
+
+XMLNS_ATTRIBUTES = {
+    "xmlns": "http://www.w3.org/2001/10/synthesis",
+    "xmlns:mstts": "http://www.w3.org/2001/mstts",
+    "xmlns:emo": "http://www.w3.org/2009/10/emotionml",
+}
+
+
+def escape_chars(text: str) -> str:
+    """Escape special characters such as: & " ' < >"""
+    text = text.replace("&", "&amp;")
+    text = text.replace('"', "&quot;")
+    text = text.replace("'", "&apos;")
+    text = text.replace("<", "&lt;")
+    text = text.replace(">", "&gt;")
+    return text
+
+
+DIALECTS: Dict[str, Type["SSMLDialect"]] = {}
+
+
+def register_dialect(dialect: Type["SSMLDialect"]) -> Type["SSMLDialect"]:
+    """Make a dialect available as a ``service_mode`` under its name."""
+    DIALECTS[dialect.name] = dialect
+    return dialect
+
+
+@register_dialect
+class SSMLDialect:
+    """
+    Renders subtitles as the SSML accepted by one text-to-speech service.
+
+    A document is ``header() + cue(value) for every cue + footer()``, where each
+    value is a parsed subtitle with ``text``, ``duration_ms`` and
+    ``break_until_next``; ``cue_line`` renders the same line from those fields
+    directly. Every cue is self-contained, so a document can be cut between any
+    two cues and closed with the footer.
+
+    Attributes:
+        voice_name (Optional[str]): The voice speaking the document, None leaves it to the service.
+        language (str): The language of the document.
+        ssml_version (str): The SSML version declared in the document.
+        duration_attribute_name (str): The prosody attribute holding the target duration.
+        use_inner_duration_tag (bool): Set the duration with a service-specific tag instead.
+    """
+
+    name = "generic"
+
+    def __init__(
+        self,
+        voice_name: Optional[str] = None,
+        language: str = "en-US",
+        ssml_version: str = "1.0",
+        duration_attribute_name: str = "duration",
+        use_inner_duration_tag: bool = False,
+    ):
+        if voice_name is not None and voice_name.lower() in ("", "none"):
+            voice_name = None
+
+        self.voice_name = voice_name
+        self.language = language
+        self.ssml_version = ssml_version
+        self.duration_attribute_name = duration_attribute_name
+        self.use_inner_duration_tag = use_inner_duration_tag
+
+    @property
+    def voice_tag(self) -> tuple:
+        if self.voice_name is None:
+            return "", ""
+        return f'<voice name="{self.voice_name}">', "</voice>"
+
+    def speak_tag(self) -> str:
+        attributes = " ".join(f'{k}="{v}"' for k, v in XMLNS_ATTRIBUTES.items())
+        return f'<speak {attributes} version="{self.ssml_version}" xml:lang="{self.language}">\n'
+
+    def header(self) -> str:
+        voice_open, _ = self.voice_tag
+        header = '<?xml version="1.0" encoding="UTF-8"?>\n' + self.speak_tag()
+        return header + f"{voice_open}\n" if voice_open else header
+
+    def cue(self, value: dict) -> str:
+        return self.cue_line(
+            value["text"], value["duration_ms"], value["break_until_next"]
+        )
+
+    def cue_line(self, text: str, duration_ms: int, break_ms: int) -> str:
+        text = escape_chars(text)
+        return f"\t{self.prosody(text, duration_ms)}{self.pause(break_ms)}\n"
+
+    def footer(self) -> str:
+        _, voice_close = self.voice_tag
+        return f"{voice_close}\n</speak>\n" if voice_close else "</speak>\n"
+
+    def prosody(self, text: str, duration_ms: int) -> str:
+        return f'<prosody {self.duration_attribute_name}="{duration_ms}ms">{text}</prosody>'
+
+    def pause(self, break_ms: int) -> str:
+        if break_ms > 0:
+            return f'<break time="{break_ms}ms"/>'
+        return ""
+
+
+@register_dialect
+class AzureDialect(SSMLDialect):
+    """
+    Azure Speech wants the spoken content inside a voice element, so every cue
+    carries its own voice element and, with ``use_inner_duration_tag``, sets its
+    duration through ``mstts:audioduration``.
+    """
+
+    name = "azure"
+
+    def header(self) -> str:
+        return '<?xml version="1.0" encoding="UTF-8"?>\n' + self.speak_tag()
+
+    def cue_line(self, text: str, duration_ms: int, break_ms: int) -> str:
+        voice_open, voice_close = self.voice_tag
+        text = escape_chars(text)
+
+        if self.use_inner_duration_tag:
+            content = f'<mstts:audioduration value="{duration_ms}ms"/>{text}'
+        else:
+            content = self.prosody(text, duration_ms)
+
+        return f"\t{voice_open}{content}{self.pause(break_ms)}{voice_close}\n"
+
+    def footer(self) -> str:
+        return "</speak>\n"
+
+
+@register_dialect
+class AmazonStandardVoiceDialect(SSMLDialect):
+    """
+    Amazon Polly selects the voice through the API and limits the length of a
+    phrase with ``amazon:max-duration``. The document is a bare speak element
+    without the Microsoft namespaces.
+    """
+
+    name = "amazon-standard-voice"
+
+    def __init__(self, *args, duration_attribute_name: str = "duration", **kwargs):
+        if duration_attribute_name == "duration":
+            duration_attribute_name = "amazon:max-duration"
+        super().__init__(
+            *args, duration_attribute_name=duration_attribute_name, **kwargs
+        )
+
+    @property
+    def voice_tag(self) -> tuple:
+        return "", ""
+
+    def header(self) -> str:
+        return "<speak>\n"
+
+
+def get_dialect(service_mode: str, **options) -> SSMLDialect:
+    """
+    Create the dialect of a service.
+
+    Args:
+        service_mode (str): The name of a registered dialect, e.g. "azure".
+        **options: Keyword arguments passed to the dialect.
+
+    Raises:
+        ValueError: If no dialect is registered under the name.
+
+    Returns:
+        SSMLDialect: The dialect.
+    """
+    if service_mode not in DIALECTS:
+        raise ValueError(
+            f"Unknown SSML service mode {service_mode}, expected one of {sorted(DIALECTS)}"
+        )
+
+    return DIALECTS[service_mode](**options)
@@ -0,0 +1,59 @@
+import zlib
+
+import numpy as np
+
+
+class SpeechEngine:
+    """
+    A text-to-speech backend.
+
+    Engines are created inside the synthesis worker processes, so they must be
+    constructible from plain keyword arguments and load their models lazily.
+
+    Attributes:
+        name (str): The name the engine is selected by.
+    """
+
+    name = ""
+
+    @property
+    def sample_rate(self) -> int:
+        """The sampling rate of the synthesized audio."""
+        raise NotImplementedError
+
+    def synthesize(self, text: str) -> np.ndarray:
+        """
+        Speak a piece of text.
+
+        Args:
+            text (str): The text to speak.
+
+        Returns:
+            np.ndarray: Mono float32 samples at ``sample_rate`` in the [-1, 1] range.
+        """
+        raise NotImplementedError
+
+
+class FakeSpeechEngine(SpeechEngine):
+    """
+    A deterministic engine producing a tone instead of speech.
+
+    The clip length follows the length of the text and the pitch is derived
+    from its checksum, so the same text always yields the same samples.
+    """
+
+    name = "fake"
+
+    def __init__(self, sample_rate: int = 16000, chars_per_second: float = 15.0):
+        self._sample_rate = sample_rate
+        self.chars_per_second = chars_per_second
+
+    @property
+    def sample_rate(self) -> int:
+        return self._sample_rate
+
+    def synthesize(self, text: str) -> np.ndarray:
+        seconds = max(len(text), 1) / self.chars_per_second
+        t = np.arange(round(seconds * self._sample_rate)) / self._sample_rate
+        pitch = 120 + zlib.crc32(text.encode("utf-8")) % 180
+        return (0.2 * np.sin(2 * np.pi * pitch * t)).astype(np.float32)
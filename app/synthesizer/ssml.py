@@ -1,4 +1,29 @@
-import re  # noqa
+import re
+from itertools import chain
+from typing import Any, Iterable, List, NamedTuple, Optional
+
+import app.utils as utils
+from app.logger import get_logger
+from app.subtitles.sinks import SegmentSink
+from app.subtitles.track import SSMLValues, SubtitleTrack
+from app.synthesizer.dialects import (
+    XMLNS_ATTRIBUTES,
+    SSMLDialect,
+    escape_chars,
+    get_dialect,
+)
+
+logger = get_logger(__name__)
+
+TIMELINE_PATTERN = re.compile(r"\d\d:\d\d:\d\d,\d\d\d --> \d\d:\d\d:\d\d,\d\d\d")
+
+
+class SSMLChunk(NamedTuple):
+    """A complete SSML document covering the cues from ``start_ms`` to ``end_ms``."""
+
+    start_ms: int
+    end_ms: int
+    ssml: str
 
 
 class SSMLConverter:
@@ -23,20 +48,21 @@ class SSMLConverter:
         self.ssml_version = ssml_version
         self.language = language
 
+    @property
+    def dialect(self) -> SSMLDialect:
+        """The emitter of the configured service mode"""
+        return get_dialect(
+            self.service_mode,
+            voice_name=self.voice_name,
+            language=self.language,
+            ssml_version=self.ssml_version,
+            duration_attribute_name=self.duration_attribute_name,
+            use_inner_duration_tag=self.use_inner_duration_tag,
+        )
+
     @property
     def voice_tag(self) -> tuple:
-        if (
-            self.voice_name is None
-            or self.voice_name == ""
-            or self.voice_name.lower() == "none"
-        ):
-            opening = ""
-            closing = ""
-        else:
-            opening = '<voice name="' + self.voice_name + '">'
-            closing = "</voice>"
-
-        return opening, closing
+        return self.dialect.voice_tag
 
     @property
     def duration_tag(self) -> str:
@@ -45,114 +71,181 @@ class SSMLConverter:
 
     @property
     def xmlns_attributes(self) -> dict:
-        return {
-            "xmlns": "http://www.w3.org/2001/10/synthesis",
-            "xmlns:mstts": "http://www.w3.org/2001/mstts",
-            "xmlns:emo": "http://www.w3.org/2009/10/emotionml",
-        }
+        return dict(XMLNS_ATTRIBUTES)
 
     @property
     def xmlns_attributes_string(self) -> str:
-        attributes = ""
-        for key, value in self.xmlns_attributes.items():
-            attributes += f'{key}="{value}" '
-        return attributes.strip()
+        return " ".join(f'{key}="{value}"' for key, value in XMLNS_ATTRIBUTES.items())
 
     @property
     def timeline_regexp(self) -> re.Pattern:
-        return re.compile(r"\d\d:\d\d:\d\d,\d\d\d --> \d\d:\d\d:\d\d,\d\d\d")
+        return TIMELINE_PATTERN
 
     def escape_chars(self, text):
         """Escape special characters such as: & " ' < >"""
-        text = text.replace("&", "&amp;")
-        text = text.replace('"', "&quot;")
-        text = text.replace("'", "&apos;")
-        text = text.replace("<", "&lt;")
-        text = text.replace(">", "&gt;")
-        return text
+        return escape_chars(text)
 
     def parse_srt_file(self) -> dict:
-        """Parse SRT file and return a dictionary of subtitles"""
-        subs_dict = {}
-        with open(self.srt_file, "r", encoding="utf-8-sig") as f:
-            lines = f.readlines()
-
-        for line_num, line in enumerate(lines):
-            line = line.strip()
-
-            if line.isdigit() and self.timeline_regexp.match(lines[line_num + 1]):
-                time_line = lines[line_num + 1].strip()
-                text_line = lines[line_num + 2].strip()
-
-                count = 3
-                while line_num + count < len(lines) and lines[line_num + count].strip():
-                    text_line += " " + lines[line_num + count].strip()
-                    count += 1
-
-                start_time, end_time = map(lambda x: x.strip(), time_line.split("-->"))
-
-                start_time_ms = sum(
-                    int(t) * 10 ** (3 - i * 3)
-                    for i, t in enumerate(start_time.replace(",", ":").split(":"))
-                )
-                end_time_ms = sum(
-                    int(t) * 10 ** (3 - i * 3)
-                    for i, t in enumerate(end_time.replace(",", ":").split(":"))
-                )
-
-                duration_ms = end_time_ms - start_time_ms
-
-                subs_dict[line] = {
-                    "start_ms": start_time_ms,
-                    "end_ms": end_time_ms,
-                    "duration_ms": duration_ms,
-                    "text": text_line,
-                    "break_until_next": 0,
-                }
-
-                if line_num > 0:
-                    subs_dict[str(int(line) - 1)]["break_until_next"] = (
-                        start_time_ms - subs_dict[str(int(line) - 1)]["end_ms"]
+        """Parse SRT file and return a dictionary of subtitles keyed by their position"""
+        values = SubtitleTrack.from_srt(self.srt_file).ssml_values()
+        return {
+            str(position): {
+                "start_ms": start,
+                "end_ms": end,
+                "duration_ms": duration,
+                "text": text,
+                "break_until_next": pause,
+            }
+            for position, (start, end, duration, text, pause) in enumerate(
+                zip(*values), start=1
+            )
+        }
+
+    def ssml_header(self) -> str:
+        """Opening of the SSML document up to the first cue"""
+        return self.dialect.header()
+
+    def ssml_cue(self, value: dict) -> str:
+        """Render a single parsed subtitle as an SSML line"""
+        return self.dialect.cue(value)
+
+    def ssml_footer(self) -> str:
+        """Closing of the SSML document"""
+        return self.dialect.footer()
+
+    def render(self, values: Iterable[dict]) -> str:
+        """Render parsed subtitles as a single SSML document"""
+        dialect = self.dialect
+        return "".join(
+            chain([dialect.header()], map(dialect.cue, values), [dialect.footer()])
+        )
+
+    def render_values(self, values: SSMLValues) -> str:
+        """Render the columns of a subtitle track as a single SSML document"""
+        dialect = self.dialect
+        cues = map(
+            dialect.cue_line, values.texts, values.durations_ms, values.breaks_ms
+        )
+        return "".join(chain([dialect.header()], cues, [dialect.footer()]))
+
+    def render_chunks(self, values: Iterable[dict], max_chars: int) -> List[SSMLChunk]:
+        """
+        Render parsed subtitles as SSML documents of at most ``max_chars`` characters.
+
+        Documents are cut between cues and each one is complete, so the chunks
+        can be synthesized independently and in parallel. A cue too long to fit
+        in any document gets a document of its own.
+
+        Args:
+            values (Iterable[dict]): The parsed subtitles in order.
+            max_chars (int): The size limit of a document.
+
+        Returns:
+            List[SSMLChunk]: The documents with the time range they cover.
+        """
+        dialect = self.dialect
+        header, footer = dialect.header(), dialect.footer()
+        budget = max_chars - len(header) - len(footer)
+
+        chunks = []
+        buffer, size, start_ms, end_ms = [], 0, 0, 0
+
+        def flush():
+            if buffer:
+                ssml = "".join(chain([header], buffer, [footer]))
+                chunks.append(SSMLChunk(start_ms, end_ms, ssml))
+
+        for value in values:
+            cue = dialect.cue(value)
+
+            if buffer and size + len(cue) > budget:
+                flush()
+                buffer, size = [], 0
+
+            if not buffer:
+                start_ms = value["start_ms"]
+                if len(cue) > budget:
+                    logger.warning(
+                        f"SSML cue at {start_ms}ms exceeds the {max_chars} character limit"
                     )
 
-        return subs_dict
+            buffer.append(cue)
+            size += len(cue)
+            end_ms = value["end_ms"] + max(0, value["break_until_next"])
+
+        flush()
+        return chunks
 
     def generate_ssml_file(self, subs_dict):
         """Generate SSML file from the parsed subtitles dictionary"""
+        utils.create_directory_for_file(self.output_file)
         with open(self.output_file, "w", encoding="utf-8-sig") as f:
-            f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
-            f.write(
-                f'<speak {self.xmlns_attributes_string} version="{self.ssml_version}" xml:lang="{self.language}">\n'
-            )
-
-            voice_open, voice_end = self.voice_tag
-
-            if self.service_mode != "azure":
-                f.write(f"{voice_open}\n")
-
-            for _, value in subs_dict.items():
-                text = self.escape_chars(value["text"])
+            f.write(self.render(subs_dict.values()))
 
-                break_time_string = (
-                    f'<break time="{value["break_until_next"]}ms"/>'
-                    if value["break_until_next"] or value["break_until_next"] == "0"
-                    else ""
-                )
+    def sink(self) -> "SSMLSink":
+        """Stream transcription segments straight into the SSML output file"""
+        return SSMLSink(self)
 
-                duration_attribute = (
-                    f'{self.duration_attribute_name}="{value["duration_ms"]}ms"'
-                )
+    def convert(self):
+        """Main method to convert SRT to SSML"""
+        track = SubtitleTrack.from_srt(self.srt_file)
+        utils.create_directory_for_file(self.output_file)
+        with open(self.output_file, "w", encoding="utf-8-sig") as f:
+            f.write(track.to_ssml(self))
+
+
+class SSMLSink(SegmentSink):
+    """
+    Writes transcription segments to an SSML file as they arrive.
+
+    The pause after a cue depends on the start of the following one, so each cue
+    is held back until its successor arrives. The file is flushed after every
+    cue; the document is closed when the sink is closed.
+    """
+
+    def __init__(self, converter: SSMLConverter):
+        """
+        Initializes the SSMLSink and writes the document header.
+
+        Args:
+            converter (SSMLConverter): The converter providing the output file and rendering options.
+        """
+        utils.create_directory_for_file(converter.output_file)
+
+        self.converter = converter
+        self.dialect = converter.dialect
+        self._pending: Optional[dict] = None
+        self._file = open(converter.output_file, "w", encoding="utf-8-sig")
+        self._file.write(self.dialect.header())
+        self._file.flush()
+
+    def write(self, segment: Any) -> None:
+        start_ms = round(segment.start * 1000)
+        end_ms = round(segment.end * 1000)
+
+        if self._pending is not None:
+            self._pending["break_until_next"] = start_ms - self._pending["end_ms"]
+            self._emit(self._pending)
+
+        self._pending = {
+            "start_ms": start_ms,
+            "end_ms": end_ms,
+            "duration_ms": end_ms - start_ms,
+            "text": segment.text.strip(),
+            "break_until_next": 0,
+        }
 
-                if not self.use_inner_duration_tag:
-                    prosody_tag = f'\t<prosody {duration_attribute}="{value["duration_ms"]}ms">{text}</prosody>{break_time_string}\n'
-                else:
-                    prosody_tag = f'\t{voice_open}<{self.duration_tag}="{value["duration_ms"]}ms"/>{text}{voice_end}{break_time_string}\n'
+    def close(self) -> None:
+        if self._file.closed:
+            return
 
-                f.write(prosody_tag)
+        if self._pending is not None:
+            self._emit(self._pending)
+            self._pending = None
 
-            f.write("</speak>\n")
+        self._file.write(self.dialect.footer())
+        self._file.close()
 
-    def convert(self):
-        """Main method to convert SRT to SSML"""
-        subs_dict = self.parse_srt_file()
-        self.generate_ssml_file(subs_dict)
+    def _emit(self, value: dict) -> None:
+        self._file.write(self.dialect.cue(value))
+        self._file.flush()
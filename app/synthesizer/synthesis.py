@@ -0,0 +1,289 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Dict, Optional, Sequence, Tuple, Type
+
+import numpy as np
+
+from app.logger import get_logger
+from app.subtitles.track import SSMLValues
+from app.synthesizer.coqui import CoquiSpeechEngine
+from app.synthesizer.engines import FakeSpeechEngine, SpeechEngine
+
+logger = get_logger(__name__)
+
+ENGINES: Dict[str, Type[SpeechEngine]] = {
+    FakeSpeechEngine.name: FakeSpeechEngine,
+    CoquiSpeechEngine.name: CoquiSpeechEngine,
+}
+
+STRETCH_FRAME = 1024
+
+
+def get_engine(name: str, **options) -> SpeechEngine:
+    """
+    Create a speech engine.
+
+    Args:
+        name (str): The name of the engine, e.g. "coqui" or "fake".
+        **options: Keyword arguments passed to the engine.
+
+    Raises:
+        ValueError: If there is no engine of that name.
+
+    Returns:
+        SpeechEngine: The engine.
+    """
+    if name not in ENGINES:
+        raise ValueError(
+            f"Unknown speech engine {name}, expected one of {sorted(ENGINES)}"
+        )
+
+    return ENGINES[name](**options)
+
+
+def resample(audio: np.ndarray, source_rate: int, target_rate: int) -> np.ndarray:
+    """Resample audio by linear interpolation."""
+    if source_rate == target_rate or len(audio) == 0:
+        return audio
+
+    length = round(len(audio) * target_rate / source_rate)
+    positions = np.arange(length) * (source_rate / target_rate)
+    return np.interp(positions, np.arange(len(audio)), audio).astype(np.float32)
+
+
+def time_stretch(
+    audio: np.ndarray,
+    length: int,
+    frame: int = STRETCH_FRAME,
+) -> np.ndarray:
+    """
+    Change the duration of audio to exactly ``length`` samples without changing its pitch.
+
+    Hann-windowed frames are read at a hop proportional to the stretch factor
+    and overlap-added at a fixed hop of a quarter frame. Frames a whole frame
+    apart never overlap, so every quarter-frame phase is added in one
+    vectorized operation. Clips shorter than two frames are resampled instead.
+
+    Args:
+        audio (np.ndarray): Mono float32 samples.
+        length (int): The number of samples to produce.
+        frame (int, optional): The frame length in samples. Defaults to 1024.
+
+    Returns:
+        np.ndarray: The stretched samples.
+    """
+    if length <= 0:
+        return np.zeros(0, dtype=np.float32)
+    if len(audio) == 0:
+        return np.zeros(length, dtype=np.float32)
+    if len(audio) == length:
+        return audio.astype(np.float32, copy=False)
+    if len(audio) < 2 * frame:
+        return resample(audio, len(audio), length)[:length]
+
+    hop = frame // 4
+    frames = -(-length // hop) + 1
+    reads = np.round(np.arange(frames) * hop * len(audio) / length).astype(np.int64)
+
+    padded = np.concatenate([audio, np.zeros(frame, dtype=audio.dtype)])
+    reads = np.minimum(reads, len(audio) - 1)
+    window = np.hanning(frame).astype(np.float32)
+    windowed = padded[reads[:, None] + np.arange(frame)] * window
+
+    output = np.zeros((frames + 4) * hop, dtype=np.float32)
+    weights = np.zeros_like(output)
+    for phase in range(4):
+        chunk = windowed[phase::4]
+        start = phase * hop
+        end = start + chunk.size
+        output[start:end] += chunk.ravel()
+        weights[start:end] += np.tile(window, len(chunk))
+
+    output /= np.maximum(weights, 1e-3)
+    return output[:length]
+
+
+def assemble(
+    clips: Sequence[np.ndarray],
+    starts_ms: Sequence[int],
+    sample_rate: int,
+    length: Optional[int] = None,
+) -> np.ndarray:
+    """
+    Place clips on a silent timeline.
+
+    Every clip starts at the sample matching its start time exactly; clips that
+    overlap are mixed and the result is clipped to [-1, 1].
+
+    Args:
+        clips (Sequence[np.ndarray]): Mono float32 clips.
+        starts_ms (Sequence[int]): The start of every clip in milliseconds.
+        sample_rate (int): The sampling rate of the clips.
+        length (Optional[int], optional): The length of the timeline in samples.
+            Defaults to the end of the last clip.
+
+    Returns:
+        np.ndarray: The assembled track.
+    """
+    offsets = np.asarray(starts_ms, dtype=np.int64) * sample_rate // 1000
+    ends = offsets + np.fromiter((len(clip) for clip in clips), np.int64, len(clips))
+
+    if length is None:
+        length = int(ends.max()) if len(clips) else 0
+
+    track = np.zeros(length, dtype=np.float32)
+    for clip, offset, end in zip(clips, offsets.tolist(), ends.tolist()):
+        if offset < length:
+            track[offset : min(end, length)] += clip[: length - offset]
+
+    return np.clip(track, -1.0, 1.0, out=track)
+
+
+_engines: Dict[Tuple, SpeechEngine] = {}
+
+
+def synthesize_cue(
+    engine_name: str,
+    engine_options: dict,
+    text: str,
+    duration_ms: int,
+    sample_rate: int,
+) -> np.ndarray:
+    """
+    Synthesize one cue in a worker process and fit it into the cue duration.
+
+    The engine is created once per process and reused by every following cue.
+
+    Returns:
+        np.ndarray: Exactly ``duration_ms`` worth of float32 samples at ``sample_rate``.
+    """
+    key = (engine_name, tuple(sorted(engine_options.items())))
+    if key not in _engines:
+        _engines[key] = get_engine(engine_name, **engine_options)
+    engine = _engines[key]
+
+    clip = resample(engine.synthesize(text), engine.sample_rate, sample_rate)
+    return time_stretch(clip, duration_ms * sample_rate // 1000)
+
+
+class SpeechSynthesizer:
+    """
+    Voices subtitle cues in parallel and assembles them into a single track.
+
+    Attributes:
+        engine (str): The name of the speech engine.
+        engine_options (dict): Keyword arguments passed to the engine.
+        workers (int): The number of worker processes.
+        sample_rate (int): The sampling rate of the assembled track.
+    """
+
+    def __init__(
+        self,
+        engine: str,
+        engine_options: Optional[dict] = None,
+        workers: Optional[int] = None,
+        sample_rate: int = 24000,
+        executor: Optional[Executor] = None,
+    ):
+        """
+        Initializes the SpeechSynthesizer.
+
+        Args:
+            engine (str): The name of the speech engine, see ``ENGINES``.
+            engine_options (dict, optional): Keyword arguments passed to the engine. Defaults to None.
+            workers (int, optional): The number of worker processes. Defaults to the CPU count.
+            sample_rate (int, optional): The sampling rate of the output. Defaults to 24000.
+            executor (Executor, optional): The executor voicing the cues. Defaults to a
+                process pool created on first use.
+        """
+        self.engine = engine
+        self.engine_options = engine_options or {}
+        self.workers = workers or os.cpu_count() or 1
+        self.sample_rate = sample_rate
+        self._executor = executor
+        self._owns_executor = executor is None
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    def synthesize(self, values: SSMLValues) -> np.ndarray:
+        """
+        Voice the cues and place each one at its start time.
+
+        Args:
+            values (SSMLValues): The cue columns, e.g. ``SubtitleTrack.ssml_values()``.
+
+        Returns:
+            np.ndarray: Mono float32 samples at ``sample_rate`` covering all cues.
+        """
+        spoken = [index for index, text in enumerate(values.texts) if text.strip()]
+        if not spoken:
+            return np.zeros(0, dtype=np.float32)
+
+        logger.info(
+            f"Synthesizing {len(spoken)} cues with the {self.engine} engine "
+            f"on {self.workers} workers"
+        )
+
+        count = len(spoken)
+        clips = list(
+            self.executor.map(
+                synthesize_cue,
+                [self.engine] * count,
+                [self.engine_options] * count,
+                [values.texts[index] for index in spoken],
+                [values.durations_ms[index] for index in spoken],
+                [self.sample_rate] * count,
+                chunksize=max(1, count // (self.workers * 4)),
+            )
+        )
+
+        end_ms = max(values.ends_ms[index] for index in spoken)
+        return assemble(
+            clips,
+            [values.starts_ms[index] for index in spoken],
+            self.sample_rate,
+            length=end_ms * self.sample_rate // 1000,
+        )
+
+    def close(self) -> None:
+        """Shut down the worker processes owned by the synthesizer."""
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+_synthesizers: Dict[Tuple, SpeechSynthesizer] = {}
+_synthesizers_lock = threading.Lock()
+
+
+def get_speech_synthesizer(
+    engine: str,
+    workers: int,
+    sample_rate: int,
+    **engine_options,
+) -> SpeechSynthesizer:
+    """
+    Return the process-wide SpeechSynthesizer for the given settings.
+
+    Reusing the synthesizer keeps its worker processes, and the engines they
+    loaded, alive between jobs.
+    """
+    key = (engine, workers, sample_rate, tuple(sorted(engine_options.items())))
+    with _synthesizers_lock:
+        if key not in _synthesizers:
+            _synthesizers[key] = SpeechSynthesizer(
+                engine,
+                engine_options=engine_options,
+                workers=workers,
+                sample_rate=sample_rate,
+            )
+        return _synthesizers[key]
@@ -0,0 +1,158 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from app.logger import get_logger
+from app.transcriber.cache import TranscriptionCache
+from app.transcriber.model_pool import WhisperModelPool, model_pool
+from app.transcriber.segments import Segment
+
+logger = get_logger(__name__)
+
+Audio = Union[str, np.ndarray]
+
+
+class BatchTranscriber:
+    """
+    Transcribes many short inputs through one shared Whisper model.
+
+    The model is loaded once with ``num_workers`` CTranslate2 workers, which
+    lets that many transcriptions decode concurrently on the same weights.
+    Every input is transcribed on its own thread and its segments are fully
+    materialized, so a batch returns complete per-input results.
+
+    Attributes:
+        model_name (str): The name of the Whisper model.
+        device (str): The device used for inference.
+        compute_type (str): The precision type used for computation.
+        cpu_threads (int): The threads of every CPU worker, 0 lets CTranslate2 decide.
+        num_workers (int): The number of inputs decoded concurrently.
+        beam_size (int): The beam size used for decoding.
+        cache (Optional[TranscriptionCache]): The cache consulted before running the model.
+    """
+
+    def __init__(
+        self,
+        model_name: str = "small",
+        device: str = "cpu",
+        compute_type: str = "int8",
+        cpu_threads: int = 0,
+        num_workers: int = 4,
+        beam_size: int = 5,
+        cache: Optional[TranscriptionCache] = None,
+        pool: Optional[WhisperModelPool] = None,
+    ):
+        self.model_name = model_name
+        self.device = device
+        self.compute_type = compute_type
+        self.cpu_threads = cpu_threads
+        self.num_workers = num_workers
+        self.beam_size = beam_size
+        self.cache = cache
+        self._pool = pool or model_pool
+        self._executor = ThreadPoolExecutor(
+            max_workers=num_workers, thread_name_prefix="transcribe-batch"
+        )
+
+    @property
+    def model(self):
+        return self._pool.get(
+            self.model_name,
+            device=self.device,
+            compute_type=self.compute_type,
+            cpu_threads=self.cpu_threads,
+            num_workers=self.num_workers,
+        )
+
+    def submit(
+        self, audio: Audio, language: Optional[str] = None
+    ) -> "Future[Tuple[str, List[Segment]]]":
+        """
+        Queue one input for transcription.
+
+        Args:
+            audio (Audio): The path to an audio file, or 16 kHz mono float32 samples.
+            language (Optional[str], optional): The language of the audio, None detects it.
+
+        Returns:
+            Future[Tuple[str, List[Segment]]]: Resolves to the language and the segments.
+        """
+        return self._executor.submit(self._transcribe, audio, language)
+
+    def transcribe(
+        self, audios: Sequence[Audio], language: Optional[str] = None
+    ) -> List[Tuple[str, List[Segment]]]:
+        """
+        Transcribe a batch of inputs concurrently.
+
+        Args:
+            audios (Sequence[Audio]): Paths to audio files or 16 kHz mono float32 samples.
+            language (Optional[str], optional): The language of every input, None detects it.
+
+        Raises:
+            Exception: The error of the first input that failed, after all inputs finished.
+
+        Returns:
+            List[Tuple[str, List[Segment]]]: The language and segments of every input, in order.
+        """
+        futures = [self.submit(audio, language) for audio in audios]
+        return [future.result() for future in futures]
+
+    def close(self) -> None:
+        self._executor.shutdown()
+
+    def _transcribe(
+        self, audio: Audio, language: Optional[str]
+    ) -> Tuple[str, List[Segment]]:
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.key(
+                audio, self.model_name, self.compute_type, language, self.beam_size
+            )
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        segments, info = self.model.transcribe(
+            audio,
+            vad_filter=True,
+            language=language,
+            beam_size=self.beam_size,
+            condition_on_previous_text=False,
+            word_timestamps=True,
+        )
+        segments = [Segment.from_whisper(segment) for segment in segments]
+
+        if self.cache is not None:
+            self.cache.put(cache_key, info.language, segments)
+
+        return info.language, segments
+
+
+_transcribers: Dict[Tuple, BatchTranscriber] = {}
+_transcribers_lock = threading.Lock()
+
+
+def get_batch_transcriber(
+    model_name: str,
+    num_workers: int,
+    cache: Optional[TranscriptionCache] = None,
+    beam_size: int = 5,
+    compute_type: str = "int8",
+) -> BatchTranscriber:
+    """
+    Return the process-wide BatchTranscriber of a model, shared by every job.
+    """
+    key = (model_name, num_workers, id(cache), beam_size, compute_type)
+    with _transcribers_lock:
+        if key not in _transcribers:
+            _transcribers[key] = BatchTranscriber(
+                model_name,
+                compute_type=compute_type,
+                num_workers=num_workers,
+                beam_size=beam_size,
+                cache=cache,
+            )
+        return _transcribers[key]
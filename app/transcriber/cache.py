@@ -0,0 +1,211 @@
+import hashlib
+import json
+import os
+import threading
+from dataclasses import asdict
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+import app.utils as utils
+from app.config import config
+from app.logger import get_logger
+from app.transcriber.segments import Segment, Word
+
+logger = get_logger(__name__)
+
+HASH_BLOCK_SIZE = 1 << 20
+
+
+def hash_audio(audio: Union[str, np.ndarray]) -> str:
+    """
+    Compute a content hash of the audio.
+
+    Args:
+        audio (Union[str, np.ndarray]): PCM samples or the path to an audio file.
+
+    Returns:
+        str: The hexadecimal SHA-256 digest of the samples or of the file contents.
+    """
+    digest = hashlib.sha256()
+
+    if isinstance(audio, np.ndarray):
+        digest.update(memoryview(np.ascontiguousarray(audio)).cast("B"))
+    else:
+        with open(audio, "rb") as f:
+            for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+                digest.update(block)
+
+    return digest.hexdigest()
+
+
+class TranscriptionCache:
+    """
+    A content-addressed on-disk cache of transcriptions.
+
+    Entries are keyed by the audio hash and the parameters affecting the model
+    output, and stored as JSON files. The modification time of an entry is
+    refreshed on every hit, so evicting the oldest files first keeps the cache
+    in least-recently-used order within ``max_size_mb``.
+
+    Attributes:
+        directory (str): The directory holding the entries.
+        max_size_mb (int): The size limit of the cache in megabytes, 0 disables the limit.
+        hits (int): The number of lookups served from the cache.
+        misses (int): The number of lookups not found in the cache.
+    """
+
+    def __init__(self, directory: str, max_size_mb: int = 0):
+        self.directory = directory
+        self.max_size_mb = max_size_mb
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @property
+    def stats(self) -> dict:
+        """A snapshot of the cache counters."""
+        return {"hits": self.hits, "misses": self.misses}
+
+    def key(
+        self,
+        audio: Union[str, np.ndarray],
+        model_name: str,
+        compute_type: str,
+        language: Optional[str],
+        beam_size: int,
+    ) -> str:
+        """
+        Build the cache key of a transcription.
+
+        Args:
+            audio (Union[str, np.ndarray]): PCM samples or the path to an audio file.
+            model_name (str): The name of the Whisper model.
+            compute_type (str): The precision type used for computation.
+            language (Optional[str]): The requested language, None for detection.
+            beam_size (int): The beam size used for decoding.
+
+        Returns:
+            str: The key of the entry.
+        """
+        parameters = f"{model_name}:{compute_type}:{language}:{beam_size}"
+        digest = hashlib.sha256(hash_audio(audio).encode("utf-8"))
+        digest.update(parameters.encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[str, List[Segment]]]:
+        """
+        Look up a transcription.
+
+        Args:
+            key (str): The key of the entry.
+
+        Returns:
+            Optional[Tuple[str, List[Segment]]]: The language and segments, or None on a miss.
+        """
+        path = self._path(key)
+
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            os.utime(path)
+        except (FileNotFoundError, json.JSONDecodeError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+
+        segments = [
+            Segment(
+                start=segment["start"],
+                end=segment["end"],
+                text=segment["text"],
+                words=[Word(**word) for word in segment["words"]],
+            )
+            for segment in entry["segments"]
+        ]
+        return entry["language"], segments
+
+    def put(self, key: str, language: str, segments: Iterable[Segment]) -> None:
+        """
+        Store a transcription and evict old entries beyond the size limit.
+
+        Args:
+            key (str): The key of the entry.
+            language (str): The detected language.
+            segments (Iterable[Segment]): The transcribed segments.
+        """
+        utils.create_directory(self.directory)
+
+        entry = {
+            "language": language,
+            "segments": [asdict(segment) for segment in segments],
+        }
+
+        path = self._path(key)
+        temporary_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(temporary_path, path)
+
+        self._evict()
+
+    def record(
+        self,
+        key: str,
+        language: str,
+        segments: Iterable,
+    ) -> Iterator[Segment]:
+        """
+        Pass segments through while recording them into the cache.
+
+        The entry is stored only once the segments are fully consumed, so a
+        transcription interrupted midway never produces a partial entry.
+
+        Args:
+            key (str): The key of the entry.
+            language (str): The detected language.
+            segments (Iterable): faster-whisper segments.
+
+        Yields:
+            Segment: The converted segments.
+        """
+        recorded = []
+        for segment in segments:
+            segment = Segment.from_whisper(segment)
+            recorded.append(segment)
+            yield segment
+
+        self.put(key, language, recorded)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _evict(self) -> None:
+        if not self.max_size_mb:
+            return
+
+        with self._lock:
+            entries = []
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith(".json"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+            total = sum(size for _, size, _ in entries)
+            limit = self.max_size_mb * 1024 * 1024
+
+            for _, size, path in sorted(entries):
+                if total <= limit:
+                    break
+                utils.delete_file(path)
+                total -= size
+                logger.info(f"Evicted transcription cache entry {path}")
+
+
+transcription_cache = TranscriptionCache(
+    config.transcription_cache_directory,
+    max_size_mb=config.transcription_cache_max_mb,
+)
@@ -0,0 +1,300 @@
+import multiprocessing
+import os
+import threading
+from collections import Counter
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+from app.ffmpeg_utils import SAMPLE_RATE
+from app.logger import get_logger
+from app.transcriber.model_pool import model_pool
+from app.transcriber.segments import Segment
+
+logger = get_logger(__name__)
+
+
+class Chunk(NamedTuple):
+    """
+    A slice of the audio transcribed by a single worker.
+
+    ``start``/``end`` delimit the samples the chunk is responsible for, while
+    ``window_start``/``window_end`` include the overlap actually decoded.
+    """
+
+    start: int
+    end: int
+    window_start: int
+    window_end: int
+
+
+def detect_speech(
+    audio: np.ndarray,
+    min_silence_duration_ms: int = 500,
+) -> List[dict]:
+    """
+    Detect speech regions with the Silero VAD model bundled with faster-whisper.
+
+    Args:
+        audio (np.ndarray): 16 kHz mono float32 samples.
+        min_silence_duration_ms (int, optional): The shortest pause that separates two regions.
+            Defaults to 500.
+
+    Returns:
+        List[dict]: Speech regions as ``{"start": sample, "end": sample}`` dictionaries.
+    """
+    options = VadOptions(min_silence_duration_ms=min_silence_duration_ms)
+    return get_speech_timestamps(audio, vad_options=options)
+
+
+def plan_chunks(
+    speech: Sequence[dict],
+    total_samples: int,
+    chunk_samples: int,
+    overlap_samples: int = 0,
+) -> List[Chunk]:
+    """
+    Split the audio into chunks cut in the middle of silences.
+
+    A cut is placed in the first pause after a chunk reached ``chunk_samples``.
+    Stretches without any pause longer than twice ``chunk_samples`` are cut at
+    fixed intervals; those cuts rely on the overlap to keep words intact.
+
+    Args:
+        speech (Sequence[dict]): Speech regions as returned by ``detect_speech``.
+        total_samples (int): The length of the audio.
+        chunk_samples (int): The target chunk length in samples.
+        overlap_samples (int, optional): Samples decoded on each side of a chunk. Defaults to 0.
+
+    Returns:
+        List[Chunk]: The chunks covering the whole audio in order, none for empty audio.
+    """
+    if not total_samples:
+        return []
+
+    cuts = [0]
+    for current, following in zip(speech, speech[1:]):
+        if current["end"] - cuts[-1] >= chunk_samples:
+            cuts.append((current["end"] + following["start"]) // 2)
+    cuts.append(total_samples)
+
+    bounds = []
+    for start, end in zip(cuts, cuts[1:]):
+        pieces = max(1, -(-(end - start) // (2 * chunk_samples)))
+        step = -(-(end - start) // pieces)
+        bounds.extend(
+            (offset, min(offset + step, end)) for offset in range(start, end, step)
+        )
+
+    return [
+        Chunk(
+            start=start,
+            end=end,
+            window_start=max(0, start - overlap_samples),
+            window_end=min(total_samples, end + overlap_samples),
+        )
+        for start, end in bounds
+    ]
+
+
+def merge_chunk_segments(
+    chunks: Sequence[Chunk],
+    results: Sequence[List[Segment]],
+    sample_rate: int = SAMPLE_RATE,
+) -> List[Segment]:
+    """
+    Stitch the segments of every chunk into a single timeline.
+
+    Segments must already carry absolute timestamps. A segment decoded in an
+    overlap is kept only by the chunk owning its midpoint, so speech near a cut is
+    emitted exactly once.
+
+    Args:
+        chunks (Sequence[Chunk]): The planned chunks.
+        results (Sequence[List[Segment]]): The segments transcribed for each chunk.
+        sample_rate (int, optional): The sampling rate of the audio. Defaults to 16000.
+
+    Returns:
+        List[Segment]: The de-duplicated segments ordered by start time.
+    """
+    merged = []
+    for index, (chunk, segments) in enumerate(zip(chunks, results)):
+        start = chunk.start / sample_rate
+        end = chunk.end / sample_rate
+        is_last = index == len(chunks) - 1
+
+        for segment in segments:
+            middle = (segment.start + segment.end) / 2
+            if start <= middle < end or (is_last and middle >= start):
+                merged.append(segment)
+
+    merged.sort(key=lambda segment: segment.start)
+    return merged
+
+
+def transcribe_chunk(
+    audio: np.ndarray,
+    offset: float,
+    model_name: str,
+    device: str,
+    compute_type: str,
+    cpu_threads: int,
+    options: dict,
+) -> Tuple[str, List[Segment]]:
+    """
+    Transcribe one chunk in a worker process.
+
+    The model is taken from the worker's own ``model_pool``, so it is loaded once
+    per process and reused by every following chunk.
+
+    Returns:
+        Tuple[str, List[Segment]]: The detected language and segments with absolute timestamps.
+    """
+    model = model_pool.get(
+        model_name,
+        device=device,
+        compute_type=compute_type,
+        cpu_threads=cpu_threads,
+    )
+
+    segments, info = model.transcribe(audio, **options)
+
+    return info.language, [Segment.from_whisper(s, offset) for s in segments]
+
+
+class ChunkedTranscriber:
+    """
+    Transcribes long audio by spreading silence-aligned chunks over a process pool.
+
+    Attributes:
+        workers (int): The number of worker processes.
+        chunk_length_s (float): The target chunk length in seconds.
+        overlap_s (float): The audio decoded on each side of a chunk in seconds.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        chunk_length_s: float = 300.0,
+        overlap_s: float = 2.0,
+        executor: Optional[Executor] = None,
+    ):
+        """
+        Initializes the ChunkedTranscriber.
+
+        Args:
+            workers (int, optional): The number of worker processes. Defaults to the CPU count.
+            chunk_length_s (float, optional): The target chunk length in seconds. Defaults to 300.
+            overlap_s (float, optional): The overlap decoded around cuts in seconds. Defaults to 2.
+            executor (Executor, optional): The executor running the chunks. Defaults to a
+                process pool created on first use.
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_length_s = chunk_length_s
+        self.overlap_s = overlap_s
+        self._executor = executor
+        self._owns_executor = executor is None
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    def plan(
+        self, audio: np.ndarray, speech: Optional[Sequence[dict]] = None
+    ) -> List[Chunk]:
+        """Plan the chunks of the given audio, detecting its speech unless given."""
+        return plan_chunks(
+            detect_speech(audio) if speech is None else speech,
+            total_samples=len(audio),
+            chunk_samples=int(self.chunk_length_s * SAMPLE_RATE),
+            overlap_samples=int(self.overlap_s * SAMPLE_RATE),
+        )
+
+    def transcribe(
+        self,
+        audio: np.ndarray,
+        model_name: str,
+        device: str = "cpu",
+        compute_type: str = "int8",
+        cpu_threads: int = 0,
+        speech: Optional[Sequence[dict]] = None,
+        **options,
+    ) -> Tuple[Optional[str], List[Segment]]:
+        """
+        Transcribe the audio chunk by chunk in parallel.
+
+        Args:
+            audio (np.ndarray): 16 kHz mono float32 samples.
+            model_name (str): The name of the Whisper model to use.
+            device (str, optional): The device to use for inference. Defaults to "cpu".
+            compute_type (str, optional): The precision type for computation. Defaults to "int8".
+            cpu_threads (int, optional): Threads per worker, 0 splits the CPU count evenly
+                between workers. Defaults to 0.
+            speech (Optional[Sequence[dict]], optional): Speech regions already known, e.g.
+                from a ``SpeechMap``, so the audio is not scanned again. Defaults to None.
+            **options: Keyword arguments passed to ``WhisperModel.transcribe``.
+
+        Returns:
+            Tuple[Optional[str], List[Segment]]: The most frequently detected language and the
+                stitched segments, None and no segments for empty audio.
+        """
+        if not len(audio):
+            logger.info("No audio to transcribe")
+            return None, []
+
+        chunks = self.plan(audio, speech)
+        cpu_threads = cpu_threads or max(1, (os.cpu_count() or 1) // self.workers)
+
+        logger.info(
+            f"Transcribing {len(audio) / SAMPLE_RATE:.1f}s of audio in {len(chunks)} "
+            f"chunks on {self.workers} workers"
+        )
+
+        futures = [
+            self.executor.submit(
+                transcribe_chunk,
+                audio[chunk.window_start : chunk.window_end],
+                chunk.window_start / SAMPLE_RATE,
+                model_name,
+                device,
+                compute_type,
+                cpu_threads,
+                options,
+            )
+            for chunk in chunks
+        ]
+        languages, results = zip(*(future.result() for future in futures))
+
+        language = Counter(languages).most_common(1)[0][0]
+
+        return language, merge_chunk_segments(chunks, results)
+
+    def close(self) -> None:
+        """Shut down the worker processes owned by the transcriber."""
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+_transcribers: Dict[int, ChunkedTranscriber] = {}
+_transcribers_lock = threading.Lock()
+
+
+def get_chunked_transcriber(workers: int) -> ChunkedTranscriber:
+    """
+    Return the process-wide ChunkedTranscriber for the given number of workers.
+
+    Reusing the transcriber keeps its worker processes, and the models they
+    loaded, alive between jobs.
+    """
+    with _transcribers_lock:
+        if workers not in _transcribers:
+            _transcribers[workers] = ChunkedTranscriber(workers=workers)
+        return _transcribers[workers]
@@ -0,0 +1,138 @@
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+from app.config import config
+from app.ffmpeg_utils import SAMPLE_RATE
+from app.logger import get_logger
+from app.transcriber.model_pool import WhisperModelPool, model_pool
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class DetectedLanguage:
+    """
+    The outcome of language detection on an audio probe.
+
+    Attributes:
+        language (str): The language to transcribe in.
+        probability (float): The confidence of the model in its best guess, 0 if it did not run.
+        detected (bool): Whether the language comes from the model rather than the fallback.
+    """
+
+    language: str
+    probability: float
+    detected: bool
+
+
+class LanguageDetector:
+    """
+    Detects the spoken language of a short audio probe with a small Whisper model.
+
+    The model stays loaded in the shared model pool, so detection costs a single
+    encoder pass per window once warm. Only the speech found by the Silero VAD
+    is shown to the model, which otherwise guesses a language even from
+    silence. Guesses below ``threshold`` are discarded in favour of the
+    fallback language, as are probes holding less than ``min_speech_seconds``
+    of speech.
+
+    Attributes:
+        model_name (str): The Whisper model used for detection.
+        compute_type (str): The precision type used for computation.
+        threshold (float): The lowest probability of a guess that is trusted.
+        min_speech_seconds (float): The least speech worth running the model on.
+    """
+
+    def __init__(
+        self,
+        model_name: str = "tiny",
+        compute_type: str = "int8",
+        threshold: float = 0.6,
+        min_speech_seconds: float = 1.0,
+        pool: Optional[WhisperModelPool] = None,
+    ):
+        self.model_name = model_name
+        self.compute_type = compute_type
+        self.threshold = threshold
+        self.min_speech_seconds = min_speech_seconds
+        self._pool = pool or model_pool
+
+    def detect(self, samples: np.ndarray, fallback: str) -> DetectedLanguage:
+        """
+        Detect the language of a probe.
+
+        Args:
+            samples (np.ndarray): 16 kHz mono float32 samples, e.g. from ``FFmpegProcessor.read_pcm``.
+            fallback (str): The language used when detection is not confident.
+
+        Returns:
+            DetectedLanguage: The detected language, or the fallback.
+        """
+        min_samples = self.min_speech_seconds * SAMPLE_RATE
+        if len(samples) < min_samples:
+            logger.info(
+                f"Audio probe too short to detect its language, using {fallback}"
+            )
+            return DetectedLanguage(fallback, 0.0, detected=False)
+
+        samples = np.ascontiguousarray(samples, dtype=np.float32)
+        regions = get_speech_timestamps(samples, vad_options=VadOptions())
+        if sum(region["end"] - region["start"] for region in regions) < min_samples:
+            logger.info(f"Too little speech in the audio probe, using {fallback}")
+            return DetectedLanguage(fallback, 0.0, detected=False)
+
+        speech = np.concatenate(
+            [samples[region["start"] : region["end"]] for region in regions]
+        )
+        model = self._pool.get(self.model_name, compute_type=self.compute_type)
+        language, probability = self._detect(model, speech)
+
+        if probability < self.threshold:
+            logger.info(
+                f"Detected {language} with probability {probability:.2f} below "
+                f"{self.threshold:.2f}, using {fallback}"
+            )
+            return DetectedLanguage(fallback, probability, detected=False)
+
+        logger.info(f"Detected {language} with probability {probability:.2f}")
+        return DetectedLanguage(language, probability, detected=True)
+
+    def _detect(self, model, speech: np.ndarray) -> Tuple[str, float]:
+        """
+        Run the language head of Whisper on every 30 second window of speech.
+
+        Goes through the encoder and ``model.model.detect_language`` directly,
+        the API faster-whisper has had since 1.0, rather than
+        ``WhisperModel.detect_language``, which only exists from 1.1. The first
+        window above ``threshold`` decides; otherwise the language guessed on
+        most windows wins with its best probability.
+        """
+        extractor = model.feature_extractor
+        windows = max(1, int(np.ceil(len(speech) / extractor.n_samples)))
+        features = extractor(speech)
+
+        guesses: Dict[str, List[float]] = {}
+        for index in range(windows):
+            start = index * extractor.nb_max_frames
+            window = features[..., start : start + extractor.nb_max_frames]
+            missing = extractor.nb_max_frames - window.shape[-1]
+            if missing > 0:
+                window = np.pad(window, [(0, 0)] * (window.ndim - 1) + [(0, missing)])
+
+            token, probability = model.model.detect_language(model.encode(window))[0][0]
+            language = token[2:-2]
+            if probability > self.threshold:
+                return language, probability
+            guesses.setdefault(language, []).append(probability)
+
+        language = max(guesses, key=lambda guess: len(guesses[guess]))
+        return language, max(guesses[language])
+
+
+language_detector = LanguageDetector(
+    model_name=config.language_detection_model,
+    threshold=config.language_detection_threshold,
+)
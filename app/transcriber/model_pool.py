@@ -0,0 +1,218 @@
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, NamedTuple, Optional
+
+from faster_whisper import WhisperModel
+
+from app.config import config
+from app.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Approximate parameter counts (in millions) of the published Whisper checkpoints.
+MODEL_PARAMETERS_M = {
+    "tiny": 39,
+    "tiny.en": 39,
+    "base": 74,
+    "base.en": 74,
+    "small": 244,
+    "small.en": 244,
+    "medium": 769,
+    "medium.en": 769,
+    "large-v1": 1550,
+    "large-v2": 1550,
+    "large-v3": 1550,
+    "large": 1550,
+    "distil-large-v2": 756,
+    "distil-large-v3": 756,
+    "distil-medium.en": 394,
+    "distil-small.en": 166,
+    "large-v3-turbo": 809,
+    "turbo": 809,
+}
+
+# Bytes used to store a single weight for each CTranslate2 compute type.
+COMPUTE_TYPE_BYTES = {
+    "int8": 1,
+    "int8_float32": 1,
+    "int8_float16": 1,
+    "int8_bfloat16": 1,
+    "int16": 2,
+    "float16": 2,
+    "bfloat16": 2,
+    "float32": 4,
+    "default": 2,
+    "auto": 2,
+}
+
+
+class ModelKey(NamedTuple):
+    model_name: str
+    device: str
+    compute_type: str
+    cpu_threads: int
+    num_workers: int
+
+
+def estimate_model_memory_mb(
+    model_name: str,
+    compute_type: str,
+    default_mb: int = 2048,
+) -> int:
+    """
+    Estimate the resident memory of a loaded Whisper model.
+
+    Args:
+        model_name (str): The name of the Whisper model (e.g. "small", "large-v3").
+        compute_type (str): The CTranslate2 compute type the model is loaded with.
+        default_mb (int, optional): The estimate used for unknown models or local paths.
+            Defaults to 2048.
+
+    Returns:
+        int: The estimated memory footprint in megabytes.
+    """
+    parameters = MODEL_PARAMETERS_M.get(model_name)
+    if parameters is None:
+        return default_mb
+
+    bytes_per_weight = COMPUTE_TYPE_BYTES.get(compute_type, 4)
+    return parameters * bytes_per_weight
+
+
+class WhisperModelPool:
+    """
+    A process-wide registry of loaded Whisper models.
+
+    Models are keyed by their load parameters and kept in least-recently-used
+    order. Whenever the estimated resident size of the pool exceeds the memory
+    budget, the least recently used models are dropped from the pool.
+
+    Attributes:
+        memory_budget_mb (int): The memory budget of the pool in megabytes, 0 disables the limit.
+        loads (int): The number of models loaded from disk.
+        hits (int): The number of requests served by an already loaded model.
+        evictions (int): The number of models dropped from the pool.
+    """
+
+    def __init__(
+        self,
+        memory_budget_mb: int = 0,
+        loader: Optional[Callable[..., WhisperModel]] = None,
+    ):
+        """
+        Initializes the pool.
+
+        Args:
+            memory_budget_mb (int, optional): The memory budget in megabytes. Defaults to 0 (unbounded).
+            loader (Callable, optional): The factory used to load models. Defaults to ``WhisperModel``.
+        """
+        self.memory_budget_mb = memory_budget_mb
+        self._loader = loader or WhisperModel
+        self._models: "OrderedDict[ModelKey, WhisperModel]" = OrderedDict()
+        self._sizes: Dict[ModelKey, int] = {}
+        self._lock = threading.Lock()
+        self._load_locks: Dict[ModelKey, threading.Lock] = {}
+
+        self.loads = 0
+        self.hits = 0
+        self.evictions = 0
+
+    @property
+    def resident_mb(self) -> int:
+        """The estimated memory held by the loaded models in megabytes."""
+        return sum(self._sizes.values())
+
+    @property
+    def stats(self) -> dict:
+        """A snapshot of the pool counters."""
+        with self._lock:
+            return {
+                "loads": self.loads,
+                "hits": self.hits,
+                "evictions": self.evictions,
+                "resident_mb": self.resident_mb,
+                "models": [key.model_name for key in self._models],
+            }
+
+    def get(
+        self,
+        model_name: str,
+        device: str = "cpu",
+        compute_type: str = "int8",
+        cpu_threads: int = 0,
+        num_workers: int = 1,
+    ) -> WhisperModel:
+        """
+        Return a loaded Whisper model, loading it on first use.
+
+        Args:
+            model_name (str): The name of the Whisper model to use.
+            device (str, optional): The device to use for inference. Defaults to "cpu".
+            compute_type (str, optional): The precision type for computation. Defaults to "int8".
+            cpu_threads (int, optional): The number of threads used on CPU, 0 lets CTranslate2 decide.
+                Defaults to 0.
+            num_workers (int, optional): The number of concurrent transcriptions the model allows.
+                Defaults to 1.
+
+        Returns:
+            WhisperModel: The shared model instance.
+        """
+        key = ModelKey(model_name, device, compute_type, cpu_threads, num_workers)
+
+        with self._lock:
+            model = self._lookup(key)
+            if model is not None:
+                return model
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        with load_lock:
+            with self._lock:
+                model = self._lookup(key)
+                if model is not None:
+                    return model
+
+                size_mb = estimate_model_memory_mb(model_name, compute_type)
+                self._evict(reserve_mb=size_mb)
+
+            logger.info(f"Loading Whisper model {key}")
+            model = self._loader(
+                model_name,
+                device=device,
+                compute_type=compute_type,
+                cpu_threads=cpu_threads,
+                num_workers=num_workers,
+            )
+
+            with self._lock:
+                self._models[key] = model
+                self._sizes[key] = size_mb
+                self.loads += 1
+                self._load_locks.pop(key, None)
+
+        return model
+
+    def clear(self) -> None:
+        """Drop every model from the pool."""
+        with self._lock:
+            self._models.clear()
+            self._sizes.clear()
+
+    def _lookup(self, key: ModelKey) -> Optional[WhisperModel]:
+        model = self._models.get(key)
+        if model is not None:
+            self._models.move_to_end(key)
+            self.hits += 1
+        return model
+
+    def _evict(self, reserve_mb: int = 0) -> None:
+        if not self.memory_budget_mb:
+            return
+
+        while self._models and self.resident_mb + reserve_mb > self.memory_budget_mb:
+            key, _ = self._models.popitem(last=False)
+            self._sizes.pop(key, None)
+            self.evictions += 1
+            logger.info(f"Evicted Whisper model {key} from the pool")
+
+
+model_pool = WhisperModelPool(memory_budget_mb=config.whisper_pool_memory_mb)
@@ -0,0 +1,158 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+from app.config import config
+from app.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class QualityTier:
+    """
+    A set of transcription settings trading accuracy for speed.
+
+    Attributes:
+        name (str): The name used in configuration and job records.
+        model_name (str): The Whisper model.
+        beam_size (int): The beam size used for decoding.
+        compute_type (str): The precision type used for computation.
+        realtime_factor (float): The seconds of inference needed per second of audio,
+            used to check whether a tier meets a deadline.
+    """
+
+    name: str
+    model_name: str
+    beam_size: int
+    compute_type: str = "int8"
+    realtime_factor: float = 1.0
+
+
+# Ordered from the most accurate to the fastest tier.
+TIERS = (
+    QualityTier("high", "large-v3", beam_size=5, realtime_factor=1.0),
+    QualityTier("medium", "medium", beam_size=3, realtime_factor=0.5),
+    QualityTier("low", "small", beam_size=1, realtime_factor=0.15),
+)
+
+
+@dataclass
+class TierDecision:
+    """
+    The tier chosen for a job and the rules that moved it away from the default.
+
+    Attributes:
+        tier (QualityTier): The chosen tier.
+        reasons (List[str]): The applied downgrades, e.g. ``"backlog 12"``.
+    """
+
+    tier: QualityTier
+    reasons: List[str] = field(default_factory=list)
+
+
+class TierPolicy:
+    """
+    Picks the quality tier of a job from its duration, the backlog, its deadline and locale.
+
+    Every job starts at the tier of its locale, or the default tier. A clip longer
+    than ``long_clip_seconds`` is downgraded by one tier, and so is every backlog
+    threshold the queue depth reaches. Finally, a job with a deadline is
+    downgraded until the estimated inference time of the tier fits the time
+    left, or the fastest tier is reached.
+
+    Attributes:
+        tiers (Sequence[QualityTier]): The tiers from the most accurate to the fastest.
+        default_tier (str): The starting tier of locales without their own.
+        locale_tiers (Dict[str, str]): The starting tier of a language, e.g. ``{"en": "medium"}``.
+        long_clip_seconds (float): The duration above which a clip is downgraded, 0 disables the rule.
+        backlog_thresholds (Sequence[int]): The queue depths each adding a downgrade.
+    """
+
+    def __init__(
+        self,
+        tiers: Sequence[QualityTier] = TIERS,
+        default_tier: str = "high",
+        locale_tiers: Optional[Dict[str, str]] = None,
+        long_clip_seconds: float = 0,
+        backlog_thresholds: Sequence[int] = (),
+    ):
+        self.tiers = list(tiers)
+        self.default_tier = default_tier
+        self.locale_tiers = dict(locale_tiers or {})
+        self.long_clip_seconds = long_clip_seconds
+        self.backlog_thresholds = sorted(backlog_thresholds)
+
+        for name in [default_tier, *self.locale_tiers.values()]:
+            self.tier(name)
+
+    def tier(self, name: str) -> QualityTier:
+        """
+        Find a tier by name.
+
+        Raises:
+            ValueError: If there is no such tier.
+        """
+        for tier in self.tiers:
+            if tier.name == name:
+                return tier
+        raise ValueError(f"Unknown quality tier: {name}")
+
+    def select(
+        self,
+        duration: Optional[float] = None,
+        queue_depth: int = 0,
+        time_left: Optional[float] = None,
+        locale: Optional[str] = None,
+    ) -> TierDecision:
+        """
+        Choose the tier of a job.
+
+        Args:
+            duration (Optional[float], optional): The length of the audio in seconds,
+                None skips the rules depending on it. Defaults to None.
+            queue_depth (int, optional): The number of jobs waiting. Defaults to 0.
+            time_left (Optional[float], optional): The seconds until the deadline of the job,
+                None if it has none. Defaults to None.
+            locale (Optional[str], optional): The language of the audio. Defaults to None.
+
+        Returns:
+            TierDecision: The chosen tier and the reasons of every downgrade.
+        """
+        start = self.tier(self.locale_tiers.get(locale, self.default_tier))
+        index = self.tiers.index(start)
+        reasons = []
+
+        if duration and self.long_clip_seconds and duration > self.long_clip_seconds:
+            index += 1
+            reasons.append(f"long clip {duration:.0f}s")
+
+        steps = sum(queue_depth >= threshold for threshold in self.backlog_thresholds)
+        if steps:
+            index += steps
+            reasons.append(f"backlog {queue_depth}")
+
+        index = min(index, len(self.tiers) - 1)
+
+        if duration and time_left is not None:
+            while (
+                index < len(self.tiers) - 1
+                and duration * self.tiers[index].realtime_factor > time_left
+            ):
+                index += 1
+                if "deadline" not in reasons:
+                    reasons.append("deadline")
+
+        return TierDecision(self.tiers[index], reasons)
+
+    @classmethod
+    def from_config(cls) -> "TierPolicy":
+        """Build the policy from the TRANSCRIBE_* settings."""
+        return cls(
+            default_tier=config.transcribe_tier,
+            locale_tiers=config.transcribe_locale_tiers,
+            long_clip_seconds=config.transcribe_long_clip_minutes * 60,
+            backlog_thresholds=config.transcribe_backlog_thresholds,
+        )
+
+
+tier_policy = TierPolicy.from_config()
@@ -0,0 +1,66 @@
+from dataclasses import dataclass, field, replace
+from typing import Any, List
+
+
+@dataclass
+class Word:
+    start: float
+    end: float
+    word: str
+    probability: float = 1.0
+
+
+@dataclass
+class Segment:
+    """
+    A transcribed segment detached from faster-whisper.
+
+    Unlike the segments yielded by ``WhisperModel.transcribe`` it can be pickled
+    between processes, serialized and shifted in time regardless of the installed
+    faster-whisper version.
+    """
+
+    start: float
+    end: float
+    text: str
+    words: List[Word] = field(default_factory=list)
+
+    @classmethod
+    def from_whisper(cls, segment: Any, offset: float = 0.0) -> "Segment":
+        """
+        Build a segment from a faster-whisper segment.
+
+        Args:
+            segment (Any): The segment yielded by ``WhisperModel.transcribe``.
+            offset (float, optional): Seconds added to every timestamp. Defaults to 0.0.
+
+        Returns:
+            Segment: The converted segment.
+        """
+        words = [
+            Word(
+                start=word.start + offset,
+                end=word.end + offset,
+                word=word.word,
+                probability=word.probability,
+            )
+            for word in (segment.words or [])
+        ]
+        return cls(
+            start=segment.start + offset,
+            end=segment.end + offset,
+            text=segment.text,
+            words=words,
+        )
+
+    def shift(self, offset: float) -> "Segment":
+        """Return a copy of the segment moved by ``offset`` seconds."""
+        return replace(
+            self,
+            start=self.start + offset,
+            end=self.end + offset,
+            words=[
+                replace(word, start=word.start + offset, end=word.end + offset)
+                for word in self.words
+            ],
+        )
@@ -0,0 +1,342 @@
+import json
+from bisect import bisect_right
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, List, Optional, Tuple
+
+import numpy as np
+from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+from app.config import config
+from app.ffmpeg_utils import SAMPLE_RATE
+from app.logger import get_logger
+from app.transcriber.segments import Segment, Word
+
+logger = get_logger(__name__)
+
+
+def frame_energy_db(samples: np.ndarray, frame_samples: int) -> np.ndarray:
+    """
+    Compute the RMS level of consecutive frames in dBFS.
+
+    Trailing samples that do not fill a whole frame are ignored.
+
+    Args:
+        samples (np.ndarray): Mono float32 samples in the [-1, 1] range.
+        frame_samples (int): The length of a frame in samples.
+
+    Returns:
+        np.ndarray: The level of every frame, -inf free thanks to a tiny floor.
+    """
+    frames = len(samples) // frame_samples
+    if not frames:
+        return np.empty(0, dtype=np.float32)
+
+    blocks = samples[: frames * frame_samples].reshape(frames, frame_samples)
+    rms = np.sqrt(np.mean(np.square(blocks, dtype=np.float32), axis=1))
+    return 20 * np.log10(np.maximum(rms, 1e-10))
+
+
+@dataclass
+class SpeechMap:
+    """
+    The speech regions of an audio track and the mapping to its speech-only version.
+
+    Transcribing only the concatenated regions shifts every timestamp; the map
+    converts times of the speech-only audio back to the original timeline and
+    the other way around.
+
+    Attributes:
+        regions (List[Tuple[int, int]]): The first and past-the-end sample of every
+            speech region in the original audio, in order and not overlapping.
+        total_samples (int): The length of the original audio.
+        sample_rate (int): The sampling rate of both timelines.
+    """
+
+    regions: List[Tuple[int, int]] = field(default_factory=list)
+    total_samples: int = 0
+    sample_rate: int = SAMPLE_RATE
+
+    def __post_init__(self):
+        self.regions = [(int(start), int(end)) for start, end in self.regions]
+        self._offsets = np.cumsum([0] + [end - start for start, end in self.regions])
+
+    @property
+    def speech_samples(self) -> int:
+        return int(self._offsets[-1])
+
+    @property
+    def speech_ratio(self) -> float:
+        return self.speech_samples / self.total_samples if self.total_samples else 0.0
+
+    def compact(self, samples: np.ndarray) -> np.ndarray:
+        """Concatenate the speech regions of the original audio."""
+        if not self.regions:
+            return np.empty(0, dtype=np.float32)
+        return np.concatenate([samples[start:end] for start, end in self.regions])
+
+    def source_time(self, seconds: float, is_end: bool = False) -> float:
+        """
+        Convert a time of the speech-only audio to the original timeline.
+
+        A time falling exactly on the joint of two regions belongs to the next
+        region, or to the previous one when it ends something, e.g. a word.
+        """
+        if not self.regions:
+            return seconds
+
+        position = seconds * self.sample_rate
+        index = bisect_right(self._offsets, position, hi=len(self.regions)) - 1
+        if is_end and index > 0 and position == self._offsets[index]:
+            index -= 1
+        index = max(0, index)
+
+        start = self.regions[index][0]
+        return (start + position - self._offsets[index]) / self.sample_rate
+
+    def compact_time(self, seconds: float) -> float:
+        """Convert a time of the original audio to the speech-only timeline."""
+        position = seconds * self.sample_rate
+        starts = [start for start, _ in self.regions]
+        index = bisect_right(starts, position) - 1
+        if index < 0:
+            return 0.0
+
+        start, end = self.regions[index]
+        inside = min(position, end) - start
+        return (self._offsets[index] + inside) / self.sample_rate
+
+    def restore(self, segment: Segment) -> Segment:
+        """Move a segment transcribed from the speech-only audio to the original timeline."""
+        return Segment(
+            start=self.source_time(segment.start),
+            end=self.source_time(segment.end, is_end=True),
+            text=segment.text,
+            words=[
+                Word(
+                    start=self.source_time(word.start),
+                    end=self.source_time(word.end, is_end=True),
+                    word=word.word,
+                    probability=word.probability,
+                )
+                for word in segment.words
+            ],
+        )
+
+    def compacted_regions(self) -> List[dict]:
+        """
+        The regions within the speech-only audio, in the format of ``detect_speech``.
+
+        The joints between them are where the original audio was silent, which
+        makes them natural cut points for chunked transcription.
+        """
+        return [
+            {"start": int(start), "end": int(end)}
+            for start, end in zip(self._offsets[:-1], self._offsets[1:])
+        ]
+
+    def save(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "regions": self.regions,
+                    "total_samples": self.total_samples,
+                    "sample_rate": self.sample_rate,
+                },
+                f,
+            )
+
+    @classmethod
+    def load(cls, path: str) -> "SpeechMap":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(**json.load(f))
+
+
+class VoiceActivityDetector:
+    """
+    Finds speech in streamed PCM and keeps only the speech samples.
+
+    Every frame first goes through a cheap RMS energy gate. Stretches quieter
+    than ``energy_threshold_db`` are dropped on arrival, so long silences never
+    accumulate in memory. Loud stretches, padded by ``pad_ms`` on each side,
+    are then confirmed by the Silero model, which also rejects music and noise
+    that passed the energy gate. A loud stretch longer than ``max_stretch_ms``,
+    e.g. continuous music or crowd noise, is handed over in pieces of that
+    length, the padding carried over into the next piece, so memory stays
+    bounded whatever the audio.
+
+    Attributes:
+        energy_threshold_db (float): The level below which a frame is silent, in dBFS.
+        frame_ms (int): The length of an energy frame in milliseconds.
+        pad_ms (int): The audio kept around loud stretches, and the shortest silence splitting them.
+        use_silero (bool): Confirm loud stretches with Silero instead of keeping them whole.
+        min_silence_duration_ms (int): The shortest pause separating two Silero speech regions.
+        max_stretch_ms (int): The longest loud stretch held before it is confirmed.
+    """
+
+    def __init__(
+        self,
+        energy_threshold_db: float = -45.0,
+        frame_ms: int = 30,
+        pad_ms: int = 300,
+        use_silero: bool = True,
+        min_silence_duration_ms: int = 500,
+        max_stretch_ms: int = 30000,
+        sample_rate: int = SAMPLE_RATE,
+    ):
+        self.energy_threshold_db = energy_threshold_db
+        self.frame_ms = frame_ms
+        self.pad_ms = pad_ms
+        self.use_silero = use_silero
+        self.min_silence_duration_ms = min_silence_duration_ms
+        self.max_stretch_ms = max_stretch_ms
+        self.sample_rate = sample_rate
+
+    def detect(self, samples: np.ndarray) -> Tuple[SpeechMap, np.ndarray]:
+        """Find the speech of audio already in memory, see ``detect_stream``."""
+        return self.detect_stream([samples])
+
+    def detect_stream(
+        self, blocks: Iterable[np.ndarray]
+    ) -> Tuple[SpeechMap, np.ndarray]:
+        """
+        Find the speech of streamed audio, e.g. ``FFmpegProcessor.stream_pcm``.
+
+        Args:
+            blocks (Iterable[np.ndarray]): Consecutive blocks of mono float32 samples.
+
+        Returns:
+            Tuple[SpeechMap, np.ndarray]: The speech regions and the concatenated speech samples.
+        """
+        frame = max(1, self.sample_rate * self.frame_ms // 1000)
+        pad_frames = max(1, self.pad_ms // self.frame_ms)
+        stretches = _LoudStretches(
+            frame,
+            pad_frames,
+            max_frames=max(2 * pad_frames, self.max_stretch_ms // self.frame_ms),
+            confirm=self._confirm,
+        )
+        remainder = np.empty(0, dtype=np.float32)
+
+        for block in blocks:
+            samples = np.concatenate([remainder, block])
+            count = len(samples) // frame
+            loud = frame_energy_db(samples, frame) > self.energy_threshold_db
+            remainder = samples[count * frame :]
+
+            for index in range(count):
+                stretches.add(samples[index * frame : (index + 1) * frame], loud[index])
+
+        regions, speech = stretches.finish()
+        total = stretches.position + len(remainder)
+        speech_map = SpeechMap(
+            regions, total_samples=total, sample_rate=self.sample_rate
+        )
+        logger.info(
+            f"Kept {speech_map.speech_samples / self.sample_rate:.1f}s of speech out of "
+            f"{total / self.sample_rate:.1f}s ({speech_map.speech_ratio:.0%})"
+        )
+
+        if not speech:
+            return speech_map, np.empty(0, dtype=np.float32)
+        return speech_map, np.concatenate(speech)
+
+    def _confirm(
+        self,
+        start: int,
+        samples: np.ndarray,
+        regions: List[Tuple[int, int]],
+        speech: List[np.ndarray],
+    ) -> None:
+        if self.use_silero:
+            options = VadOptions(min_silence_duration_ms=self.min_silence_duration_ms)
+            found = get_speech_timestamps(samples, vad_options=options)
+        else:
+            found = [{"start": 0, "end": len(samples)}]
+
+        for region in found:
+            region_start, end = start + region["start"], start + region["end"]
+            # Pieces of one long stretch join where it was split.
+            if regions and regions[-1][1] == region_start:
+                region_start = regions.pop()[0]
+            regions.append((region_start, end))
+            speech.append(samples[region["start"] : region["end"]])
+
+
+class _LoudStretches:
+    """
+    Collects the loud stretches of a stream of energy frames, with their padding.
+
+    Frames before a stretch only stay while they can still become its leading
+    padding. A stretch is confirmed once ``2 * pad_frames`` quiet frames end it,
+    or in pieces of ``max_frames`` while it lasts, the last ``pad_frames``
+    frames of a piece starting the next one.
+    """
+
+    def __init__(
+        self,
+        frame: int,
+        pad_frames: int,
+        max_frames: int,
+        confirm: Callable[[int, np.ndarray, List, List], None],
+    ):
+        self.frame = frame
+        self.pad_frames = pad_frames
+        self.max_frames = max_frames
+        self.confirm = confirm
+        self.regions: List[Tuple[int, int]] = []
+        self.speech: List[np.ndarray] = []
+        self.position = 0
+        self._leading = deque(maxlen=pad_frames)
+        self._candidate: List[np.ndarray] = []
+        self._start: Optional[int] = None
+        self._silent_frames = 0
+
+    def add(self, chunk: np.ndarray, loud: bool) -> None:
+        if loud:
+            if self._start is None:
+                self._start = self.position - len(self._leading) * self.frame
+                self._candidate = list(self._leading)
+                self._leading.clear()
+            self._candidate.append(chunk)
+            self._silent_frames = 0
+            if len(self._candidate) >= self.max_frames:
+                self._flush()
+        elif self._start is not None:
+            self._candidate.append(chunk)
+            self._silent_frames += 1
+            if self._silent_frames >= 2 * self.pad_frames:
+                self._close()
+        else:
+            self._leading.append(chunk)
+
+        self.position += self.frame
+
+    def finish(self) -> Tuple[List[Tuple[int, int]], List[np.ndarray]]:
+        if self._start is not None:
+            self._close()
+        return self.regions, self.speech
+
+    def _flush(self) -> None:
+        confirmed = len(self._candidate) - self.pad_frames
+        self._emit(self._candidate[:confirmed])
+        self._start += confirmed * self.frame
+        self._candidate = self._candidate[confirmed:]
+
+    def _close(self) -> None:
+        kept = len(self._candidate) - max(0, self._silent_frames - self.pad_frames)
+        self._emit(self._candidate[:kept])
+        # The trimmed silence may lead into the next loud stretch.
+        self._leading.extend(self._candidate[kept:])
+        self._candidate, self._start, self._silent_frames = [], None, 0
+
+    def _emit(self, chunks: List[np.ndarray]) -> None:
+        self.confirm(self._start, np.concatenate(chunks), self.regions, self.speech)
+
+
+voice_activity_detector = VoiceActivityDetector(
+    energy_threshold_db=config.vad_energy_threshold_db,
+    pad_ms=config.vad_pad_ms,
+    max_stretch_ms=config.vad_max_stretch_ms,
+    use_silero=config.vad_use_silero,
+)
@@ -1,11 +1,19 @@
 import os
-from typing import List, Tuple
+from typing import Any, Iterator, List, Optional, Sequence, Tuple, Union
 
-from faster_whisper import WhisperModel
+import numpy as np
+from faster_whisper import decode_audio
 
 import app.utils as utils
-from app.ffmpeg_utils import FFmpegProcessor
+from app.ffmpeg_utils import SAMPLE_RATE, BurnInOptions, FFmpegProcessor
 from app.logger import get_logger
+from app.subtitles.resegment import CaptionLimits, ResegmentingSink
+from app.subtitles.sinks import broadcast
+from app.subtitles.srt import SrtSink
+from app.subtitles.words import WordJsonSink
+from app.transcriber.cache import TranscriptionCache
+from app.transcriber.chunking import get_chunked_transcriber
+from app.transcriber.model_pool import model_pool
 
 logger = get_logger(__name__)
 
@@ -17,12 +25,15 @@ class WhisperVideoProcessor:
     ):
         if not os.path.exists(input_video_path):
             raise FileNotFoundError(
-                f"Input video file '{self.input_video_path}' does not exist."
+                f"Input video file '{input_video_path}' does not exist."
             )
 
-        if not utils.is_video_file(input_video_path):
+        if not (
+            utils.is_video_file(input_video_path)
+            or utils.is_audio_file(input_video_path)
+        ):
             raise ValueError(
-                f"The provided file '{self.input_video_path}' is not a video file."
+                f"The provided file '{input_video_path}' is neither a video nor an audio file."
             )
 
         self.input_video_path = input_video_path
@@ -43,6 +54,9 @@ class WhisperVideoProcessor:
     ) -> str:
         """Extract the audio from the input video and save it as a WAV file.
 
+        The file is written as 16 kHz mono, which is what Whisper consumes. Prefer
+        ``load_audio`` unless the intermediate file is needed for debugging.
+
         Args:
             output_dir (str, optional): The directory where the extracted audio file will be saved.
                 Defaults to "./".
@@ -55,26 +69,86 @@ class WhisperVideoProcessor:
         utils.create_directory_for_file(expected_audio_path)
 
         stream = self.ffmpeg_processor.input(self.input_video_path)
-        stream = self.ffmpeg_processor.output(stream, expected_audio_path)
+        stream = self.ffmpeg_processor.output(
+            stream,
+            expected_audio_path,
+            ac=1,
+            ar=SAMPLE_RATE,
+            vn=None,
+        )
 
-        self.ffmpeg_processor.run(stream)
+        self.ffmpeg_processor.run(stream, overwrite_output=True)
 
         return expected_audio_path
 
+    def load_audio(
+        self, start: float = 0, duration: Optional[float] = None
+    ) -> np.ndarray:
+        """Decode the audio of the input video straight into memory.
+
+        Args:
+            start (float, optional): The second to start decoding at. Defaults to 0.
+            duration (Optional[float], optional): The seconds to decode, None decodes
+                to the end. Defaults to None.
+
+        Returns:
+            np.ndarray: 16 kHz mono float32 samples ready to be passed to ``transcribe``.
+        """
+        return self.ffmpeg_processor.read_pcm(
+            self.input_video_path, **self._range_options(start, duration)
+        )
+
+    async def load_audio_async(
+        self, start: float = 0, duration: Optional[float] = None
+    ) -> np.ndarray:
+        """Decode the audio of the input video in an asyncio subprocess.
+
+        See ``load_audio`` for the arguments.
+
+        Returns:
+            np.ndarray: 16 kHz mono float32 samples ready to be passed to ``transcribe``.
+        """
+        return await self.ffmpeg_processor.read_pcm_async(
+            self.input_video_path, **self._range_options(start, duration)
+        )
+
+    def stream_audio(self, block_seconds: float = 10.0) -> Iterator[np.ndarray]:
+        """Decode the audio of the input video block by block, see ``FFmpegProcessor.stream_pcm``.
+
+        Yields:
+            np.ndarray: Consecutive blocks of 16 kHz mono float32 samples.
+        """
+        return self.ffmpeg_processor.stream_pcm(self.input_video_path, block_seconds)
+
+    @staticmethod
+    def _range_options(start: float, duration: Optional[float]) -> dict:
+        options = {}
+        if start:
+            options["ss"] = start
+        if duration is not None:
+            options["t"] = duration
+        return options
+
     def transcribe(
         self,
-        audio: str,
+        audio: Union[str, np.ndarray],
         model_name: str = "small",
         device: str = "cpu",
         compute_type: str = "int8",
         num_workers: int = 1,
         language: str = "en",
+        cpu_threads: int = 0,
+        chunk_workers: int = 1,
+        beam_size: int = 5,
+        cache: Optional[TranscriptionCache] = None,
+        speech: Optional[Sequence[dict]] = None,
     ) -> Tuple[str, dict]:
         """
         Transcribe the audio file using the Whisper model.
 
         Args:
-            audio (str): The path to the audio file to transcribe.
+            audio (Union[str, np.ndarray]): The path to the audio file to transcribe, or
+                16 kHz mono float32 samples as returned by ``load_audio``.
             model_name (str, optional): The name of the Whisper model to use. Defaults to "small". Better choose from "large-v3" or "small"
             device (str, optional): The device to use for inference. Choose from "cpu" or "cuda".
                 Defaults to "cpu".
@@ -82,6 +156,17 @@ class WhisperVideoProcessor:
                 or "fp32". Defaults to "int8".
             num_workers (int, optional): The number of workers to use for transcription. Defaults to 1.
             language (str, optional): The language code for transcription. Defaults to "en" (English).
+            cpu_threads (int, optional): The number of threads used for CPU inference, 0 lets
+                CTranslate2 decide. Defaults to 0.
+            chunk_workers (int, optional): The number of processes transcribing silence-aligned
+                chunks of the audio in parallel. With more than one worker the segments are
+                returned as a list instead of a lazy generator. Defaults to 1.
+            beam_size (int, optional): The beam size used for decoding. Defaults to 5.
+            cache (TranscriptionCache, optional): The cache consulted before running the model.
+                A hit skips inference entirely; otherwise the segments are stored once they
+                have been fully consumed. Defaults to None.
+            speech (Sequence[dict], optional): Known speech regions in samples, used to cut the
+                chunks without scanning the audio again. Defaults to None.
 
         Returns:
             Tuple[str, dict]: A tuple containing the detected language and the transcription segments.
@@ -89,31 +174,86 @@ class WhisperVideoProcessor:
                 The second element is a dictionary containing the transcription segments
                 with word timestamps.
         """
-        model = WhisperModel(
-            model_name,
-            compute_type=compute_type,
-            device=device,
-            num_workers=num_workers,
-        )
+        if cache is not None:
+            cache_key = cache.key(audio, model_name, compute_type, language, beam_size)
+            cached = cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"Transcription of {self.input_filename} found in cache")
+                return cached
+
+        options = {
+            "vad_filter": True,
+            "language": language,
+            "beam_size": beam_size,
+            "condition_on_previous_text": False,
+            "word_timestamps": True,
+        }
+
+        if chunk_workers > 1:
+            if isinstance(audio, str):
+                audio = decode_audio(audio, sampling_rate=SAMPLE_RATE)
+
+            detected, segments = get_chunked_transcriber(chunk_workers).transcribe(
+                audio,
+                model_name=model_name,
+                device=device,
+                compute_type=compute_type,
+                cpu_threads=cpu_threads,
+                speech=speech,
+                **options,
+            )
+            language = detected or language
+        else:
+            model = model_pool.get(
+                model_name,
+                device=device,
+                compute_type=compute_type,
+                cpu_threads=cpu_threads,
+                num_workers=num_workers,
+            )
 
-        segments, info = model.transcribe(
-            audio,
-            vad_filter=True,
-            language=language,
-            beam_size=5,
-            condition_on_previous_text=False,
-            word_timestamps=True,
-        )
+            segments, info = model.transcribe(audio, **options)
 
-        language = info[0]
+            language = info.language
+
+        if cache is not None:
+            segments = cache.record(cache_key, language, segments)
 
         return language, segments
 
+    def subtitle_path(self, language: str, output_dir: str = "./") -> str:
+        """Get the path of the subtitle file generated for the given language.
+
+        Args:
+            language (str): The language of the subtitles.
+            output_dir (str, optional): The directory where the subtitle file will be saved. Defaults to "./".
+
+        Returns:
+            str: The path to the subtitle file.
+        """
+        return os.path.join(output_dir, f"sub-{self.input_filename}.{language}.srt")
+
+    def words_path(self, language: str, output_dir: str = "./") -> str:
+        """Get the path of the word timings file generated for the given language.
+
+        Args:
+            language (str): The language of the transcription.
+            output_dir (str, optional): The directory where the file will be saved. Defaults to "./".
+
+        Returns:
+            str: The path to the word timings file.
+        """
+        return os.path.join(
+            output_dir, f"sub-{self.input_filename}.{language}.words.json"
+        )
+
     def generate_subtitle_file(
         self,
         language: str,
         segments: List,
         output_dir: str = "./",
+        limits: Optional[CaptionLimits] = None,
+        export_words: bool = False,
     ) -> str:
         """Generate a subtitle file from transcription segments.
 
@@ -121,6 +261,10 @@ class WhisperVideoProcessor:
             language (str): The language of the subtitles.
             segments (List): A list of transcription segments.
             output_dir (str, optional): The directory where the subtitle file will be saved. Defaults to "./".
+            limits (Optional[CaptionLimits], optional): Rebuild the cues from the word timings
+                under these limits instead of writing one cue per segment. Defaults to None.
+            export_words (bool, optional): Also write the word timings next to the subtitle file,
+                see ``words_path``. Defaults to False.
 
         Returns:
             str: The path to the generated subtitle file.
@@ -131,19 +275,15 @@ class WhisperVideoProcessor:
         if not segments:
             raise ValueError("Segments list is empty.")
 
-        subtitle_file = f"sub-{self.input_filename}.{language}.srt"
-        subtitle_path = os.path.join(output_dir, subtitle_file)
+        subtitle_path = self.subtitle_path(language, output_dir)
 
-        utils.create_directory_for_file(subtitle_path)
+        sinks = [SrtSink(subtitle_path)]
+        if limits is not None:
+            sinks[0] = ResegmentingSink(sinks[0], limits)
+        if export_words:
+            sinks.append(WordJsonSink(self.words_path(language, output_dir), language))
 
-        with open(subtitle_path, "w", encoding="utf-8") as file:
-            for index, segment in enumerate(segments, start=1):
-                start = utils.format_time(segment.start)
-                end = utils.format_time(segment.end)
-                text = segment.text.strip()
-                file.write(f"{index}\n")
-                file.write(f"{start} --> {end}\n")
-                file.write(f"{text}\n\n")
+        broadcast(segments, sinks)
 
         return subtitle_path
 
@@ -153,7 +293,11 @@ class WhisperVideoProcessor:
         subtitle_file_path: str,
         subtitle_language: str,
         output_directory: str = "./",
-    ):
+        burn_in_options: Optional[BurnInOptions] = None,
+        audio_tracks: Sequence[str] = (),
+        extra_subtitles: Sequence[Tuple[str, str]] = (),
+        output_filename: Optional[str] = None,
+    ) -> str:
         """Add subtitles to the input video and save the result to an output file.
 
         Args:
@@ -164,6 +308,14 @@ class WhisperVideoProcessor:
             subtitle_language (str): The language of the subtitles.
             output_directory (str, optional): The directory where the output video will be saved.
                 Defaults to "./".
+            burn_in_options (BurnInOptions, optional): The preset, CRF, threads and style used
+                when burning the subtitles in. Defaults to None (``BurnInOptions()``).
+            audio_tracks (Sequence[str], optional): Encoded audio files added as extra audio
+                tracks, e.g. a synthesized voice-over. Defaults to none.
+            extra_subtitles (Sequence[Tuple[str, str]], optional): The paths and languages of
+                further subtitle files muxed as additional soft tracks. Defaults to none.
+            output_filename (str, optional): The name of the output video. Defaults to the
+                name of the input video with an ".mp4" extension.
 
         Raises:
             ValueError: If embedded_subtitles is True but the subtitle file path is invalid.
@@ -172,40 +324,88 @@ class WhisperVideoProcessor:
 
         Note:
             - If embedded_subtitles is True, the subtitles will be burned into the video using
-            the specified font and style.
+            the specified font and style. Only the video stream is re-encoded.
             - If embedded_subtitles is False, the subtitles will be added as a separate stream
-            to the output video file.
+            to the output video file while the video and audio streams are copied as-is.
 
         Returns:
-            None
+            str: The path to the output video.
         """
-        output_video_path = os.path.join(output_directory, f"{self.input_filename}.mp4")
-        utils.create_directory_for_file(output_video_path)
+        output_video_path, stream = self._subtitle_output(
+            embedded_subtitles,
+            subtitle_file_path,
+            subtitle_language,
+            output_directory,
+            burn_in_options,
+            audio_tracks,
+            extra_subtitles,
+            output_filename,
+        )
 
-        video_stream = self.ffmpeg_processor.input(self.input_video_path)
-        subtitle_stream = self.ffmpeg_processor.input(subtitle_file_path)
+        self.ffmpeg_processor.run(stream, overwrite_output=True)
+
+        return output_video_path
+
+    async def add_subtitle_to_video_async(
+        self,
+        embedded_subtitles: bool,
+        subtitle_file_path: str,
+        subtitle_language: str,
+        output_directory: str = "./",
+        burn_in_options: Optional[BurnInOptions] = None,
+        audio_tracks: Sequence[str] = (),
+        extra_subtitles: Sequence[Tuple[str, str]] = (),
+        output_filename: Optional[str] = None,
+    ) -> str:
+        """Add subtitles to the input video in an asyncio subprocess.
 
-        subtitle_track_title = utils.get_file_name_without_extension(subtitle_file_path)
+        See ``add_subtitle_to_video`` for the arguments.
 
+        Returns:
+            str: The path to the output video.
+        """
+        output_video_path, stream = self._subtitle_output(
+            embedded_subtitles,
+            subtitle_file_path,
+            subtitle_language,
+            output_directory,
+            burn_in_options,
+            audio_tracks,
+            extra_subtitles,
+            output_filename,
+        )
+
+        await self.ffmpeg_processor.run_async(stream, overwrite_output=True)
+
+        return output_video_path
+
+    def _subtitle_output(
+        self,
+        embedded_subtitles: bool,
+        subtitle_file_path: str,
+        subtitle_language: str,
+        output_directory: str,
+        burn_in_options: Optional[BurnInOptions],
+        audio_tracks: Sequence[str] = (),
+        extra_subtitles: Sequence[Tuple[str, str]] = (),
+        output_filename: Optional[str] = None,
+    ) -> Tuple[str, Any]:
+        output_filename = output_filename or f"{self.input_filename}.mp4"
+        output_video_path = os.path.join(output_directory, output_filename)
+        utils.create_directory_for_file(output_video_path)
+
+        burn_in = None
         if embedded_subtitles:
-            stream = self.ffmpeg_processor.output(
-                video_stream,
-                output_video_path,
-                **{
-                    "vf": f"subtitles={subtitle_file_path}:force_style='FontName=Display,FontSize=14,PrimaryColour=&HFFFFFF&,Bold=1'"
-                },
-                # vf=f"subtitles={subtitle_file_path}:force_style='FontName=Display,FontSize=14,PrimaryColour=&HFFFFFF&,Bold=1'"},
-            )
-        else:
-            stream = self.ffmpeg_processor.output(
-                video_stream,
-                subtitle_stream,
-                output_video_path,
-                **{"c": "copy", "c:s": "mov_text"},
-                **{
-                    "metadata:s:s:0": f"language={subtitle_language}",  # noqa: F601
-                    "metadata:s:s:0": f"title={subtitle_track_title}",  # noqa: F601
-                },
-            )
+            burn_in = burn_in_options or BurnInOptions()
+
+        stream = self.ffmpeg_processor.subtitle_output(
+            self.input_video_path,
+            subtitle_file_path,
+            output_video_path,
+            language=subtitle_language,
+            burn_in=burn_in,
+            audio_tracks=audio_tracks,
+            extra_subtitles=extra_subtitles,
+        )
 
-        self.ffmpeg_processor.run(stream, overwrite_output=True)
+        return output_video_path, stream
@@ -0,0 +1,135 @@
+import threading
+from typing import Dict, List, Optional, Sequence, Type
+
+from app.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class TranslationBackend:
+    """
+    A machine translation service.
+
+    The translator calls a backend from several threads at once, one batch per
+    call, so backends must be thread-safe.
+
+    Attributes:
+        name (str): The name the backend is selected by.
+    """
+
+    name = ""
+
+    def translate(self, texts: Sequence[str], source: str, target: str) -> List[str]:
+        """
+        Translate a batch of texts in a single request.
+
+        Args:
+            texts (Sequence[str]): The texts to translate.
+            source (str): The language of the texts, e.g. "pl".
+            target (str): The language to translate to, e.g. "en".
+
+        Returns:
+            List[str]: The translation of every text, in order.
+        """
+        raise NotImplementedError
+
+
+class GoogleTranslationBackend(TranslationBackend):
+    """
+    Translates through the public Google Translate endpoint using ``googletrans``.
+
+    ``googletrans`` sends one request per text, so a batch is joined into a
+    single newline separated document and split again afterwards. Newlines
+    inside a cue are translated as spaces. When the service merges or splits
+    lines, the batch falls back to translating the texts one by one.
+    """
+
+    name = "google"
+    separator = "\n"
+
+    def __init__(self, service_urls: Optional[Sequence[str]] = None):
+        self.service_urls = list(service_urls) if service_urls else None
+        self._local = threading.local()
+
+    @property
+    def client(self):
+        if not hasattr(self._local, "client"):
+            try:
+                from googletrans import Translator
+            except ImportError:
+                raise RuntimeError(
+                    "The google translation backend requires the googletrans package, install it with `pip install googletrans`"
+                )
+
+            options = {"service_urls": self.service_urls} if self.service_urls else {}
+            self._local.client = Translator(**options)
+
+        return self._local.client
+
+    def translate(self, texts: Sequence[str], source: str, target: str) -> List[str]:
+        lines = [" ".join(text.split(self.separator)) for text in texts]
+        document = self.client.translate(
+            self.separator.join(lines), src=source, dest=target
+        ).text
+        translated = document.split(self.separator)
+
+        if len(translated) == len(lines):
+            return translated
+
+        logger.warning(
+            f"Translated batch has {len(translated)} lines instead of {len(lines)}, "
+            "translating the texts one by one"
+        )
+        return [
+            self.client.translate(line, src=source, dest=target).text for line in lines
+        ]
+
+
+class FakeTranslationBackend(TranslationBackend):
+    """
+    An offline backend tagging every text with the target language, e.g. "[en] text".
+
+    It records every batch it receives, which makes it useful in tests.
+
+    Attributes:
+        batches (List[List[str]]): The batches translated so far.
+    """
+
+    name = "fake"
+
+    def __init__(self):
+        self.batches: List[List[str]] = []
+        self._lock = threading.Lock()
+
+    def translate(self, texts: Sequence[str], source: str, target: str) -> List[str]:
+        with self._lock:
+            self.batches.append(list(texts))
+        return [f"[{target}] {text}" for text in texts]
+
+
+BACKENDS: Dict[str, Type[TranslationBackend]] = {
+    GoogleTranslationBackend.name: GoogleTranslationBackend,
+    FakeTranslationBackend.name: FakeTranslationBackend,
+}
+
+
+def get_backend(name: str, **options) -> TranslationBackend:
+    """
+    Create a translation backend.
+
+    Args:
+        name (str): The name of the backend, e.g. "google" or "fake".
+        **options: Keyword arguments passed to the backend.
+
+    Raises:
+        ValueError: If there is no backend of that name.
+
+    Returns:
+        TranslationBackend: The backend.
+    """
+    if name not in BACKENDS:
+        raise ValueError(
+            f"Unknown translation backend {name}, expected one of {sorted(BACKENDS)}"
+        )
+
+    return BACKENDS[name](**options)
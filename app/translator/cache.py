@@ -0,0 +1,176 @@
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Mapping, Optional, Tuple
+
+import app.utils as utils
+from app.config import config
+from app.logger import get_logger
+
+logger = get_logger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS phrases (
+    source_text TEXT NOT NULL,
+    source_language TEXT NOT NULL,
+    target_language TEXT NOT NULL,
+    translation TEXT NOT NULL,
+    used_at REAL NOT NULL,
+    PRIMARY KEY (source_text, source_language, target_language)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS phrases_used_at ON phrases (used_at);
+"""
+
+QUERY_BATCH_SIZE = 500
+
+
+class PhraseCache:
+    """
+    A persistent least-recently-used store of translated phrases.
+
+    Entries are keyed by the source text and the language pair and kept in a
+    SQLite database, so phrases repeated across videos, such as intros and
+    sponsor reads, are translated once per worker machine. Every hit refreshes
+    the entry, and the least recently used entries beyond ``max_entries`` are
+    evicted after each insert.
+
+    Attributes:
+        path (str): The SQLite database file, ":memory:" keeps the cache in memory.
+        max_entries (int): The number of phrases kept, 0 disables the limit.
+        hits (int): The number of phrases served from the cache.
+        misses (int): The number of phrases not found in the cache.
+    """
+
+    def __init__(self, path: str, max_entries: int = 0):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    @property
+    def stats(self) -> dict:
+        """A snapshot of the cache counters."""
+        return {"hits": self.hits, "misses": self.misses}
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            if self.path != ":memory:":
+                utils.create_directory_for_file(self.path)
+            self._connection = sqlite3.connect(
+                self.path, check_same_thread=False, isolation_level=None
+            )
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.executescript(SCHEMA)
+        return self._connection
+
+    def get_many(
+        self, texts: Iterable[str], source: str, target: str
+    ) -> Dict[str, str]:
+        """
+        Look up the translations of several phrases.
+
+        Args:
+            texts (Iterable[str]): The phrases to look up.
+            source (str): The language of the phrases.
+            target (str): The language of the translations.
+
+        Returns:
+            Dict[str, str]: The translation of every phrase found in the cache.
+        """
+        texts = list(texts)
+        found: Dict[str, str] = {}
+
+        with self._lock:
+            for batch in _batches(texts):
+                rows = self.connection.execute(
+                    "SELECT source_text, translation FROM phrases "
+                    "WHERE source_language = ? AND target_language = ? "
+                    f"AND source_text IN ({','.join('?' * len(batch))})",
+                    (source, target, *batch),
+                )
+                found.update(rows)
+
+            if found:
+                now = time.time()
+                self.connection.executemany(
+                    "UPDATE phrases SET used_at = ? WHERE source_text = ? "
+                    "AND source_language = ? AND target_language = ?",
+                    [(now, text, source, target) for text in found],
+                )
+
+            self.hits += len(found)
+            self.misses += len(texts) - len(found)
+
+        return found
+
+    def put_many(
+        self, translations: Mapping[str, str], source: str, target: str
+    ) -> None:
+        """
+        Store translated phrases and evict the least recently used ones beyond the limit.
+
+        Args:
+            translations (Mapping[str, str]): The translation of every phrase.
+            source (str): The language of the phrases.
+            target (str): The language of the translations.
+        """
+        if not translations:
+            return
+
+        now = time.time()
+        with self._lock:
+            connection = self.connection
+            connection.execute("BEGIN")
+            try:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO phrases VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (text, source, target, translation, now)
+                        for text, translation in translations.items()
+                    ],
+                )
+                evicted = self._evict(connection)
+                connection.execute("COMMIT")
+            except Exception:
+                connection.execute("ROLLBACK")
+                raise
+
+        if evicted:
+            logger.info(f"Evicted {evicted} phrases from the translation cache")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def _evict(self, connection: sqlite3.Connection) -> int:
+        if not self.max_entries:
+            return 0
+
+        (count,) = connection.execute("SELECT COUNT(*) FROM phrases").fetchone()
+        excess = count - self.max_entries
+        if excess <= 0:
+            return 0
+
+        connection.execute(
+            "DELETE FROM phrases WHERE (source_text, source_language, target_language) IN "
+            "(SELECT source_text, source_language, target_language FROM phrases "
+            "ORDER BY used_at LIMIT ?)",
+            (excess,),
+        )
+        return excess
+
+
+def _batches(texts: list) -> Iterable[Tuple[str, ...]]:
+    for start in range(0, len(texts), QUERY_BATCH_SIZE):
+        yield tuple(texts[start : start + QUERY_BATCH_SIZE])
+
+
+phrase_cache = PhraseCache(
+    config.translation_cache_path,
+    max_entries=config.translation_cache_max_entries,
+)
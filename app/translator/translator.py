@@ -0,0 +1,157 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from app.logger import get_logger
+from app.translator.backends import TranslationBackend, get_backend
+from app.translator.cache import PhraseCache, phrase_cache
+
+logger = get_logger(__name__)
+
+
+def pack_batches(
+    texts: Sequence[str], max_chars: int, max_texts: int = 0
+) -> Iterator[List[str]]:
+    """
+    Split texts into consecutive batches of bounded size.
+
+    A batch holds at most ``max_chars`` characters, counting one separator
+    between the texts, and at most ``max_texts`` texts. A text longer than
+    ``max_chars`` forms a batch of its own.
+
+    Args:
+        texts (Sequence[str]): The texts to split.
+        max_chars (int): The size limit of a batch in characters.
+        max_texts (int, optional): The number of texts in a batch, 0 disables the limit.
+
+    Yields:
+        List[str]: The batches in order.
+    """
+    batch: List[str] = []
+    size = 0
+
+    for text in texts:
+        full = batch and (
+            size + 1 + len(text) > max_chars or (max_texts and len(batch) >= max_texts)
+        )
+        if full:
+            yield batch
+            batch, size = [], 0
+
+        size += len(text) + (1 if batch else 0)
+        batch.append(text)
+
+    if batch:
+        yield batch
+
+
+class Translator:
+    """
+    Translates subtitle texts with as few requests as possible.
+
+    Repeated texts are translated once, texts found in the phrase cache are not
+    sent at all, and the rest is packed into size-bounded batches translated
+    concurrently by the backend.
+
+    Attributes:
+        backend (TranslationBackend): The translation service.
+        cache (Optional[PhraseCache]): The phrase cache, None disables caching.
+        max_batch_chars (int): The size limit of a request in characters.
+        max_batch_texts (int): The number of texts in a request, 0 disables the limit.
+        workers (int): The number of requests in flight at the same time.
+    """
+
+    def __init__(
+        self,
+        backend: TranslationBackend,
+        cache: Optional[PhraseCache] = None,
+        max_batch_chars: int = 4500,
+        max_batch_texts: int = 0,
+        workers: int = 4,
+    ):
+        self.backend = backend
+        self.cache = cache
+        self.max_batch_chars = max_batch_chars
+        self.max_batch_texts = max_batch_texts
+        self.workers = workers
+
+    def translate(self, texts: Sequence[str], source: str, target: str) -> List[str]:
+        """
+        Translate texts from one language to another.
+
+        Args:
+            texts (Sequence[str]): The texts to translate, e.g. the cues of a track.
+            source (str): The language of the texts.
+            target (str): The language to translate to.
+
+        Returns:
+            List[str]: The translation of every text, in order. Blank texts are kept as they are.
+        """
+        if source == target:
+            return list(texts)
+
+        unique = [text for text in dict.fromkeys(texts) if text.strip()]
+        translations: Dict[str, str] = {}
+        if self.cache is not None:
+            translations.update(self.cache.get_many(unique, source, target))
+
+        missing = [text for text in unique if text not in translations]
+        if missing:
+            translated = dict(self._translate_batches(missing, source, target))
+            if self.cache is not None:
+                self.cache.put_many(translated, source, target)
+            translations.update(translated)
+
+        logger.info(
+            f"Translated {len(texts)} texts from {source} to {target}: "
+            f"{len(unique)} unique, {len(missing)} sent to {self.backend.name}"
+        )
+        return [translations.get(text, text) for text in texts]
+
+    def _translate_batches(
+        self, texts: List[str], source: str, target: str
+    ) -> Iterator[Tuple[str, str]]:
+        batches = list(pack_batches(texts, self.max_batch_chars, self.max_batch_texts))
+
+        def translate_batch(batch: List[str]) -> List[str]:
+            return self.backend.translate(batch, source, target)
+
+        if len(batches) == 1 or self.workers <= 1:
+            results = map(translate_batch, batches)
+            for batch, translated in zip(batches, results):
+                yield from zip(batch, translated)
+            return
+
+        with ThreadPoolExecutor(
+            max_workers=min(self.workers, len(batches)),
+            thread_name_prefix="translate",
+        ) as executor:
+            for batch, translated in zip(
+                batches, executor.map(translate_batch, batches)
+            ):
+                yield from zip(batch, translated)
+
+
+_translators: Dict[Tuple, Translator] = {}
+_translators_lock = threading.Lock()
+
+
+def get_translator(
+    backend: str,
+    workers: int,
+    max_batch_chars: int,
+    **backend_options,
+) -> Translator:
+    """
+    Return the process-wide Translator for the given settings, backed by the phrase cache.
+    """
+    key = (backend, workers, max_batch_chars, tuple(sorted(backend_options.items())))
+    with _translators_lock:
+        if key not in _translators:
+            _translators[key] = Translator(
+                get_backend(backend, **backend_options),
+                cache=phrase_cache,
+                max_batch_chars=max_batch_chars,
+                workers=workers,
+            )
+        return _translators[key]
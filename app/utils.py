@@ -1,6 +1,11 @@
+import fcntl
 import math
 import os
 import re
+import shutil
+import tempfile
+import time
+from typing import Optional
 
 from .logger import get_logger
 
@@ -113,6 +118,168 @@ class DirectoryManager:
             logger.exception(f"An error occurred: {exc_value}")
 
 
+def _lock_file(path: str, blocking: bool = True) -> Optional[int]:
+    """
+    Take an exclusive lock on a lock file, creating it when missing.
+
+    The holder of a lock may delete its file; a waiter that then wakes up on the
+    deleted file retries on a fresh one, so two holders never coexist.
+
+    Args:
+        path (str): The path of the lock file.
+        blocking (bool, optional): Wait for the lock instead of giving up. Defaults to True.
+
+    Returns:
+        Optional[int]: The descriptor holding the lock, None when it is held elsewhere.
+    """
+    while True:
+        fd = os.open(path, os.O_CREAT | os.O_RDWR)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        except BlockingIOError:
+            os.close(fd)
+            return None
+
+        try:
+            if os.stat(path).st_ino == os.fstat(fd).st_ino:
+                return fd
+        except FileNotFoundError:
+            pass
+        os.close(fd)
+
+
+class JobWorkspace:
+    """
+    A context manager providing a private scratch directory for a single job.
+
+    Every job downloads and writes its intermediate files into its own directory,
+    so concurrent jobs never see each other's files. The directory and everything
+    in it is removed when the context exits, whether the job succeeded or not.
+
+    A named workspace is instead found again by the retries of the same job, and
+    with ``keep_on_error`` it survives a failure so the retry can resume from the
+    files left behind. Every workspace is held under an exclusive lock, so a
+    duplicate delivery of the same job waits for the running one instead of
+    sharing its files. Workspaces kept for a retry that never comes are removed
+    by ``sweep_workspaces``.
+
+    Attributes:
+        root (str): The directory under which workspaces are created, e.g. a tmpfs mount.
+        path (str): The path of the workspace while the context is active.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        prefix: str = "job-",
+        name: Optional[str] = None,
+        keep_on_error: bool = False,
+    ):
+        """
+        Initializes the JobWorkspace.
+
+        Args:
+            root (str): The directory under which the workspace is created.
+            prefix (str, optional): The prefix of the workspace directory name. Defaults to "job-".
+            name (str, optional): A stable name of the workspace, appended to the prefix.
+                Defaults to a random name.
+            keep_on_error (bool, optional): Keep the workspace when the context raises.
+                Defaults to False.
+        """
+        self.root = root
+        self.prefix = prefix
+        self.name = name
+        self.keep_on_error = keep_on_error
+        self.path = None
+        self._lock = None
+
+    def __enter__(self) -> str:
+        """
+        Creates the workspace directory, waiting while another job holds it.
+
+        Returns:
+            str: The path of the workspace.
+        """
+        create_directory(self.root)
+
+        if self.name is None:
+            self.path = tempfile.mkdtemp(prefix=self.prefix, dir=self.root)
+            self._lock = _lock_file(f"{self.path}.lock")
+        else:
+            self.path = os.path.join(self.root, f"{self.prefix}{self.name}")
+            self._lock = _lock_file(f"{self.path}.lock")
+            os.makedirs(self.path, exist_ok=True)
+
+        return self.path
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """
+        Removes the workspace directory and logs any exception raised within the context.
+        """
+        try:
+            if exc_type is not None:
+                logger.exception(
+                    f"An error occurred in workspace {self.path}: {exc_value}"
+                )
+
+                if self.keep_on_error:
+                    logger.info(f"Keeping workspace {self.path} for a retry")
+                    return
+
+            shutil.rmtree(self.path, ignore_errors=True)
+            delete_file(f"{self.path}.lock")
+        finally:
+            os.close(self._lock)
+            self._lock = None
+
+
+def sweep_workspaces(root: str, max_age: float, prefix: str = "job-") -> int:
+    """
+    Remove the workspaces left untouched for longer than ``max_age`` seconds.
+
+    Workspaces kept for a retry outlive their job when the message is finally
+    rejected or the worker dies. Workspaces still held by a job are skipped.
+
+    Args:
+        root (str): The directory holding the workspaces.
+        max_age (float): The age in seconds after which an idle workspace is removed.
+        prefix (str, optional): The prefix of the workspace directory names. Defaults to "job-".
+
+    Returns:
+        int: The number of workspaces removed.
+    """
+    if not os.path.isdir(root):
+        return 0
+
+    removed = 0
+    deadline = time.time() - max_age
+
+    for entry in os.scandir(root):
+        if not entry.name.startswith(prefix) or not entry.is_dir():
+            continue
+
+        try:
+            if entry.stat().st_mtime > deadline:
+                continue
+        except FileNotFoundError:
+            continue
+
+        lock = _lock_file(f"{entry.path}.lock", blocking=False)
+        if lock is None:
+            continue
+
+        try:
+            shutil.rmtree(entry.path, ignore_errors=True)
+            delete_file(f"{entry.path}.lock")
+            removed += 1
+        finally:
+            os.close(lock)
+
+    if removed:
+        logger.info(f"Removed {removed} stale workspaces from {root}")
+    return removed
+
+
 def get_file_name_without_extension(file_path: str) -> str:
     """
     Extract the file name without extension from the given file path.
@@ -182,3 +349,18 @@ def is_video_file(file_path: str) -> bool:
     video_extensions = [".mp4", ".avi", ".mov", ".mkv", ".wmv", ".flv", ".webm", ".m4v"]
     file_extension = os.path.splitext(file_path)[1].lower()
     return file_extension in video_extensions
+
+
+def is_audio_file(file_path: str) -> bool:
+    """
+    Check if the file at the given path is an audio file.
+
+    Args:
+        file_path (str): The path to the file to check.
+
+    Returns:
+        bool: True if the file is an audio file, False otherwise.
+    """
+    audio_extensions = [".m4a", ".mp3", ".wav", ".ogg", ".opus", ".aac", ".flac"]
+    file_extension = os.path.splitext(file_path)[1].lower()
+    return file_extension in audio_extensions
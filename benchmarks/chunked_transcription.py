@@ -0,0 +1,105 @@
+"""
+Compare single-call and chunked parallel transcription wall-clock time.
+
+Usage:
+    python -m benchmarks.chunked_transcription --minutes 30 --workers 4
+    python -m benchmarks.chunked_transcription --audio sample.wav --model small
+
+Without ``--audio`` a synthetic input is built from harmonic bursts separated
+by short pauses. A real speech sample repeated to the requested length gives
+more representative numbers. Both timings include loading the model, once
+for the single call and once per worker process for the chunked path.
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+from faster_whisper import decode_audio
+
+from app.ffmpeg_utils import SAMPLE_RATE
+from app.transcriber.chunking import ChunkedTranscriber
+from app.transcriber.model_pool import model_pool
+from app.transcriber.segments import Segment
+
+OPTIONS = {
+    "vad_filter": True,
+    "beam_size": 5,
+    "condition_on_previous_text": False,
+    "word_timestamps": True,
+}
+
+
+def synthetic_audio(seconds: float, seed: int = 0) -> np.ndarray:
+    """Build bursts of voiced-like harmonics separated by silences."""
+    rng = np.random.default_rng(seed)
+    pieces = []
+    total = 0
+    while total < seconds * SAMPLE_RATE:
+        burst = int(rng.uniform(2.0, 8.0) * SAMPLE_RATE)
+        pause = int(rng.uniform(0.4, 1.5) * SAMPLE_RATE)
+        t = np.arange(burst) / SAMPLE_RATE
+        pitch = rng.uniform(100, 220)
+        voiced = sum(np.sin(2 * np.pi * pitch * k * t) / k for k in range(1, 6))
+        envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 4 * t)
+        pieces.append((0.1 * voiced * envelope).astype(np.float32))
+        pieces.append(np.zeros(pause, dtype=np.float32))
+        total += burst + pause
+    return np.concatenate(pieces)[: int(seconds * SAMPLE_RATE)]
+
+
+def repeated_audio(path: str, seconds: float) -> np.ndarray:
+    sample = decode_audio(path, sampling_rate=SAMPLE_RATE)
+    repeats = int(np.ceil(seconds * SAMPLE_RATE / len(sample)))
+    return np.tile(sample, repeats)[: int(seconds * SAMPLE_RATE)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--audio", help="speech sample repeated to the requested length"
+    )
+    parser.add_argument("--minutes", type=float, default=20.0)
+    parser.add_argument("--model", default="small")
+    parser.add_argument("--compute-type", default="int8")
+    parser.add_argument("--language", default="en")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-length", type=float, default=120.0)
+    args = parser.parse_args()
+
+    seconds = args.minutes * 60
+    if args.audio:
+        audio = repeated_audio(args.audio, seconds)
+    else:
+        audio = synthetic_audio(seconds)
+
+    options = dict(OPTIONS, language=args.language)
+
+    started = time.perf_counter()
+    model = model_pool.get(args.model, compute_type=args.compute_type)
+    segments, _ = model.transcribe(audio, **options)
+    single = [Segment.from_whisper(segment) for segment in segments]
+    single_elapsed = time.perf_counter() - started
+
+    transcriber = ChunkedTranscriber(
+        workers=args.workers, chunk_length_s=args.chunk_length
+    )
+    started = time.perf_counter()
+    _, chunked = transcriber.transcribe(
+        audio, args.model, compute_type=args.compute_type, **options
+    )
+    chunked_elapsed = time.perf_counter() - started
+    transcriber.close()
+
+    print(f"audio:   {seconds:.0f}s, model {args.model} ({args.compute_type})")
+    print(f"single:  {single_elapsed:8.2f}s  {len(single)} segments")
+    print(
+        f"chunked: {chunked_elapsed:8.2f}s  {len(chunked)} segments "
+        f"on {args.workers} workers"
+    )
+    print(f"speedup: {single_elapsed / chunked_elapsed:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Compare the regex SRT parser with the line-by-line parser it replaced.
+
+Usage:
+    python -m benchmarks.srt_parser --cues 100000
+    python -m benchmarks.srt_parser --srt subtitles.srt
+
+Without ``--srt`` a document of ``--cues`` two-line cues is generated. The
+previous ``SSMLConverter.parse_srt_file`` implementation is reproduced here
+as the baseline, including its timestamp arithmetic.
+"""
+
+import argparse
+import os
+import re
+import tempfile
+import time
+
+from app.subtitles.srt import read_cues
+from app.synthesizer.ssml import SSMLConverter
+from app.utils import format_time
+
+
+def legacy_parse(srt_file: str) -> dict:
+    subs_dict = {}
+    with open(srt_file, "r", encoding="utf-8-sig") as f:
+        lines = f.readlines()
+
+    for line_num, line in enumerate(lines):
+        line = line.strip()
+
+        timeline_regexp = re.compile(r"\d\d:\d\d:\d\d,\d\d\d --> \d\d:\d\d:\d\d,\d\d\d")
+        if line.isdigit() and timeline_regexp.match(lines[line_num + 1]):
+            time_line = lines[line_num + 1].strip()
+            text_line = lines[line_num + 2].strip()
+
+            count = 3
+            while line_num + count < len(lines) and lines[line_num + count].strip():
+                text_line += " " + lines[line_num + count].strip()
+                count += 1
+
+            start_time, end_time = map(lambda x: x.strip(), time_line.split("-->"))
+
+            start_time_ms = sum(
+                int(t) * 10 ** (3 - i * 3)
+                for i, t in enumerate(start_time.replace(",", ":").split(":"))
+            )
+            end_time_ms = sum(
+                int(t) * 10 ** (3 - i * 3)
+                for i, t in enumerate(end_time.replace(",", ":").split(":"))
+            )
+
+            subs_dict[line] = {
+                "start_ms": start_time_ms,
+                "end_ms": end_time_ms,
+                "duration_ms": end_time_ms - start_time_ms,
+                "text": text_line,
+                "break_until_next": 0,
+            }
+
+            if line_num > 0:
+                subs_dict[str(int(line) - 1)]["break_until_next"] = (
+                    start_time_ms - subs_dict[str(int(line) - 1)]["end_ms"]
+                )
+
+    return subs_dict
+
+
+def generate_srt(path: str, cues: int) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        for index in range(1, cues + 1):
+            start = index * 3.0
+            f.write(
+                f"{index}\n{format_time(start)} --> {format_time(start + 2.5)}\n"
+                f"Line number {index} of the subtitles\nwith a second line\n\n"
+            )
+
+
+def measure(label: str, parse, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = parse()
+        best = min(best, time.perf_counter() - started)
+    print(f"{label:<14} {best:8.3f}s  {len(result)} cues")
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--srt", help="parse an existing SRT file")
+    parser.add_argument("--cues", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = args.srt
+        if path is None:
+            path = os.path.join(directory, "benchmark.srt")
+            generate_srt(path, args.cues)
+
+        print(f"file: {os.path.getsize(path) / 1024 / 1024:.1f} MB")
+
+        converter = SSMLConverter(srt_file=path, output_file=None)
+        legacy = measure("legacy", lambda: legacy_parse(path), args.repeat)
+        measure("read_cues", lambda: read_cues(path), args.repeat)
+        current = measure("parse_srt_file", converter.parse_srt_file, args.repeat)
+
+    print(f"speedup:       {legacy / current:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,13 @@
 import app.utils as utils
-from app.butcher.youtube import YoutubeButcher  # noqa
+from app.butcher.youtube import YoutubeButcher
 from app.config import config
+from app.subtitles.resegment import CaptionLimits
+from app.subtitles.track import SubtitleTrack
 from app.synthesizer.ssml import SSMLConverter
+from app.synthesizer.synthesis import get_speech_synthesizer
+from app.transcriber.language import language_detector
 from app.transcriber.video_processor import VideoProcessorContext
+from app.translator.translator import get_translator
 
 if __name__ == "__main__":
     utils.create_directory(config.downloads_directory)
@@ -11,39 +16,101 @@ if __name__ == "__main__":
     utils.create_directory(config.audio_directory)
     utils.create_directory(config.ssml_directory)
 
-    YoutubeButcher.download_source(
+    downloaded = YoutubeButcher.download_source(
         source="https://www.youtube.com/watch?v=MGJ1of3gw0k",
         output_path=config.downloads_directory,
     )
 
-    with utils.DirectoryManager(config.downloads_directory) as files:
-        for file in files:
-            with VideoProcessorContext(file) as processor:
-                audio_filename = processor.extract_audio(config.audio_directory)
+    if downloaded is not None:
+        file = downloaded.path
 
-                language, segments = processor.transcribe(
-                    audio=audio_filename,
-                    model_name="large-v3",
-                    language=config.localization,
+        with VideoProcessorContext(file) as processor:
+            audio_filename = processor.extract_audio(config.audio_directory)
+
+            source_language = config.localization
+            if config.language_detection:
+                probe = processor.load_audio(
+                    config.language_probe_offset_seconds,
+                    config.language_probe_seconds,
+                )
+                source_language = language_detector.detect(
+                    probe, fallback=config.localization
+                ).language
+
+            language, segments = processor.transcribe(
+                audio=audio_filename,
+                model_name="large-v3",
+                language=source_language,
+            )
+
+            subtitle_file_path = processor.generate_subtitle_file(
+                language,
+                segments,
+                config.subtitles_directory,
+                limits=(
+                    CaptionLimits.from_config() if config.resegment_subtitles else None
+                ),
+                export_words=config.export_word_timestamps,
+            )
+
+            if config.translation_language and config.translation_language != language:
+                translator = get_translator(
+                    config.translation_backend,
+                    workers=config.translation_workers,
+                    max_batch_chars=config.translation_batch_chars,
+                )
+                track = SubtitleTrack.from_srt(subtitle_file_path)
+                track = track.with_texts(
+                    translator.translate(
+                        track.texts, language, config.translation_language
+                    )
                 )
 
-                subtitle_file_path = processor.generate_subtitle_file(
-                    language, segments, config.subtitles_directory
+                language = config.translation_language
+                subtitle_file_path = processor.subtitle_path(
+                    language, config.subtitles_directory
                 )
+                with open(subtitle_file_path, "w", encoding="utf-8") as f:
+                    f.write(track.to_srt())
+
+            ssml_filename = utils.get_file_name_without_extension(file)
 
-                ssml_filename = utils.get_file_name_without_extension(file)
+            SSMLConverter(
+                srt_file=subtitle_file_path,
+                output_file=config.ssml_directory + f"/{ssml_filename}.txt",
+                voice_name=config.ssml_voice(language),
+                language=config.ssml_language(language),
+            ).convert()
 
-                SSMLConverter(
-                    srt_file=subtitle_file_path,
-                    output_file=config.ssml_directory + f"/{ssml_filename}.txt",
-                    voice_name="en-US-DavisNeural",
-                ).convert()
+            audio_tracks = []
+            if config.synthesize_speech:
+                options = {}
+                if config.speech_engine == "coqui":
+                    options["model_name"] = config.speech_model
 
-                # TODO: Include ssml synthesizing into the including completed audio to video
+                synthesizer = get_speech_synthesizer(
+                    config.speech_engine,
+                    workers=config.speech_workers,
+                    sample_rate=config.speech_sample_rate,
+                    **options,
+                )
+                track = SubtitleTrack.from_srt(subtitle_file_path)
+                speech = synthesizer.synthesize(track.ssml_values())
 
-                processor.add_subtitle_to_video(
-                    embedded_subtitles=True,
-                    subtitle_file_path=subtitle_file_path,
-                    subtitle_language=language,
-                    output_directory=config.results_directory,
+                speech_path = config.audio_directory + f"/{ssml_filename}.m4a"
+                processor.ffmpeg_processor.write_pcm(
+                    speech, speech_path, sample_rate=synthesizer.sample_rate
                 )
+                audio_tracks.append(speech_path)
+
+            processor.add_subtitle_to_video(
+                embedded_subtitles=True,
+                subtitle_file_path=subtitle_file_path,
+                subtitle_language=language,
+                output_directory=config.results_directory,
+                audio_tracks=audio_tracks,
+            )
+
+            if not config.keep_audio_files:
+                for speech_path in audio_tracks:
+                    utils.delete_file(speech_path)
@@ -1,76 +1,185 @@
 import asyncio
+import hashlib
 import os
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 import app.utils as utils
-from app.butcher.youtube import YoutubeButcher
-from app.config import config
+from app.config import config, rabbitmq_config
+from app.database.base import initialize_db
+from app.pipeline import stages
+from app.pipeline.checkpoint import Checkpoint
+from app.pipeline.job import Job
+from app.pipeline.orchestrator import AsyncPipeline, Stage
+from app.pipeline.tracking import JobTracker
 from app.rabbitmq import RabbitMQContext
-from app.synthesizer.ssml import SSMLConverter
-from app.transcriber.video_processor import VideoProcessorContext
 
 logger = utils.get_logger(__name__)
 
 
-def manage_event(body):
-    source = body.decode("utf-8")
+def job_workspace(body) -> utils.JobWorkspace:
+    """
+    Create the workspace of a job.
+
+    With checkpointing enabled, retries of the same message get the same workspace
+    back, along with the checkpoint left by the failed attempt. Concurrent
+    deliveries of the same message take turns on it. Workspaces of messages
+    that were rejected for good are swept once ``WORKSPACE_TTL_HOURS`` passed.
+    """
+    if not config.checkpoint_jobs:
+        return utils.JobWorkspace(config.scratch_directory)
+
+    if config.workspace_ttl_hours > 0:
+        utils.sweep_workspaces(
+            config.scratch_directory, config.workspace_ttl_hours * 3600
+        )
 
-    YoutubeButcher.download_source(
-        source=source,
-        output_path=config.downloads_directory,
+    return utils.JobWorkspace(
+        config.scratch_directory,
+        name=hashlib.sha256(body).hexdigest()[:16],
+        keep_on_error=True,
     )
 
-    with utils.DirectoryManager(config.downloads_directory) as files:
-        for file in files:
-            with VideoProcessorContext(file) as processor:
-                ssml_filename = utils.get_file_name_without_extension(file)
 
-                audio_file_path = processor.extract_audio(config.audio_directory)
+def create_job(body, workspace: str, queue_depth: int = 0) -> Job:
+    job = Job.from_message(body, workspace=workspace, queue_depth=queue_depth)
+    job.tracker = JobTracker(job.source, worker_id=config.worker_id)
+    if config.checkpoint_jobs:
+        job.checkpoint = Checkpoint(workspace, job.source)
+    return job
 
-                language, segments = processor.transcribe(
-                    audio=audio_file_path,
-                    model_name="large-v3",
-                    language=config.localization,
-                )
 
-                subtitle_file_path = processor.generate_subtitle_file(
-                    language,
-                    segments,
-                    config.subtitles_directory,
-                )
+def manage_event(body):
+    with job_workspace(body) as workspace:
+        job = create_job(body, workspace)
+        with job.tracker.run(job.model_name):
+            stages.run_job(job)
+
+
+def build_pipeline() -> AsyncPipeline:
+    return AsyncPipeline(
+        [
+            Stage(
+                "download",
+                stages.pipeline_stage("download", stages.download),
+                concurrency=config.stage_concurrency("download", 2),
+            ),
+            Stage(
+                "detect",
+                stages.pipeline_stage("detect", stages.detect_language_async),
+                concurrency=config.stage_concurrency("detect", 1),
+            ),
+            Stage(
+                "vad",
+                stages.pipeline_stage("vad", stages.detect_speech),
+                concurrency=config.stage_concurrency("vad", 1),
+            ),
+            Stage(
+                "extract",
+                stages.pipeline_stage("extract", stages.extract_async),
+                concurrency=config.stage_concurrency("extract", 1),
+            ),
+            Stage(
+                "transcribe",
+                stages.pipeline_stage("transcribe", stages.transcribe),
+                concurrency=config.stage_concurrency(
+                    "transcribe", config.transcribe_batch_workers
+                ),
+            ),
+            Stage(
+                "translate",
+                stages.pipeline_stage("translate", stages.translate),
+                concurrency=config.stage_concurrency("translate", 1),
+            ),
+            Stage(
+                "synthesize",
+                stages.pipeline_stage("synthesize", stages.synthesize),
+                concurrency=config.stage_concurrency("synthesize", 1),
+            ),
+            Stage(
+                "mux",
+                stages.pipeline_stage("mux", stages.mux_async),
+                concurrency=config.stage_concurrency("mux", 2),
+            ),
+            Stage(
+                "record",
+                stages.pipeline_stage("record", stages.record),
+                concurrency=config.stage_concurrency("record", 1),
+            ),
+        ],
+        report_interval=config.pipeline_report_interval,
+    )
 
-                SSMLConverter(
-                    srt_file=subtitle_file_path,
-                    output_file=config.ssml_directory + f"/{ssml_filename}.txt",
-                    voice_name="en-US-DavisNeural",
-                ).convert()
 
-                processor.add_subtitle_to_video(
-                    embedded_subtitles=True,
-                    subtitle_file_path=subtitle_file_path,
-                    subtitle_language=language,
-                    output_directory=config.results_directory,
-                )
+def consume(
+    pipeline: AsyncPipeline, loop: asyncio.AbstractEventLoop, stop: threading.Event
+):
+    """
+    Feed the queue messages into the pipeline until ``stop`` is set.
 
-                utils.delete_file(subtitle_file_path)
-                utils.delete_file(audio_file_path)
-                utils.delete_file(file)
+    With ``RABBITMQ_BATCH_SIZE`` above 1, the messages arriving within one batch
+    window enter the pipeline together, so their short clips reach the transcribe
+    stage at once and decode together on the shared batch model. Every message
+    is still acknowledged as soon as its own job finishes.
+    """
+    with RabbitMQContext() as rabbit:
+        rabbit.stop_when(stop)
+
+        def process(body):
+            with job_workspace(body) as workspace:
+                job = create_job(body, workspace, queue_depth=rabbit.backlog)
+                with job.tracker.run(job.model_name):
+                    future = asyncio.run_coroutine_threadsafe(
+                        pipeline.submit(job), loop
+                    )
+                    future.result()
+
+        with ThreadPoolExecutor(
+            max_workers=config.pipeline_max_jobs, thread_name_prefix="pipeline-job"
+        ) as executor:
+
+            def process_batch(bodies):
+                return [executor.submit(process, body) for body in bodies]
+
+            while not stop.is_set():
+                if rabbitmq_config.BATCH_SIZE > 1:
+                    rabbit.consume_batches(
+                        process_batch, prefetch_count=config.pipeline_max_jobs
+                    )
+                else:
+                    rabbit.consume_concurrently(
+                        process, max_workers=config.pipeline_max_jobs
+                    )
 
 
 async def main():
-    with RabbitMQContext() as rabbit:
-        while True:
-            rabbit.consume_message(manage_event)
+    pipeline = build_pipeline()
+    await pipeline.start()
+
+    loop = asyncio.get_running_loop()
+    stop = threading.Event()
+    consumer = loop.run_in_executor(None, consume, pipeline, loop, stop)
+
+    try:
+        await asyncio.shield(consumer)
+    finally:
+        # Stop taking messages, cancel the jobs in flight so their consumer
+        # threads return, then wait for the connection to close.
+        stop.set()
+        await pipeline.stop()
+        await consumer
 
 
 if __name__ == "__main__":
     try:
-        utils.create_directory(config.downloads_directory)
+        utils.create_directory(config.scratch_directory)
         utils.create_directory(config.results_directory)
-        utils.create_directory(config.subtitles_directory)
         utils.create_directory(config.audio_directory)
         utils.create_directory(config.ssml_directory)
 
+        initialize_db()
+
         asyncio.run(main())
     except KeyboardInterrupt:
         print("Interrupted")
@@ -0,0 +1,127 @@
+import json
+import os
+import re
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from app.butcher.downloader import PROGRESS_SUFFIX, PART_SUFFIX, RangeDownloader
+
+CONTENT = bytes(range(256)) * 40
+
+
+class FileHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    ranges = True
+    short_range = None
+    requests = []
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(CONTENT)))
+        if self.ranges:
+            self.send_header("Accept-Ranges", "bytes")
+        self.end_headers()
+
+    def do_GET(self):
+        header = self.headers.get("Range")
+        self.requests.append(header)
+
+        match = re.fullmatch(r"bytes=(\d+)-(\d+)", header or "")
+        if not self.ranges or match is None:
+            self.send_response(200)
+            body = CONTENT
+        else:
+            start, end = int(match.group(1)), int(match.group(2))
+            body = CONTENT[start : end + 1]
+            if header == self.short_range:
+                body = body[:-10]
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(CONTENT)}")
+
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestRangeDownloader(unittest.TestCase):
+    def setUp(self):
+        FileHandler.ranges = True
+        FileHandler.short_range = None
+        FileHandler.requests = []
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), FileHandler)
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.url = f"http://127.0.0.1:{self.server.server_port}/video.mp4"
+
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "video.mp4")
+        self.downloader = RangeDownloader(workers=3, chunk_size=1000, retries=1)
+
+    def tearDown(self):
+        self.downloader.close()
+        self.server.shutdown()
+        self.server.server_close()
+        self.directory.cleanup()
+
+    def read(self) -> bytes:
+        with open(self.path, "rb") as f:
+            return f.read()
+
+    def test_downloads_chunks_concurrently(self):
+        size = self.downloader.download(self.url, self.path)
+
+        self.assertEqual(size, len(CONTENT))
+        self.assertEqual(self.read(), CONTENT)
+        self.assertEqual(len(FileHandler.requests), 11)
+        self.assertFalse(os.path.exists(self.path + PART_SUFFIX))
+        self.assertFalse(os.path.exists(self.path + PROGRESS_SUFFIX))
+
+    def test_resumes_missing_chunks(self):
+        with open(self.path + PART_SUFFIX, "wb") as f:
+            f.write(CONTENT[:3000] + bytes(len(CONTENT) - 3000))
+        with open(self.path + PROGRESS_SUFFIX, "w") as f:
+            f.write(json.dumps({"size": len(CONTENT)}) + "\n0\n1\n2\n1")
+
+        self.downloader.download(self.url, self.path, size=len(CONTENT))
+
+        self.assertEqual(self.read(), CONTENT)
+        self.assertEqual(len(FileHandler.requests), 8)
+        self.assertNotIn("bytes=0-999", FileHandler.requests)
+
+    def test_without_range_support(self):
+        FileHandler.ranges = False
+
+        self.downloader.download(self.url, self.path)
+
+        self.assertEqual(self.read(), CONTENT)
+        self.assertEqual(FileHandler.requests, [None])
+
+    def test_size_mismatch(self):
+        with self.assertRaises(RuntimeError):
+            self.downloader.download(self.url, self.path, size=len(CONTENT) + 1)
+
+    def test_short_range_fails_the_download(self):
+        FileHandler.short_range = "bytes=2000-2999"
+
+        with self.assertRaisesRegex(RuntimeError, "Received 990 of 1000 bytes"):
+            self.downloader.download(self.url, self.path, size=len(CONTENT))
+
+        self.assertFalse(os.path.exists(self.path))
+        with open(self.path + PROGRESS_SUFFIX) as f:
+            self.assertNotIn("2", f.read().split("\n")[1:])
+
+    def test_chunks_cover_the_file(self):
+        self.assertEqual(
+            self.downloader.chunks(2500),
+            [(0, 0, 999), (1, 1000, 1999), (2, 2000, 2499)],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from app.butcher.store import MediaStore
+
+
+class TestMediaStore(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.store = MediaStore(os.path.join(self.directory.name, "media"))
+        self.workspace = os.path.join(self.directory.name, "job")
+        os.makedirs(self.workspace)
+
+    def write(self, name: str, size: int) -> str:
+        path = os.path.join(self.workspace, name)
+        with open(path, "wb") as f:
+            f.write(b"x" * size)
+        return path
+
+    def test_checkout_links_stored_file(self):
+        path = self.write("clip.mp4", 10)
+        self.store.store("abcdefghijk", path)
+        os.remove(path)
+
+        other = os.path.join(self.directory.name, "other-job")
+        os.makedirs(other)
+        linked = self.store.checkout("abcdefghijk", other)
+
+        self.assertEqual(linked, os.path.join(other, "clip.mp4"))
+        with open(linked, "rb") as f:
+            self.assertEqual(f.read(), b"x" * 10)
+        self.assertIsNone(self.store.checkout("missing0000", other))
+
+    def test_evicts_least_recently_used_entries(self):
+        store = MediaStore(self.store.directory, max_size_mb=1)
+        half = 512 * 1024
+
+        store.store("first000000", self.write("first.mp4", half))
+        store.store("second00000", self.write("second.mp4", half))
+        first = os.path.join(store.directory, "first000000")
+        second = os.path.join(store.directory, "second00000")
+        os.utime(first, (1, 1))
+        os.utime(second, (2, 2))
+        store.lookup("first000000")
+
+        store.store("third000000", self.write("third.mp4", half))
+
+        self.assertIsNotNone(store.lookup("first000000"))
+        self.assertIsNone(store.lookup("second00000"))
+        self.assertIsNotNone(store.lookup("third000000"))
+
+    def test_lookup_of_entry_removed_meanwhile_misses(self):
+        self.store.store("abcdefghijk", self.write("clip.mp4", 10))
+        entry = os.path.join(self.store.directory, "abcdefghijk")
+
+        with patch("os.utime", side_effect=FileNotFoundError(entry)):
+            self.assertIsNone(self.store.lookup("abcdefghijk"))
+
+
+if __name__ == "__main__":
+    unittest.main()
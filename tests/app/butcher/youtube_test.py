@@ -0,0 +1,124 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from app.butcher.youtube import (
+    DownloadedSource,
+    YoutubeButcher,
+    extract_video_id,
+    normalize_url,
+)
+
+
+class TestYoutubeButcher(unittest.TestCase):
+    @patch("app.butcher.youtube.YouTube")
+    def test_download_source_returns_handle(self, mock_youtube):
+        stream = mock_youtube.return_value.streams.filter.return_value.order_by.return_value.desc.return_value.first.return_value
+        stream.title = "My video: part 1"
+
+        downloaded = YoutubeButcher.download_source(
+            output_path="/tmp/job-1", source="https://youtu.be/abc"
+        )
+
+        stream.download.assert_called_once_with(
+            output_path="/tmp/job-1", filename="Myvideo_part1.mp4"
+        )
+        self.assertEqual(
+            downloaded,
+            DownloadedSource(
+                source="https://youtu.be/abc",
+                title="My video: part 1",
+                path="/tmp/job-1/Myvideo_part1.mp4",
+            ),
+        )
+
+    @patch("app.butcher.youtube.YouTube")
+    def test_download_source_with_downloader(self, mock_youtube):
+        stream = mock_youtube.return_value.streams.filter.return_value.order_by.return_value.desc.return_value.first.return_value
+        stream.title = "clip"
+        stream.url = "https://example.com/clip.mp4"
+        stream.filesize = 1234
+        downloader = MagicMock()
+
+        YoutubeButcher.download_source(
+            output_path="/tmp/job-1",
+            source="https://youtu.be/abc",
+            downloader=downloader,
+        )
+
+        stream.download.assert_not_called()
+        downloader.download.assert_called_once_with(
+            "https://example.com/clip.mp4", "/tmp/job-1/clip.mp4", size=1234
+        )
+
+    @patch("app.butcher.youtube.YouTube")
+    def test_download_source_audio_only(self, mock_youtube):
+        stream = MagicMock(abr="48kbps", subtype="mp4")
+        stream.title = "clip"
+        mock_youtube.return_value.streams.filter.return_value = [stream]
+
+        downloaded = YoutubeButcher.download_source(
+            output_path="/tmp/job-1", source="https://youtu.be/abc", audio_only=True
+        )
+
+        mock_youtube.return_value.streams.filter.assert_called_once_with(
+            only_audio=True
+        )
+        stream.download.assert_called_once_with(
+            output_path="/tmp/job-1", filename="clip.m4a"
+        )
+        self.assertEqual(downloaded.path, "/tmp/job-1/clip.m4a")
+
+    def test_select_audio_stream(self):
+        streams = MagicMock()
+        low, adequate, high = (
+            MagicMock(abr="32kbps"),
+            MagicMock(abr="50kbps"),
+            MagicMock(abr="160kbps"),
+        )
+        streams.filter.return_value = [high, low, adequate]
+
+        self.assertIs(YoutubeButcher.select_audio_stream(streams, 48), adequate)
+        self.assertIs(YoutubeButcher.select_audio_stream(streams, 256), high)
+
+        streams.filter.return_value = []
+        self.assertIsNone(YoutubeButcher.select_audio_stream(streams))
+
+    @patch("app.butcher.youtube.YouTube")
+    def test_download_source_without_stream(self, mock_youtube):
+        mock_youtube.return_value.streams.filter.return_value.order_by.return_value.desc.return_value.first.return_value = None
+
+        self.assertIsNone(
+            YoutubeButcher.download_source(
+                output_path="/tmp", source="https://youtu.be/abc"
+            )
+        )
+
+
+class TestVideoUrls(unittest.TestCase):
+    def test_extract_video_id(self):
+        for url in (
+            "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+            "http://youtube.com/watch?feature=share&v=dQw4w9WgXcQ&t=42",
+            "https://m.youtube.com/watch?v=dQw4w9WgXcQ",
+            "https://youtu.be/dQw4w9WgXcQ?si=abc",
+            "https://www.youtube.com/shorts/dQw4w9WgXcQ",
+            "https://www.youtube.com/embed/dQw4w9WgXcQ",
+            " https://www.youtube.com/live/dQw4w9WgXcQ\n",
+        ):
+            self.assertEqual(extract_video_id(url), "dQw4w9WgXcQ", url)
+
+        self.assertIsNone(extract_video_id("https://example.com/video.mp4"))
+        self.assertIsNone(extract_video_id("https://youtu.be/dQw4w9WgXcQxyz"))
+
+    def test_normalize_url(self):
+        self.assertEqual(
+            normalize_url("https://youtu.be/dQw4w9WgXcQ?t=1"),
+            "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+        )
+        self.assertEqual(
+            normalize_url(" https://example.com/a.mp4 "), "https://example.com/a.mp4"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,28 @@
+import os
+import unittest
+from unittest.mock import patch
+
+from app.config import config
+
+
+class TestBooleanFlags(unittest.TestCase):
+    def test_flags_accept_the_same_values(self):
+        for value in ("1", "true", "TRUE", "yes", "Yes"):
+            with patch.dict(
+                os.environ, {"KEEP_AUDIO_FILES": value, "VAD_PREFILTER": value}
+            ):
+                self.assertTrue(config.keep_audio_files, value)
+                self.assertTrue(config.vad_prefilter, value)
+
+        for value in ("0", "false", "no", ""):
+            with patch.dict(os.environ, {"CHECKPOINT_JOBS": value}):
+                self.assertFalse(config.checkpoint_jobs, value)
+
+    def test_unset_flags_use_their_default(self):
+        with patch.dict(os.environ, clear=True):
+            self.assertTrue(config.checkpoint_jobs)
+            self.assertFalse(config.audio_only)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from alembic import command
+from alembic.config import Config
+from sqlmodel import Session, create_engine, select
+
+from app.config import config, database_config
+from app.database.job import ProcessingJob, ProcessingStage
+from app.pipeline.tracking import COMPLETED, JobTracker
+
+# The unnamed unique constraint of bc19335e7b42 cannot be altered into a SQLite
+# table, so the schema starts right before the job tracking migrations.
+BEFORE_JOB_TRACKING = "4a96a9dda632"
+
+
+class TestJobTrackingMigrations(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.url = f"sqlite:///{os.path.join(self.directory.name, 'database.db')}"
+
+        # Without a config file the Alembic environment leaves logging alone.
+        self.alembic = Config()
+        self.alembic.set_main_option(
+            "script_location", os.path.join(config.project_root, "alembic")
+        )
+
+        patcher = patch.object(database_config, "DATABASE_URL", self.url)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_tracker_writes_to_the_migrated_schema(self):
+        command.stamp(self.alembic, BEFORE_JOB_TRACKING)
+        command.upgrade(self.alembic, "head")
+
+        engine = create_engine(self.url)
+        self.addCleanup(engine.dispose)
+        tracker = JobTracker("https://example.com/v", "worker-1", engine)
+
+        with tracker.run("large-v3"):
+            tracker.record_tier("medium", "medium")
+            with tracker.stage("download"):
+                pass
+
+        with Session(engine) as session:
+            job = session.exec(select(ProcessingJob)).one()
+            stage = session.exec(select(ProcessingStage)).one()
+
+        self.assertEqual(job.status, COMPLETED)
+        self.assertEqual(job.tier, "medium")
+        self.assertEqual(job.model_name, "medium")
+        self.assertEqual(stage.name, "download")
+
+
+if __name__ == "__main__":
+    unittest.main()
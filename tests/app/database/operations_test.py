@@ -0,0 +1,58 @@
+import unittest
+from unittest.mock import patch
+
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine
+
+from app.database.operations import (
+    create_resource,
+    get_or_create_resource,
+    get_resource_by_url,
+)
+
+URL = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+
+
+class TestGetOrCreateResource(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine(
+            "sqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        SQLModel.metadata.create_all(self.engine)
+
+    def test_creates_once(self):
+        with Session(self.engine) as session:
+            resource, created = get_or_create_resource(session, URL, "First")
+            self.assertTrue(created)
+
+            again, created = get_or_create_resource(session, URL, "Second")
+            self.assertFalse(created)
+            self.assertEqual(again.id, resource.id)
+            self.assertEqual(again.title, "First")
+
+    def test_losing_a_race_returns_the_winner(self):
+        lookups = []
+
+        def lookup_before_winner(session, url):
+            if not lookups:
+                lookups.append(url)
+                with Session(self.engine) as other:
+                    create_resource(other, url, "Winner")
+                return None
+            return get_resource_by_url(session, url)
+
+        with patch(
+            "app.database.operations.get_resource_by_url",
+            side_effect=lookup_before_winner,
+        ):
+            with Session(self.engine) as session:
+                resource, created = get_or_create_resource(session, URL, "Loser")
+
+        self.assertFalse(created)
+        self.assertEqual(resource.title, "Winner")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,9 +1,11 @@
+import io
 import unittest
 from unittest.mock import Mock, patch
 
 import ffmpeg
+import numpy as np
 
-from app.ffmpeg_utils import FFmpegProcessor
+from app.ffmpeg_utils import BurnInOptions, FFmpegProcessor
 
 
 class TestFFmpegProcessor(unittest.TestCase):
@@ -85,6 +87,138 @@ class TestFFmpegProcessor(unittest.TestCase):
 
         self.assertIn("Failed to create FFmpeg output stream", str(context.exception))
 
+    @patch("ffmpeg.run")
+    def test_read_pcm(self, mock_run):
+        samples = np.array([0.0, 0.5, -0.5, 1.0], dtype=np.float32)
+        mock_run.return_value = (samples.tobytes(), b"")
+
+        result = self.processor.read_pcm("test.mp4", t=30)
+
+        np.testing.assert_array_equal(result, samples)
+        self.assertEqual(result.dtype, np.float32)
+
+        args = ffmpeg.compile(mock_run.call_args.args[0])
+        self.assertIn("pipe:", args)
+        self.assertEqual(args[args.index("-ar") + 1], "16000")
+        self.assertEqual(args[args.index("-ac") + 1], "1")
+        self.assertEqual(args[args.index("-f") + 1], "f32le")
+        self.assertEqual(args[args.index("-t") + 1], "30")
+        self.assertIn("-vn", args)
+
+    @patch("subprocess.Popen")
+    def test_stream_pcm_yields_blocks(self, mock_popen):
+        samples = np.arange(10, dtype=np.float32)
+        process = mock_popen.return_value
+        process.stdout = io.BytesIO(samples.tobytes())
+        process.stderr = io.BytesIO(b"")
+        process.wait.return_value = 0
+
+        blocks = list(self.processor.stream_pcm("test.mp4", block_seconds=4 / 16000))
+
+        self.assertEqual([len(block) for block in blocks], [4, 4, 2])
+        np.testing.assert_array_equal(np.concatenate(blocks), samples)
+        args = mock_popen.call_args.args[0]
+        self.assertEqual(args[args.index("-f") + 1], "f32le")
+        self.assertEqual(args[args.index("-loglevel") + 1], "error")
+
+    @patch("subprocess.Popen")
+    def test_stream_pcm_failure(self, mock_popen):
+        process = mock_popen.return_value
+        process.stdout = io.BytesIO(b"")
+        process.stderr = io.BytesIO(b"Invalid data found")
+        process.wait.return_value = 1
+
+        with self.assertRaises(RuntimeError):
+            list(self.processor.stream_pcm("broken.mp4"))
+
+    def test_subtitle_output_stream_copies_soft_subtitles(self):
+        stream = self.processor.subtitle_output(
+            "video.mp4", "sub.srt", "out.mp4", language="pl"
+        )
+
+        args = ffmpeg.compile(stream)
+
+        self.assertEqual(args[args.index("-c") + 1], "copy")
+        self.assertEqual(args[args.index("-c:s") + 1], "mov_text")
+        self.assertEqual(args[args.index("-metadata:s:s:0") + 1], "language=pl")
+        self.assertNotIn("-filter_complex", args)
+        self.assertNotIn("-vcodec", args)
+
+    def test_subtitle_output_burn_in_reencodes_video_only(self):
+        stream = self.processor.subtitle_output(
+            "video.mp4",
+            "sub.srt",
+            "out.mp4",
+            language="pl",
+            burn_in=BurnInOptions(preset="ultrafast", crf=28, threads=2),
+        )
+
+        args = ffmpeg.compile(stream)
+
+        self.assertIn("subtitles=sub.srt", args[args.index("-filter_complex") + 1])
+        self.assertEqual(args[args.index("-vcodec") + 1], "libx264")
+        self.assertEqual(args[args.index("-preset") + 1], "ultrafast")
+        self.assertEqual(args[args.index("-crf") + 1], "28")
+        self.assertEqual(args[args.index("-threads") + 1], "2")
+        self.assertEqual(args[args.index("-acodec") + 1], "copy")
+        self.assertIn("0:a?", args)
+
+    def test_subtitle_output_adds_audio_tracks(self):
+        stream = self.processor.subtitle_output(
+            "video.mp4", "sub.srt", "out.mp4", language="pl", audio_tracks=["dub.m4a"]
+        )
+
+        args = ffmpeg.compile(stream)
+
+        self.assertEqual(args.count("-i"), 3)
+        self.assertIn("dub.m4a", args)
+        self.assertIn("2:a", args)
+        self.assertEqual(args[args.index("-c") + 1], "copy")
+
+    def test_subtitle_output_muxes_extra_subtitles(self):
+        stream = self.processor.subtitle_output(
+            "video.mp4",
+            "sub.en.srt",
+            "out.mp4",
+            language="en",
+            extra_subtitles=[("sub.de.srt", "de")],
+        )
+
+        args = ffmpeg.compile(stream)
+
+        self.assertEqual(args.count("-i"), 3)
+        self.assertEqual(args[args.index("-metadata:s:s:0") + 1], "language=en")
+        self.assertEqual(args[args.index("-metadata:s:s:1") + 1], "language=de")
+
+    def test_burn_in_keeps_extra_subtitles_soft(self):
+        stream = self.processor.subtitle_output(
+            "video.mp4",
+            "sub.en.srt",
+            "out.mp4",
+            language="en",
+            burn_in=BurnInOptions(),
+            extra_subtitles=[("sub.de.srt", "de")],
+        )
+
+        args = ffmpeg.compile(stream)
+
+        self.assertIn("subtitles=sub.en.srt", args[args.index("-filter_complex") + 1])
+        self.assertEqual(args[args.index("-c:s") + 1], "mov_text")
+        self.assertEqual(args[args.index("-metadata:s:s:0") + 1], "language=de")
+
+    @patch("ffmpeg.run")
+    def test_write_pcm_pipes_samples(self, mock_run):
+        mock_run.return_value = (b"", b"")
+        samples = np.array([0.0, 0.25], dtype=np.float32)
+
+        self.processor.write_pcm(samples, "speech.m4a", sample_rate=24000)
+
+        args = ffmpeg.compile(mock_run.call_args.args[0])
+        self.assertEqual(args[args.index("-i") + 1], "pipe:")
+        self.assertEqual(args[args.index("-ar") + 1], "24000")
+        self.assertEqual(args[args.index("-acodec") + 1], "aac")
+        self.assertEqual(mock_run.call_args.kwargs["input"], samples.tobytes())
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,110 @@
+import os
+import tempfile
+import unittest
+
+from app.pipeline.checkpoint import (
+    Checkpoint,
+    SegmentCheckpointSink,
+    read_segment_checkpoint,
+    resumable,
+)
+from app.transcriber.segments import Segment, Word
+
+SOURCE = "https://www.youtube.com/watch?v=abc"
+
+
+class Item:
+    def __init__(self, checkpoint):
+        self.source = SOURCE
+        self.checkpoint = checkpoint
+        self.value = None
+
+
+class TestCheckpoint(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_manifest_survives_restart(self):
+        Checkpoint(self.directory.name, SOURCE).save("download", {"title": "t"})
+
+        checkpoint = Checkpoint(self.directory.name, SOURCE)
+
+        self.assertTrue(checkpoint.completed("download"))
+        self.assertEqual(checkpoint.load("download"), {"title": "t"})
+        self.assertFalse(checkpoint.completed("extract"))
+
+    def test_manifest_of_another_source_is_ignored(self):
+        Checkpoint(self.directory.name, SOURCE).save("download", {})
+
+        self.assertEqual(Checkpoint(self.directory.name, "other").stages, [])
+
+    def test_invalidate_drops_following_stages(self):
+        checkpoint = Checkpoint(self.directory.name, SOURCE)
+        for stage in ("download", "extract", "transcribe"):
+            checkpoint.save(stage, {})
+
+        checkpoint.invalidate("extract")
+
+        self.assertEqual(Checkpoint(self.directory.name, SOURCE).stages, ["download"])
+
+    def test_completed_stage_is_skipped(self):
+        calls = []
+
+        def handler(item):
+            calls.append(item.value)
+            item.value = "computed"
+            return item
+
+        def restore(item, outputs):
+            item.value = outputs["value"]
+            return item
+
+        stage = resumable(
+            "stage", handler, dump=lambda i: {"value": i.value}, restore=restore
+        )
+
+        first = stage(Item(Checkpoint(self.directory.name, SOURCE)))
+        second = stage(Item(Checkpoint(self.directory.name, SOURCE)))
+
+        self.assertEqual(calls, [None])
+        self.assertEqual(first.value, "computed")
+        self.assertEqual(second.value, "computed")
+
+    def test_stale_stage_runs_again(self):
+        checkpoint = Checkpoint(self.directory.name, SOURCE)
+        checkpoint.save("stage", {"value": "old"})
+
+        stage = resumable(
+            "stage",
+            lambda item: item,
+            dump=lambda item: {"value": "new"},
+            restore=lambda item, outputs: None,
+        )
+        stage(Item(checkpoint))
+
+        self.assertEqual(checkpoint.load("stage"), {"value": "new"})
+
+
+class TestSegmentCheckpoint(unittest.TestCase):
+    def test_round_trip_drops_torn_line(self):
+        segments = [
+            Segment(0.0, 1.5, "Hello", [Word(0.0, 1.5, "Hello", 0.9)]),
+            Segment(2.0, 3.0, "world"),
+        ]
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "segments.jsonl")
+            with SegmentCheckpointSink(path, "pl") as sink:
+                for segment in segments:
+                    sink.write(segment)
+
+            with open(path, "a", encoding="utf-8") as f:
+                f.write('{"start": 3.5, "end"')
+
+            self.assertEqual(read_segment_checkpoint(path), ("pl", segments))
+
+    def test_missing_checkpoint(self):
+        self.assertEqual(read_segment_checkpoint("missing.jsonl"), (None, []))
@@ -0,0 +1,46 @@
+import time
+import unittest
+
+from app.pipeline.job import Job
+
+SOURCE = "https://www.youtube.com/watch?v=abc"
+
+
+class TestJobFromMessage(unittest.TestCase):
+    def test_plain_url(self):
+        job = Job.from_message(SOURCE.encode("utf-8"), workspace="/tmp/job")
+
+        self.assertEqual(job.source, SOURCE)
+        self.assertEqual(job.workspace, "/tmp/job")
+        self.assertEqual(job.locales, [])
+        self.assertFalse(job.multi_track)
+
+    def test_json_with_locales(self):
+        body = b'{"source": "%s", "locales": ["en", "de", "en"], "multi_track": true}'
+
+        job = Job.from_message(body % SOURCE.encode("utf-8"))
+
+        self.assertEqual(job.source, SOURCE)
+        self.assertEqual(job.locales, ["en", "de"])
+        self.assertTrue(job.multi_track)
+
+    def test_json_audio_only(self):
+        body = b'{"source": "%s", "audio_only": true}' % SOURCE.encode("utf-8")
+
+        self.assertTrue(Job.from_message(body).audio_only)
+
+    def test_json_deadline_is_relative(self):
+        body = b'{"source": "%s", "deadline": 600}' % SOURCE.encode("utf-8")
+
+        job = Job.from_message(body)
+
+        self.assertAlmostEqual(job.deadline, time.time() + 600, delta=5)
+        self.assertIsNone(Job.from_message(SOURCE.encode("utf-8")).deadline)
+
+    def test_json_without_source(self):
+        with self.assertRaises(ValueError):
+            Job.from_message(b'{"locales": ["en"]}')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,137 @@
+import asyncio
+import threading
+import traceback
+import unittest
+
+from app.pipeline.orchestrator import AsyncPipeline, Stage
+
+
+class TestAsyncPipeline(unittest.IsolatedAsyncioTestCase):
+    async def test_items_pass_through_sync_and_async_stages(self):
+        async def double(item):
+            await asyncio.sleep(0)
+            return item * 2
+
+        pipeline = AsyncPipeline(
+            [Stage("double", double), Stage("increment", lambda item: item + 1)]
+        )
+        await pipeline.start()
+
+        results = await asyncio.gather(*(pipeline.submit(i) for i in range(5)))
+        await pipeline.stop()
+
+        self.assertEqual(results, [1, 3, 5, 7, 9])
+
+    async def test_stages_overlap_across_items(self):
+        first_in_second_stage = threading.Event()
+        overlapped = []
+
+        def slow(item):
+            if item == 0:
+                overlapped.append(first_in_second_stage.wait(timeout=5))
+            return item
+
+        async def fast(item):
+            return item
+
+        pipeline = AsyncPipeline(
+            [Stage("fast", fast), Stage("slow", slow), Stage("after", fast)]
+        )
+        await pipeline.start()
+
+        first = asyncio.create_task(pipeline.submit(0))
+        await asyncio.sleep(0.05)
+        second = asyncio.create_task(pipeline.submit(1))
+        while pipeline.queue_depths()["slow"]["waiting"] == 0:
+            await asyncio.sleep(0.01)
+        first_in_second_stage.set()
+
+        self.assertEqual(await asyncio.gather(first, second), [0, 1])
+        self.assertEqual(overlapped, [True])
+        await pipeline.stop()
+
+    async def test_failure_propagates_and_pipeline_keeps_running(self):
+        def check(item):
+            if item < 0:
+                raise ValueError("negative")
+            return item
+
+        pipeline = AsyncPipeline([Stage("check", check), Stage("echo", check)])
+        await pipeline.start()
+
+        with self.assertRaises(ValueError):
+            await pipeline.submit(-1)
+        self.assertEqual(await pipeline.submit(1), 1)
+
+        await pipeline.stop()
+
+    async def test_failure_keeps_the_stage_frame(self):
+        error = ValueError("negative")
+
+        def check(item):
+            raise error
+
+        pipeline = AsyncPipeline([Stage("check", check)])
+        await pipeline.start()
+
+        try:
+            await pipeline.submit(-1)
+        except ValueError as e:
+            frames = [frame.name for frame in traceback.extract_tb(e.__traceback__)]
+            self.assertIs(e, error)
+            self.assertIn("check", frames)
+        else:
+            self.fail("the stage failure was not propagated")
+        await pipeline.stop()
+
+    async def test_stop_cancels_items_in_flight(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        def block(item):
+            started.set()
+            release.wait(5)
+            return item
+
+        pipeline = AsyncPipeline([Stage("block", block), Stage("echo", block)])
+        await pipeline.start()
+
+        running = asyncio.create_task(pipeline.submit(0))
+        waiting = asyncio.create_task(pipeline.submit(1))
+        await asyncio.to_thread(started.wait, 5)
+        await asyncio.sleep(0.01)
+
+        await pipeline.stop()
+        release.set()
+
+        for task in (running, waiting):
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+    async def test_concurrency_limits_active_items(self):
+        active = 0
+        peak = 0
+
+        async def track(item):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            return item
+
+        pipeline = AsyncPipeline([Stage("track", track, concurrency=2, queue_size=4)])
+        await pipeline.start()
+
+        await asyncio.gather(*(pipeline.submit(i) for i in range(6)))
+        await pipeline.stop()
+
+        self.assertEqual(peak, 2)
+
+    def test_pipeline_requires_stages(self):
+        with self.assertRaises(ValueError):
+            AsyncPipeline([])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,581 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+from sqlalchemy.exc import OperationalError
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from app.butcher.store import MediaStore
+from app.database.resource import StreamingResource
+from app.pipeline import stages
+from app.pipeline.checkpoint import Checkpoint
+from app.pipeline.job import Job
+from app.ffmpeg_utils import SAMPLE_RATE
+from app.subtitles.srt import read_cues
+from app.transcriber.language import DetectedLanguage
+from app.transcriber.policy import TierPolicy
+from app.transcriber.segments import Segment, Word
+from app.transcriber.vad import VoiceActivityDetector
+from app.translator.backends import FakeTranslationBackend
+from app.translator.translator import Translator
+
+SRT = """1
+00:00:00,000 --> 00:00:01,000
+Cześć
+
+2
+00:00:01,500 --> 00:00:03,000
+Subskrybuj
+"""
+
+
+class TestLocaleFanOut(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        workspace = self.directory.name
+
+        subtitle_path = os.path.join(workspace, "sub-video.pl.srt")
+        with open(subtitle_path, "w", encoding="utf-8") as f:
+            f.write(SRT)
+
+        processor = MagicMock()
+        processor.input_filename = "video"
+        processor.subtitle_path.side_effect = lambda language, output_dir: os.path.join(
+            output_dir, f"sub-video.{language}.srt"
+        )
+
+        self.job = Job(
+            source="https://www.youtube.com/watch?v=abc",
+            workspace=workspace,
+            locales=["en", "pl", "de"],
+            processor=processor,
+            video_path=os.path.join(workspace, "video.mp4"),
+            language="pl",
+            subtitle_path=subtitle_path,
+        )
+
+        self.backend = FakeTranslationBackend()
+        patchers = [
+            patch.dict(os.environ, {"SSML_DIR": workspace}),
+            patch.object(
+                stages, "get_translator", return_value=Translator(self.backend)
+            ),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_translate_produces_every_locale(self):
+        job = stages.translate(self.job)
+
+        self.assertEqual(
+            [localization.locale for localization in job.localizations],
+            ["en", "pl", "de"],
+        )
+        self.assertEqual(len(self.backend.batches), 2)
+        self.assertEqual(job.language, "en")
+        self.assertEqual(job.subtitle_path, job.localizations[0].subtitle_path)
+        self.assertEqual(
+            [cue.text for cue in read_cues(job.subtitle_path)],
+            ["[en] Cześć", "[en] Subskrybuj"],
+        )
+        self.assertTrue(job.localizations[2].ssml_path.endswith("video.de.txt"))
+        with open(job.localizations[2].ssml_path, encoding="utf-8-sig") as f:
+            self.assertIn("[de] Subskrybuj", f.read())
+
+    def test_ssml_voiced_in_the_target_locale(self):
+        env = {
+            "SSML_LOCALE_VOICES": "pl:pl-PL-ZofiaNeural",
+            "SSML_DEFAULT_VOICE": "en-US-JennyNeural",
+        }
+        self.job.locales = ["de", "pl", "ja"]
+
+        with patch.dict(os.environ, env):
+            job = stages.translate(self.job)
+
+        voices = {}
+        for localization in job.localizations:
+            with open(localization.ssml_path, encoding="utf-8-sig") as f:
+                voices[localization.locale] = f.read()
+
+        self.assertIn('<voice name="de-DE-ConradNeural">', voices["de"])
+        self.assertIn('<voice name="pl-PL-ZofiaNeural">', voices["pl"])
+        self.assertIn('<voice name="en-US-JennyNeural">', voices["ja"])
+        self.assertIn('xml:lang="de-DE"', voices["de"])
+        self.assertIn('xml:lang="pl-PL"', voices["pl"])
+        self.assertIn('xml:lang="ja"', voices["ja"])
+
+    def test_mux_one_video_per_locale(self):
+        self.job.processor.add_subtitle_to_video.side_effect = lambda **options: (
+            options["output_filename"]
+        )
+        self.job.speech_path = "speech.m4a"
+
+        job = stages.mux(stages.translate(self.job))
+
+        self.assertEqual(
+            [localization.output_path for localization in job.localizations],
+            ["video.en.mp4", "video.pl.mp4", "video.de.mp4"],
+        )
+        self.assertEqual(job.output_path, "video.en.mp4")
+        calls = job.processor.add_subtitle_to_video.call_args_list
+        self.assertEqual(
+            sorted(len(call.kwargs["audio_tracks"]) for call in calls), [0, 0, 1]
+        )
+
+    def test_mux_all_locales_into_one_video(self):
+        self.job.multi_track = True
+        self.job.processor.add_subtitle_to_video.return_value = "video.mp4"
+
+        job = stages.mux(stages.translate(self.job))
+
+        options = job.processor.add_subtitle_to_video.call_args.kwargs
+        self.assertEqual(options["subtitle_language"], "en")
+        self.assertEqual(
+            [language for _, language in options["extra_subtitles"]], ["pl", "de"]
+        )
+        self.assertEqual(
+            {localization.output_path for localization in job.localizations},
+            {"video.mp4"},
+        )
+
+
+class TestAudioOnly(unittest.TestCase):
+    def test_transcribes_the_download_and_skips_mux(self):
+        job = Job(
+            source="https://www.youtube.com/watch?v=abc",
+            audio_only=True,
+            processor=MagicMock(),
+            video_path="/tmp/job-1/clip.m4a",
+        )
+
+        job = stages.mux(stages.extract(job))
+
+        self.assertEqual(job.audio, "/tmp/job-1/clip.m4a")
+        job.processor.load_audio.assert_not_called()
+        job.processor.add_subtitle_to_video.assert_not_called()
+        self.assertIsNone(job.output_path)
+
+
+class TestStoredDownload(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.workspace = os.path.join(self.directory.name, "job")
+        os.makedirs(self.workspace)
+
+        self.engine = create_engine(
+            f"sqlite:///{os.path.join(self.directory.name, 'database.db')}"
+        )
+        self.addCleanup(self.engine.dispose)
+        SQLModel.metadata.create_all(self.engine)
+
+        self.store = MediaStore(os.path.join(self.directory.name, "media"))
+        self.butcher = MagicMock()
+        self.butcher.download_source.side_effect = self.fake_download
+        patchers = [
+            patch.object(stages, "engine", self.engine),
+            patch.object(stages, "media_store", self.store),
+            patch.object(stages, "YoutubeButcher", self.butcher),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def fake_download(self, source, output_path, **options):
+        time.sleep(0.1)
+        path = os.path.join(output_path, "clip.mp4")
+        with open(path, "wb") as f:
+            f.write(b"downloaded video")
+        return MagicMock(title="Clip", path=path)
+
+    def job(self, name="job") -> Job:
+        workspace = os.path.join(self.directory.name, name)
+        os.makedirs(workspace, exist_ok=True)
+        return Job(
+            source="https://www.youtube.com/watch?v=abcdefghijk",
+            workspace=workspace,
+        )
+
+    def resources(self):
+        with Session(self.engine) as session:
+            return session.exec(select(StreamingResource)).all()
+
+    def test_known_video_reused_from_the_store(self):
+        first = stages.record(stages.download(self.job("first")))
+        os.remove(first.video_path)
+
+        job = stages.download(self.job("second"))
+
+        self.butcher.download_source.assert_called_once()
+        self.assertEqual(job.title, "Clip")
+        self.assertEqual(
+            job.video_path, os.path.join(self.directory.name, "second", "clip.mp4")
+        )
+        self.assertEqual(job.processor.input_video_path, job.video_path)
+        with open(job.video_path, "rb") as f:
+            self.assertEqual(f.read(), b"downloaded video")
+
+    def test_resource_claimed_when_the_download_starts(self):
+        stages.download(self.job())
+
+        (resource,) = self.resources()
+        self.assertEqual(resource.url, "https://www.youtube.com/watch?v=abcdefghijk")
+
+    def test_concurrent_jobs_of_a_video_download_it_once(self):
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            jobs = list(executor.map(stages.download, [self.job("a"), self.job("b")]))
+
+        self.butcher.download_source.assert_called_once()
+        self.assertEqual(len(self.resources()), 1)
+        self.assertNotEqual(jobs[0].video_path, jobs[1].video_path)
+
+    def test_evicted_video_downloaded_again(self):
+        stages.download(self.job("first"))
+        shutil.rmtree(os.path.join(self.store.directory, "abcdefghijk"))
+
+        stages.download(self.job("second"))
+
+        self.assertEqual(self.butcher.download_source.call_count, 2)
+
+    def test_record_survives_database_errors(self):
+        job = stages.download(self.job())
+
+        with patch.object(
+            stages, "get_or_create_resource", side_effect=OperationalError("", {}, "")
+        ):
+            self.assertIs(stages.record(job), job)
+
+
+class TestQualityTier(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+        patchers = [
+            patch.dict(os.environ, {"SSML_DIR": self.directory.name}),
+            patch.object(
+                stages, "tier_policy", TierPolicy(backlog_thresholds=(10, 30))
+            ),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_backlog_downgrades_the_transcription(self):
+        processor = MagicMock()
+        processor.transcribe.return_value = ("pl", [Segment(0.0, 1.0, " Hej", [])])
+        processor.subtitle_path.return_value = os.path.join(
+            self.directory.name, "sub.pl.srt"
+        )
+        processor.words_path.return_value = os.path.join(
+            self.directory.name, "sub.pl.words.json"
+        )
+        job = Job(
+            source="https://www.youtube.com/watch?v=abc",
+            workspace=self.directory.name,
+            processor=processor,
+            video_path=os.path.join(self.directory.name, "video.mp4"),
+            audio=np.zeros(SAMPLE_RATE, dtype=np.float32),
+            queue_depth=12,
+            tracker=MagicMock(),
+        )
+
+        job = stages.transcribe(job)
+
+        self.assertEqual(job.tier.name, "medium")
+        self.assertEqual(job.model_name, "medium")
+        options = processor.transcribe.call_args.kwargs
+        self.assertEqual(options["model_name"], "medium")
+        self.assertEqual(options["beam_size"], 3)
+        job.tracker.record_tier.assert_called_once_with("medium", "medium")
+
+
+class TestBatchRouting(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+        self.batch = MagicMock()
+        self.batch.submit.return_value.result.return_value = (
+            "pl",
+            [Segment(0.0, 1.0, " Hej", [])],
+        )
+        env = {
+            "SSML_DIR": self.directory.name,
+            "TRANSCRIBE_BATCH_WORKERS": "4",
+            "TRANSCRIBE_BATCH_MAX_MINUTES": "1",
+        }
+        patchers = [
+            patch.dict(os.environ, env),
+            patch.object(stages, "get_batch_transcriber", return_value=self.batch),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def transcribe(self, seconds: int) -> MagicMock:
+        processor = MagicMock()
+        processor.transcribe.return_value = ("pl", [Segment(0.0, 1.0, " Hej", [])])
+        processor.subtitle_path.return_value = os.path.join(
+            self.directory.name, "sub.pl.srt"
+        )
+        processor.words_path.return_value = os.path.join(
+            self.directory.name, "sub.pl.words.json"
+        )
+        stages.transcribe(
+            Job(
+                source="https://www.youtube.com/watch?v=abc",
+                workspace=self.directory.name,
+                processor=processor,
+                video_path=os.path.join(self.directory.name, "video.mp4"),
+                audio=np.zeros(seconds * SAMPLE_RATE, dtype=np.float32),
+            )
+        )
+        return processor
+
+    def test_short_clip_shares_the_batch_model(self):
+        processor = self.transcribe(30)
+
+        self.batch.submit.assert_called_once()
+        processor.transcribe.assert_not_called()
+
+    def test_long_clip_streams_on_its_own(self):
+        processor = self.transcribe(90)
+
+        self.batch.submit.assert_not_called()
+        self.assertEqual(processor.transcribe.call_args.kwargs["chunk_workers"], 1)
+
+
+class TestLanguageDetection(unittest.TestCase):
+    def setUp(self):
+        self.detector = MagicMock()
+        self.detector.detect.return_value = DetectedLanguage("en", 0.9, True)
+        patcher = patch.object(stages, "language_detector", self.detector)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.job = Job(source="https://www.youtube.com/watch?v=abc")
+        self.job.processor = MagicMock()
+        self.job.processor.load_audio.return_value = np.zeros(
+            SAMPLE_RATE * 30, dtype=np.float32
+        )
+
+    def test_disabled_by_default(self):
+        with patch.dict(os.environ, {"LANGUAGE_DETECTION": "false"}):
+            job = stages.detect_language(self.job)
+
+        self.assertIsNone(job.source_language)
+        job.processor.load_audio.assert_not_called()
+
+    def test_detected_language_routes_the_transcription(self):
+        env = {
+            "LANGUAGE_DETECTION": "true",
+            "LANGUAGE_PROBE_SECONDS": "20",
+            "LANGUAGE_PROBE_OFFSET_SECONDS": "60",
+            "LOCALE": "pl",
+        }
+        with patch.dict(os.environ, env):
+            job = stages.detect_language(self.job)
+
+        self.assertEqual(job.source_language, "en")
+        job.processor.load_audio.assert_called_once_with(60.0, 20.0)
+        self.assertEqual(self.detector.detect.call_args.kwargs["fallback"], "pl")
+
+    def test_short_video_probed_from_the_start(self):
+        self.job.processor.load_audio.side_effect = [
+            np.zeros(0, dtype=np.float32),
+            np.zeros(SAMPLE_RATE * 10, dtype=np.float32),
+        ]
+        env = {"LANGUAGE_DETECTION": "true", "LANGUAGE_PROBE_OFFSET_SECONDS": "60"}
+        with patch.dict(os.environ, env):
+            stages.detect_language(self.job)
+
+        self.assertEqual(self.job.processor.load_audio.call_args.args, (0, 30.0))
+        (probe,) = self.detector.detect.call_args.args
+        self.assertEqual(len(probe), SAMPLE_RATE * 10)
+
+
+class TestSpeechPrefilter(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        workspace = self.directory.name
+
+        patchers = [
+            patch.dict(os.environ, {"SSML_DIR": workspace, "VAD_PREFILTER": "true"}),
+            patch.object(
+                stages,
+                "voice_activity_detector",
+                VoiceActivityDetector(pad_ms=300, use_silero=False),
+            ),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        silence = np.zeros(SAMPLE_RATE * 10, dtype=np.float32)
+        speech = np.full(SAMPLE_RATE * 2, 0.2, dtype=np.float32)
+        audio = np.concatenate([silence, speech, silence])
+
+        processor = MagicMock()
+        processor.stream_audio.return_value = iter(np.array_split(audio, 5))
+        processor.subtitle_path.return_value = os.path.join(workspace, "sub.pl.srt")
+        processor.words_path.return_value = os.path.join(workspace, "sub.pl.words.json")
+        processor.transcribe.return_value = (
+            "pl",
+            [Segment(0.5, 2.5, " Hej", [])],
+        )
+        self.job = Job(
+            source="https://www.youtube.com/watch?v=abc",
+            workspace=workspace,
+            processor=processor,
+            video_path=os.path.join(workspace, "video.mp4"),
+        )
+
+    def test_only_speech_is_transcribed(self):
+        job = stages.extract(stages.detect_speech(self.job))
+
+        self.assertEqual(len(job.speech_map.regions), 1)
+        self.assertEqual(len(job.audio), job.speech_map.speech_samples)
+        self.assertLess(len(job.audio), SAMPLE_RATE * 3)
+        self.assertTrue(os.path.exists(stages._speech_map_path(job)))
+        job.processor.load_audio.assert_not_called()
+
+        job = stages.transcribe(job)
+
+        options = job.processor.transcribe.call_args.kwargs
+        self.assertEqual(options["speech"], job.speech_map.compacted_regions())
+        (cue,) = read_cues(job.subtitle_path)
+        start = job.speech_map.regions[0][0] / SAMPLE_RATE
+        self.assertEqual(cue.start_ms, round((start + 0.5) * 1000))
+        self.assertEqual(cue.end_ms, round((start + 2.5) * 1000))
+
+    def test_disabled_by_default(self):
+        with patch.dict(os.environ, {"VAD_PREFILTER": "false"}):
+            job = stages.detect_speech(self.job)
+
+        self.assertIsNone(job.speech_map)
+        job.processor.stream_audio.assert_not_called()
+
+
+class TestAudioCheckpoint(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.extract = stages.pipeline_stage("extract", stages.extract)
+
+    def job(self):
+        processor = MagicMock()
+        processor.load_audio.return_value = np.zeros(SAMPLE_RATE, dtype=np.float32)
+        return Job(
+            source="https://www.youtube.com/watch?v=abc",
+            workspace=self.directory.name,
+            processor=processor,
+            checkpoint=Checkpoint(
+                self.directory.name, "https://www.youtube.com/watch?v=abc"
+            ),
+        )
+
+    def test_decoded_audio_not_written_by_default(self):
+        with patch.dict(os.environ, {"CHECKPOINT_AUDIO": "false"}):
+            self.extract(self.job())
+            retry = self.extract(self.job())
+
+        self.assertFalse(os.path.exists(os.path.join(self.directory.name, "audio.npy")))
+        retry.processor.load_audio.assert_called_once()
+
+    def test_audio_not_decoded_again_after_transcription(self):
+        with patch.dict(os.environ, {"CHECKPOINT_AUDIO": "false"}):
+            self.extract(self.job())
+            Checkpoint(self.directory.name, "https://www.youtube.com/watch?v=abc").save(
+                "transcribe", {}
+            )
+            retry = self.extract(self.job())
+
+        retry.processor.load_audio.assert_not_called()
+        self.assertTrue(retry.checkpoint.completed("transcribe"))
+
+    def test_opt_in_audio_checkpoint(self):
+        with patch.dict(os.environ, {"CHECKPOINT_AUDIO": "true"}):
+            self.extract(self.job())
+            retry = self.extract(self.job())
+
+        retry.processor.load_audio.assert_not_called()
+        self.assertEqual(len(retry.audio), SAMPLE_RATE)
+
+
+class TestWordTimestamps(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+        env = {
+            "SSML_DIR": self.directory.name,
+            "RESEGMENT_SUBTITLES": "true",
+            "CAPTION_MAX_LINE_CHARS": "12",
+            "CAPTION_MAX_LINES": "1",
+        }
+        patcher = patch.dict(os.environ, env)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        words = [
+            Word(0.0, 0.4, " Hello"),
+            Word(0.5, 0.9, " there,"),
+            Word(1.0, 1.4, " my"),
+            Word(1.5, 1.9, " friend."),
+        ]
+        processor = MagicMock()
+        processor.transcribe.return_value = (
+            "en",
+            [Segment(0.0, 1.9, " Hello there, my friend.", words)],
+        )
+        processor.subtitle_path.return_value = os.path.join(
+            self.directory.name, "sub.en.srt"
+        )
+        processor.words_path.return_value = os.path.join(
+            self.directory.name, "sub.en.words.json"
+        )
+        self.job = Job(
+            source="https://www.youtube.com/watch?v=abc",
+            workspace=self.directory.name,
+            processor=processor,
+            video_path=os.path.join(self.directory.name, "video.mp4"),
+            audio=np.zeros(SAMPLE_RATE, dtype=np.float32),
+        )
+
+    def test_cues_rebuilt_and_words_exported(self):
+        job = stages.transcribe(self.job)
+
+        cues = read_cues(job.subtitle_path)
+        self.assertEqual([cue.text for cue in cues], ["Hello there,", "my friend."])
+        self.assertLessEqual(cues[0].end_ms, cues[1].start_ms)
+
+        with open(job.words_path, encoding="utf-8") as f:
+            document = json.load(f)
+        self.assertEqual(len(document["segments"][0]["words"]), 4)
+
+        ssml = stages._ssml_path(job)
+        with open(ssml, encoding="utf-8-sig") as f:
+            self.assertIn("Hello there, my friend.", f.read())
+
+    def test_word_export_disabled(self):
+        with patch.dict(os.environ, {"EXPORT_WORD_TIMESTAMPS": "false"}):
+            job = stages.transcribe(self.job)
+
+        self.assertIsNone(job.words_path)
+        self.assertFalse(
+            os.path.exists(os.path.join(self.directory.name, "sub.en.words.json"))
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
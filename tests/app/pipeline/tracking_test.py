@@ -0,0 +1,93 @@
+import asyncio
+import unittest
+
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from app.database.job import ProcessingJob, ProcessingStage
+from app.pipeline.tracking import COMPLETED, FAILED, JobTracker, tracked
+
+
+class Item:
+    def __init__(self, tracker=None):
+        self.tracker = tracker
+        self.size = 0
+
+
+class TestJobTracker(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine(
+            "sqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        SQLModel.metadata.create_all(self.engine)
+        self.tracker = JobTracker("https://example.com/v", "worker-1", self.engine)
+
+    def stages(self):
+        with Session(self.engine) as session:
+            return session.exec(select(ProcessingStage)).all()
+
+    def job(self):
+        with Session(self.engine) as session:
+            return session.exec(select(ProcessingJob)).one()
+
+    def test_records_job_and_stages(self):
+        def grow(item):
+            item.size = 42
+            return item
+
+        handler = tracked("grow", grow, measure=lambda item: item.size)
+
+        with self.tracker.run("small"):
+            handler(Item(self.tracker))
+
+        job = self.job()
+        self.assertEqual(job.status, COMPLETED)
+        self.assertEqual(job.model_name, "small")
+        self.assertEqual(job.worker_id, "worker-1")
+        self.assertIsNotNone(job.finished_at)
+
+        (stage,) = self.stages()
+        self.assertEqual(stage.name, "grow")
+        self.assertEqual(stage.status, COMPLETED)
+        self.assertEqual(stage.size_bytes, 42)
+        self.assertEqual(stage.job_id, job.id)
+        self.assertGreaterEqual(stage.duration_ms, 0)
+
+    def test_records_tier(self):
+        with self.tracker.run("large-v3"):
+            self.tracker.record_tier("low", "small")
+
+        job = self.job()
+        self.assertEqual(job.tier, "low")
+        self.assertEqual(job.model_name, "small")
+
+    def test_failed_stage_fails_the_job(self):
+        async def broken(item):
+            raise ValueError("no audio stream")
+
+        handler = tracked("extract", broken)
+
+        with self.assertRaises(ValueError):
+            with self.tracker.run():
+                asyncio.run(handler(Item(self.tracker)))
+
+        (stage,) = self.stages()
+        self.assertEqual(stage.status, FAILED)
+        self.assertEqual(self.job().status, FAILED)
+        self.assertEqual(self.job().error, "no audio stream")
+
+    def test_untracked_items_pass_through(self):
+        item = Item()
+        self.assertIs(tracked("noop", lambda i: i)(item), item)
+        self.assertEqual(self.stages(), [])
+
+    def test_database_errors_do_not_fail_the_job(self):
+        SQLModel.metadata.drop_all(self.engine)
+
+        with self.tracker.run():
+            with self.tracker.stage("download"):
+                pass
+
+        self.assertIsNone(self.tracker.job_id)
@@ -0,0 +1,132 @@
+import threading
+import unittest
+from concurrent.futures import Future
+from unittest.mock import Mock, patch
+
+from app.rabbitmq import RabbitMQService
+
+
+class TestRabbitMQService(unittest.TestCase):
+    def setUp(self):
+        patcher = patch("pika.BlockingConnection")
+        self.mock_connection_class = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.connection = self.mock_connection_class.return_value
+        self.connection.add_callback_threadsafe.side_effect = lambda fn: fn()
+        self.channel = self.connection.channel.return_value
+        self.channel.is_open = True
+
+        self.service = RabbitMQService()
+
+    def deliver(self, *messages):
+        def start_consuming():
+            callback = self.channel.basic_consume.call_args.kwargs[
+                "on_message_callback"
+            ]
+            for tag, redelivered, body in messages:
+                method = Mock(delivery_tag=tag, redelivered=redelivered)
+                callback(self.channel, method, None, body)
+
+        self.channel.start_consuming.side_effect = start_consuming
+
+    def test_consume_concurrently_acks_processed_messages(self):
+        self.deliver((1, False, b"first"), (2, False, b"second"))
+        external_callback = Mock()
+
+        self.service.consume_concurrently(
+            external_callback, prefetch_count=4, max_workers=2
+        )
+
+        self.channel.basic_qos.assert_called_once_with(prefetch_count=4)
+        self.assertFalse(self.channel.basic_consume.call_args.kwargs["auto_ack"])
+        self.assertEqual(external_callback.call_count, 2)
+        acked = sorted(
+            c.kwargs["delivery_tag"] for c in self.channel.basic_ack.call_args_list
+        )
+        self.assertEqual(acked, [1, 2])
+        self.channel.basic_nack.assert_not_called()
+
+    def test_consume_concurrently_requeues_failed_message_once(self):
+        self.deliver((1, False, b"first"), (2, True, b"second"))
+        external_callback = Mock(side_effect=RuntimeError("boom"))
+
+        self.service.consume_concurrently(external_callback, max_workers=1)
+
+        self.channel.basic_ack.assert_not_called()
+        nacks = {
+            c.kwargs["delivery_tag"]: c.kwargs["requeue"]
+            for c in self.channel.basic_nack.call_args_list
+        }
+        self.assertEqual(nacks, {1: True, 2: False})
+
+    def test_consume_concurrently_skips_closed_channel(self):
+        self.channel.is_open = False
+        self.deliver((1, False, b"first"))
+
+        self.service.consume_concurrently(Mock(), max_workers=1)
+
+        self.channel.basic_ack.assert_not_called()
+
+    def test_stop_when_event_is_set(self):
+        stop = threading.Event()
+
+        self.service.stop_when(stop, interval=0.1)
+        poll = self.connection.call_later.call_args.args[1]
+        poll()
+
+        self.channel.stop_consuming.assert_not_called()
+        self.assertEqual(self.connection.call_later.call_count, 2)
+
+        stop.set()
+        self.connection.call_later.call_args.args[1]()
+
+        self.channel.stop_consuming.assert_called_once()
+        self.assertEqual(self.connection.call_later.call_count, 2)
+
+    def test_consume_batches_settles_each_message_as_it_completes(self):
+        self.deliver((1, False, b"first"), (2, False, b"second"), (3, True, b"third"))
+        futures = [Future() for _ in range(3)]
+        external_callback = Mock(
+            side_effect=[futures[:2], futures[2:]],
+        )
+
+        self.service.consume_batches(external_callback, max_batch=2, window_ms=100)
+
+        self.channel.basic_qos.assert_called_once_with(prefetch_count=4)
+        self.assertEqual(
+            [c.args[0] for c in external_callback.call_args_list],
+            [[b"first", b"second"], [b"third"]],
+        )
+        self.assertEqual(
+            [c.args[0] for c in self.connection.call_later.call_args_list], [0.1, 0.1]
+        )
+        self.channel.basic_ack.assert_not_called()
+
+        futures[1].set_result(None)
+        self.assertEqual(
+            [c.kwargs["delivery_tag"] for c in self.channel.basic_ack.call_args_list],
+            [2],
+        )
+
+        futures[2].set_exception(RuntimeError("boom"))
+        futures[0].set_result(None)
+        self.assertEqual(
+            [c.kwargs["delivery_tag"] for c in self.channel.basic_ack.call_args_list],
+            [2, 1],
+        )
+        self.channel.basic_nack.assert_called_once_with(delivery_tag=3, requeue=False)
+
+    def test_consume_batches_fails_whole_batch_when_callback_raises(self):
+        self.deliver((1, False, b"first"), (2, False, b"second"))
+
+        self.service.consume_batches(
+            Mock(side_effect=RuntimeError("boom")), max_batch=2
+        )
+
+        self.channel.basic_ack.assert_not_called()
+        self.assertEqual(self.channel.basic_nack.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
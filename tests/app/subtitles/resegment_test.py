@@ -0,0 +1,116 @@
+import unittest
+
+from app.subtitles.resegment import CaptionLimits, ResegmentingSink, resegment
+from app.subtitles.sinks import SegmentSink, broadcast
+from app.transcriber.segments import Segment, Word
+
+
+class RecordingSink(SegmentSink):
+    def __init__(self):
+        self.segments = []
+        self.closed = False
+
+    def write(self, segment):
+        self.segments.append(segment)
+
+    def close(self):
+        self.closed = True
+
+
+def words(text, start=0.0, step=0.4):
+    return [
+        Word(start + index * step, start + index * step + step * 0.8, f" {token}")
+        for index, token in enumerate(text.split())
+    ]
+
+
+class TestResegment(unittest.TestCase):
+    def test_long_segment_split_within_limits(self):
+        limits = CaptionLimits(max_line_chars=20, max_lines=2, max_duration=4.0)
+        text = " ".join(f"word{index}" for index in range(40))
+
+        cues = list(resegment(words(text), limits))
+
+        self.assertGreater(len(cues), 1)
+        self.assertEqual(
+            sum(len(cue.words) for cue in cues), 40, "every word is kept once"
+        )
+        for cue in cues:
+            lines = cue.text.split("\n")
+            self.assertLessEqual(len(lines), 2)
+            self.assertTrue(all(len(line) <= 20 for line in lines))
+            self.assertLessEqual(cue.end - cue.start, 4.0)
+        for current, following in zip(cues, cues[1:]):
+            self.assertLessEqual(current.end, following.start)
+
+    def test_breaks_after_sentence_and_on_pauses(self):
+        limits = CaptionLimits(min_duration=0.5, max_pause=1.0)
+        timed = words("Hello there. How are") + words("you", start=5.0)
+
+        cues = list(resegment(timed, limits))
+
+        self.assertEqual([cue.text for cue in cues], ["Hello there.", "How are", "you"])
+
+    def test_short_cue_held_for_reading_speed(self):
+        limits = CaptionLimits(min_duration=1.0, max_chars_per_second=10)
+        timed = [
+            Word(0.0, 0.3, " Supercalifragilistic!"),
+            Word(10.0, 10.2, " Yes"),
+        ]
+
+        first, second = resegment(timed, limits)
+
+        self.assertAlmostEqual(first.end, 2.1)
+        self.assertAlmostEqual(second.end, 11.0)
+
+    def test_hold_stops_before_next_cue(self):
+        limits = CaptionLimits(min_duration=2.0, max_pause=0.5, min_gap=0.1)
+        timed = [Word(0.0, 0.2, " One"), Word(0.8, 1.0, " Two")]
+
+        first, _ = resegment(timed, limits)
+
+        self.assertAlmostEqual(first.end, 0.7)
+
+    def test_words_without_spaces_joined(self):
+        timed = [Word(0.0, 0.2, "你"), Word(0.2, 0.4, "好")]
+
+        (cue,) = resegment(timed, CaptionLimits())
+
+        self.assertEqual(cue.text, "你好")
+
+
+class TestResegmentingSink(unittest.TestCase):
+    def test_streamed_cues_match_whole_resegmentation(self):
+        limits = CaptionLimits(max_line_chars=16, max_duration=3.0)
+        first = words("the quick brown fox jumps over the lazy dog.")
+        second = words("A second sentence follows right after it", start=4.0)
+        segments = [
+            Segment(first[0].start, first[-1].end, "", first),
+            Segment(second[0].start, second[-1].end, "", second),
+        ]
+        recording = RecordingSink()
+
+        broadcast(segments, [ResegmentingSink(recording, limits)])
+
+        self.assertTrue(recording.closed)
+        self.assertEqual(
+            [(cue.start, cue.end, cue.text) for cue in recording.segments],
+            [
+                (cue.start, cue.end, cue.text)
+                for cue in resegment(first + second, limits)
+            ],
+        )
+
+    def test_segments_without_words_pass_through(self):
+        recording = RecordingSink()
+        plain = Segment(5.0, 6.0, "no words")
+
+        with ResegmentingSink(recording, CaptionLimits()) as sink:
+            sink.write(Segment(0.0, 1.0, "", words("Hi.")))
+            sink.write(plain)
+
+        self.assertEqual([cue.text for cue in recording.segments], ["Hi.", "no words"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock
+
+from app.subtitles.sinks import SegmentSink, broadcast
+from app.subtitles.srt import SrtSink
+from app.subtitles.words import WordJsonSink
+from app.transcriber.segments import Segment, Word
+
+
+class RecordingSink(SegmentSink):
+    def __init__(self):
+        self.segments = []
+        self.closed = False
+
+    def write(self, segment):
+        self.segments.append(segment)
+
+    def close(self):
+        self.closed = True
+
+
+class TestBroadcast(unittest.TestCase):
+    def test_segments_consumed_once_by_every_sink(self):
+        produced = Mock()
+
+        def generate():
+            for index in range(3):
+                produced(index)
+                yield Segment(float(index), index + 1.0, f"cue {index}")
+
+        first, second = RecordingSink(), RecordingSink()
+
+        count = broadcast(generate(), [first, second])
+
+        self.assertEqual(count, 3)
+        self.assertEqual(produced.call_count, 3)
+        self.assertEqual(first.segments, second.segments)
+        self.assertTrue(first.closed and second.closed)
+
+    def test_sinks_closed_when_source_fails(self):
+        def generate():
+            yield Segment(0.0, 1.0, "cue")
+            raise RuntimeError("transcription failed")
+
+        sink = RecordingSink()
+
+        with self.assertRaises(RuntimeError):
+            broadcast(generate(), [sink])
+
+        self.assertEqual(len(sink.segments), 1)
+        self.assertTrue(sink.closed)
+
+
+class TestSrtSink(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "nested", "sub.srt")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_cues_flushed_incrementally(self):
+        sink = SrtSink(self.path)
+
+        sink.write(Segment(0.0, 1.5, " Hello "))
+        with open(self.path, encoding="utf-8") as f:
+            self.assertEqual(f.read(), "1\n00:00:00,000 --> 00:00:01,500\nHello\n\n")
+
+        sink.write(Segment(61.25, 62.0, "world"))
+        sink.close()
+
+        with open(self.path, encoding="utf-8") as f:
+            self.assertEqual(
+                f.read(),
+                "1\n00:00:00,000 --> 00:00:01,500\nHello\n\n"
+                "2\n00:01:01,250 --> 00:01:02,000\nworld\n\n",
+            )
+
+
+class TestWordJsonSink(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "nested", "sub.words.json")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_words_written_per_segment(self):
+        with WordJsonSink(self.path, "en") as sink:
+            sink.write(
+                Segment(0.0, 1.0, " Hello world", [Word(0.0, 0.4, " Hello", 0.91234)])
+            )
+            sink.write(Segment(1.0, 2.0, "plain"))
+
+        with open(self.path, encoding="utf-8") as f:
+            document = json.load(f)
+
+        self.assertEqual(document["language"], "en")
+        self.assertEqual(
+            document["segments"],
+            [
+                {
+                    "start": 0.0,
+                    "end": 1.0,
+                    "text": "Hello world",
+                    "words": [
+                        {
+                            "start": 0.0,
+                            "end": 0.4,
+                            "word": " Hello",
+                            "probability": 0.9123,
+                        }
+                    ],
+                },
+                {"start": 1.0, "end": 2.0, "text": "plain", "words": []},
+            ],
+        )
+
+    def test_empty_transcription_is_valid_json(self):
+        WordJsonSink(self.path, "pl").close()
+
+        with open(self.path, encoding="utf-8") as f:
+            self.assertEqual(json.load(f), {"language": "pl", "segments": []})
+
+
+if __name__ == "__main__":
+    unittest.main()
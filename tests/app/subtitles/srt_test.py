@@ -0,0 +1,94 @@
+import os
+import tempfile
+import unittest
+
+from app.subtitles.srt import Cue, SrtSink, cue_times, iter_cues, read_cues
+from app.synthesizer.ssml import SSMLConverter
+from app.transcriber.segments import Segment
+
+DOCUMENT = (
+    "\ufeff1\r\n"
+    "00:00:01,000 --> 00:00:02,500\r\n"
+    "Hello\r\n"
+    "there\r\n"
+    "\r\n"
+    "3\n"
+    "00:00:03,000 --> 00:00:04,000 X1:10 X2:20\n"
+    "No blank line after\n"
+    "2\n"
+    "01:02:03,040 --> 01:02:04,000\n"
+    "Out of order\n"
+    "\n"
+    "garbage between cues\n"
+    "\n"
+    "00:01:00,000 --> 00:01:01,000\n"
+    "No index\n"
+)
+
+
+class TestSrtParser(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, content: str) -> str:
+        path = os.path.join(self.directory.name, "sub.srt")
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            f.write(content)
+        return path
+
+    def test_malformed_cues(self):
+        self.assertEqual(
+            list(iter_cues(DOCUMENT.encode("utf-8"))),
+            [
+                Cue(1, 1000, 2500, "Hello\nthere"),
+                Cue(3, 3000, 4000, "No blank line after"),
+                Cue(2, 3723040, 3724000, "Out of order"),
+                Cue(None, 60000, 61000, "No index"),
+            ],
+        )
+
+    def test_read_cues_sorted(self):
+        cues = read_cues(self.write(DOCUMENT), sort=True)
+
+        starts, ends = cue_times(cues)
+        self.assertEqual(starts.tolist(), [1000, 3000, 60000, 3723040])
+        self.assertEqual(ends.tolist(), [2500, 4000, 61000, 3724000])
+
+    def test_empty_file(self):
+        self.assertEqual(read_cues(self.write("")), [])
+
+    def test_round_trip_with_sink(self):
+        path = os.path.join(self.directory.name, "sink.srt")
+        with SrtSink(path) as sink:
+            sink.write(Segment(0.5, 1.25, " First"))
+            sink.write(Segment(3661.0, 3662.001, " Second"))
+
+        self.assertEqual(
+            read_cues(path),
+            [Cue(1, 500, 1250, "First"), Cue(2, 3661000, 3662001, "Second")],
+        )
+
+    def test_ssml_converter_parses_milliseconds(self):
+        converter = SSMLConverter(srt_file=self.write(DOCUMENT), output_file=None)
+
+        subtitles = converter.parse_srt_file()
+
+        self.assertEqual(list(subtitles), ["1", "2", "3", "4"])
+        self.assertEqual(
+            subtitles["1"],
+            {
+                "start_ms": 1000,
+                "end_ms": 2500,
+                "duration_ms": 1500,
+                "text": "Hello there",
+                "break_until_next": 500,
+            },
+        )
+        self.assertEqual(subtitles["4"]["break_until_next"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
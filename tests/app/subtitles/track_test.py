@@ -0,0 +1,128 @@
+import os
+import tempfile
+import unittest
+
+from app.subtitles.srt import read_cues
+from app.subtitles.track import SSMLValues, SubtitleTrack
+from app.synthesizer.ssml import SSMLConverter
+from app.transcriber.segments import Segment, Word
+
+
+def make_track():
+    return SubtitleTrack.from_segments(
+        [
+            Segment(0.0, 0.5, " Hi", [Word(0.0, 0.5, " Hi")]),
+            Segment(0.6, 1.0, " there", [Word(0.6, 1.0, " there")]),
+            Segment(
+                2.0,
+                8.0,
+                " one two three",
+                [
+                    Word(2.0, 3.0, " one"),
+                    Word(3.0, 4.5, " two"),
+                    Word(6.0, 7.5, " three"),
+                ],
+            ),
+        ]
+    )
+
+
+class TestSubtitleTrack(unittest.TestCase):
+    def test_columns(self):
+        track = make_track()
+
+        self.assertEqual(len(track), 3)
+        self.assertEqual(track.texts, ["Hi", "there", "one two three"])
+        self.assertEqual(track.durations.tolist(), [500, 400, 6000])
+        self.assertEqual(track.gaps.tolist(), [100, 1000, 0])
+        self.assertEqual(track.word_offsets.tolist(), [0, 1, 2, 5])
+
+    def test_shift_and_scale_move_words(self):
+        track = make_track().shift(1000).scale(2)
+
+        self.assertEqual(track.starts.tolist(), [2000, 3200, 6000])
+        self.assertEqual(track.words(2)[0], Word(6.0, 8.0, " one"))
+        self.assertEqual(make_track().starts.tolist(), [0, 600, 2000])
+
+    def test_with_texts_keeps_timings(self):
+        track = make_track().with_texts(["Cześć", "tam", "raz dwa trzy"])
+
+        self.assertEqual(track.texts, ["Cześć", "tam", "raz dwa trzy"])
+        self.assertEqual(track.starts.tolist(), [0, 600, 2000])
+        self.assertFalse(track.has_words)
+        with self.assertRaises(ValueError):
+            make_track().with_texts(["Cześć"])
+
+    def test_merge_short(self):
+        track = make_track().merge_short(min_duration_ms=800, max_gap_ms=500)
+
+        self.assertEqual(track.texts, ["Hi there", "one two three"])
+        self.assertEqual(track.starts.tolist(), [0, 2000])
+        self.assertEqual(track.ends.tolist(), [1000, 8000])
+        self.assertEqual([w.word for w in track.words(0)], [" Hi", " there"])
+
+    def test_split_long_by_words(self):
+        track = make_track().split_long(3000)
+
+        self.assertEqual(track.texts, ["Hi", "there", "one two", "three"])
+        self.assertEqual(track.starts.tolist(), [0, 600, 2000, 5000])
+        self.assertEqual(track.ends.tolist(), [500, 1000, 5000, 8000])
+        self.assertEqual([w.word for w in track.words(3)], [" three"])
+
+    def test_split_long_without_words(self):
+        track = SubtitleTrack([0], [9000], ["a b c d e f"]).split_long(3000)
+
+        self.assertEqual(track.texts, ["a b", "c d", "e f"])
+        self.assertEqual(track.ends.tolist(), [3000, 6000, 9000])
+
+    def test_serialization(self):
+        track = SubtitleTrack([1500, 3661000], [2000, 3662250], ["First", "Second"])
+
+        self.assertEqual(
+            track.to_srt(),
+            "1\n00:00:01,500 --> 00:00:02,000\nFirst\n\n"
+            "2\n01:01:01,000 --> 01:01:02,250\nSecond\n\n",
+        )
+        self.assertTrue(
+            track.to_vtt().startswith(
+                "WEBVTT\n\n00:00:01.500 --> 00:00:02.000\nFirst\n\n"
+            )
+        )
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "track.srt")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(track.to_srt())
+
+            self.assertEqual(SubtitleTrack.from_srt(path).cues(), read_cues(path))
+
+    def test_split_long_rejects_non_positive_duration(self):
+        with self.assertRaises(ValueError):
+            make_track().split_long(0)
+
+    def test_ssml_values_are_columns(self):
+        track = SubtitleTrack([0, 1500], [1000, 2000], ["Hi\nthere", "Bye"])
+
+        self.assertEqual(
+            track.ssml_values(),
+            SSMLValues(
+                starts_ms=[0, 1500],
+                ends_ms=[1000, 2000],
+                durations_ms=[1000, 500],
+                texts=["Hi there", "Bye"],
+                breaks_ms=[500, 0],
+            ),
+        )
+
+    def test_ssml_matches_converter(self):
+        converter = SSMLConverter(srt_file=None, output_file=None)
+
+        ssml = make_track().to_ssml(converter)
+
+        self.assertTrue(ssml.startswith(converter.ssml_header()))
+        self.assertIn('<break time="100ms"/>', ssml)
+        self.assertTrue(ssml.endswith(converter.ssml_footer()))
+
+
+if __name__ == "__main__":
+    unittest.main()
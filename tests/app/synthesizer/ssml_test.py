@@ -0,0 +1,134 @@
+import os
+import tempfile
+import unittest
+
+from app.synthesizer.ssml import SSMLConverter
+from app.transcriber.segments import Segment
+
+
+class TestSSMLSink(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.output_file = os.path.join(self.directory.name, "out.txt")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def read_output(self):
+        with open(self.output_file, encoding="utf-8-sig") as f:
+            return f.read().splitlines()
+
+    def test_segments_streamed_with_breaks(self):
+        converter = SSMLConverter(
+            srt_file=None,
+            output_file=self.output_file,
+            voice_name="en-US-DavisNeural",
+        )
+
+        with converter.sink() as sink:
+            sink.write(Segment(0.0, 1.5, " Hello & <world>"))
+            self.assertEqual(len(self.read_output()), 3)
+
+            sink.write(Segment(2.0, 3.25, " Bye"))
+            self.assertIn("&lt;world&gt;", self.read_output()[3])
+
+        lines = self.read_output()
+        self.assertEqual(lines[2], '<voice name="en-US-DavisNeural">')
+        self.assertEqual(
+            lines[3],
+            '\t<prosody duration="1500ms">Hello &amp; &lt;world&gt;</prosody><break time="500ms"/>',
+        )
+        self.assertEqual(lines[4], '\t<prosody duration="1250ms">Bye</prosody>')
+        self.assertEqual(lines[5:], ["</voice>", "</speak>"])
+
+
+def cue(start_ms, end_ms, text, break_until_next=0):
+    return {
+        "start_ms": start_ms,
+        "end_ms": end_ms,
+        "duration_ms": end_ms - start_ms,
+        "text": text,
+        "break_until_next": break_until_next,
+    }
+
+
+class TestSSMLDialects(unittest.TestCase):
+    def render(self, **options):
+        converter = SSMLConverter(srt_file=None, output_file=None, **options)
+        return converter.render([cue(0, 1000, "Hi", 250), cue(1250, 2000, "Bye")])
+
+    def test_generic_wraps_document_in_voice(self):
+        lines = self.render(voice_name="en-US-DavisNeural").splitlines()
+
+        self.assertEqual(lines[2], '<voice name="en-US-DavisNeural">')
+        self.assertEqual(
+            lines[3], '\t<prosody duration="1000ms">Hi</prosody><break time="250ms"/>'
+        )
+        self.assertEqual(lines[-2:], ["</voice>", "</speak>"])
+
+    def test_azure_wraps_every_cue_in_voice(self):
+        lines = self.render(
+            voice_name="en-US-DavisNeural",
+            service_mode="azure",
+            use_inner_duration_tag=True,
+        ).splitlines()
+
+        self.assertEqual(
+            lines[2],
+            '\t<voice name="en-US-DavisNeural"><mstts:audioduration value="1000ms"/>'
+            'Hi<break time="250ms"/></voice>',
+        )
+        self.assertEqual(lines[-1], "</speak>")
+
+    def test_amazon_uses_max_duration(self):
+        self.assertEqual(
+            self.render(
+                voice_name="Joanna", service_mode="amazon-standard-voice"
+            ).splitlines(),
+            [
+                "<speak>",
+                '\t<prosody amazon:max-duration="1000ms">Hi</prosody><break time="250ms"/>',
+                '\t<prosody amazon:max-duration="750ms">Bye</prosody>',
+                "</speak>",
+            ],
+        )
+
+    def test_unknown_service_mode(self):
+        with self.assertRaises(ValueError):
+            self.render(service_mode="unknown")
+
+
+class TestRenderChunks(unittest.TestCase):
+    def test_chunks_are_bounded_and_aligned_to_cues(self):
+        converter = SSMLConverter(
+            srt_file=None, output_file=None, voice_name="en-US-DavisNeural"
+        )
+        values = [cue(i * 1000, i * 1000 + 800, f"Cue {i}", 200) for i in range(10)]
+
+        chunks = converter.render_chunks(values, max_chars=500)
+
+        self.assertGreater(len(chunks), 1)
+        for chunk in chunks:
+            self.assertLessEqual(len(chunk.ssml), 500)
+            self.assertTrue(chunk.ssml.startswith(converter.ssml_header()))
+            self.assertTrue(chunk.ssml.endswith(converter.ssml_footer()))
+
+        self.assertEqual(chunks[0].start_ms, 0)
+        self.assertEqual(chunks[-1].end_ms, 10000)
+        self.assertEqual(
+            "".join(chunk.ssml.count("<prosody") * "x" for chunk in chunks), "x" * 10
+        )
+        self.assertEqual(chunks[1].start_ms, chunks[0].end_ms)
+
+    def test_oversized_cue_gets_its_own_chunk(self):
+        converter = SSMLConverter(srt_file=None, output_file=None)
+
+        chunks = converter.render_chunks(
+            [cue(0, 1000, "x" * 500), cue(1000, 2000, "y")], max_chars=200
+        )
+
+        self.assertEqual([chunk.start_ms for chunk in chunks], [0, 1000])
+
+
+if __name__ == "__main__":
+    unittest.main()
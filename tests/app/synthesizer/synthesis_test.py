@@ -0,0 +1,98 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from app.subtitles.track import SSMLValues
+from app.synthesizer.engines import FakeSpeechEngine
+from app.synthesizer.synthesis import (
+    SpeechSynthesizer,
+    assemble,
+    get_engine,
+    resample,
+    time_stretch,
+)
+
+
+def dominant_frequency(samples: np.ndarray, sample_rate: int) -> float:
+    spectrum = np.abs(np.fft.rfft(samples))
+    return np.argmax(spectrum) * sample_rate / len(samples)
+
+
+class TestTimeStretch(unittest.TestCase):
+    def setUp(self):
+        t = np.arange(16000) / 16000
+        self.tone = (0.5 * np.sin(2 * np.pi * 200 * t)).astype(np.float32)
+
+    def test_exact_length_and_pitch(self):
+        for length in (12000, 24000, 16001):
+            stretched = time_stretch(self.tone, length)
+
+            self.assertEqual(len(stretched), length)
+            self.assertEqual(stretched.dtype, np.float32)
+            self.assertAlmostEqual(
+                dominant_frequency(stretched[2048:-2048], 16000), 200, delta=15
+            )
+
+    def test_short_clips_are_resampled(self):
+        self.assertEqual(len(time_stretch(self.tone[:100], 150)), 150)
+        self.assertEqual(len(time_stretch(np.zeros(0, np.float32), 10)), 10)
+
+    def test_resample(self):
+        self.assertEqual(len(resample(self.tone, 16000, 24000)), 24000)
+
+
+class TestAssemble(unittest.TestCase):
+    def test_sample_accurate_placement(self):
+        clips = [np.ones(10, np.float32) * 0.25, np.ones(10, np.float32) * 0.5]
+
+        track = assemble(clips, [1, 3], sample_rate=4000, length=30)
+
+        self.assertEqual(len(track), 30)
+        self.assertEqual(track[:4].tolist(), [0.0] * 4)
+        self.assertEqual(track[4], 0.25)
+        self.assertEqual(track[11], 0.25)
+        self.assertEqual(track[12], 0.75)
+        self.assertEqual(track[14], 0.5)
+        self.assertEqual(track[22:].tolist(), [0.0] * 8)
+
+
+class TestSpeechSynthesizer(unittest.TestCase):
+    def test_fake_engine_is_deterministic(self):
+        engine = get_engine("fake", sample_rate=8000)
+
+        self.assertIsInstance(engine, FakeSpeechEngine)
+        np.testing.assert_array_equal(
+            engine.synthesize("Hello"), engine.synthesize("Hello")
+        )
+
+    def test_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            get_engine("unknown")
+
+    def test_cues_fill_their_durations(self):
+        values = SSMLValues(
+            starts_ms=[0, 700, 1000],
+            ends_ms=[500, 900, 1250],
+            durations_ms=[500, 200, 250],
+            texts=["Hello", " ", "World"],
+            breaks_ms=[200, 100, 0],
+        )
+
+        with ThreadPoolExecutor(2) as executor:
+            synthesizer = SpeechSynthesizer(
+                "fake",
+                engine_options={"sample_rate": 16000},
+                sample_rate=8000,
+                executor=executor,
+            )
+            track = synthesizer.synthesize(values)
+
+        self.assertEqual(len(track), 10000)
+        self.assertGreater(np.abs(track[:4000]).max(), 0.1)
+        np.testing.assert_array_equal(track[4000:8000], 0)
+        self.assertGreater(np.abs(track[8000:]).max(), 0.1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import tempfile
+import unittest
+from unittest.mock import Mock
+
+import numpy as np
+
+from app.transcriber.batch import BatchTranscriber
+from app.transcriber.cache import TranscriptionCache
+from app.transcriber.model_pool import WhisperModelPool
+
+
+def fake_transcribe(audio, **kwargs):
+    segment = Mock(start=0.0, end=1.0, text=f" {len(audio)} samples", words=[])
+    return iter([segment]), Mock(language=kwargs["language"] or "en")
+
+
+class TestBatchTranscriber(unittest.TestCase):
+    def setUp(self):
+        self.model = Mock()
+        self.model.transcribe.side_effect = fake_transcribe
+        self.loader = Mock(return_value=self.model)
+        self.pool = WhisperModelPool(loader=self.loader)
+
+    def test_batch_shares_one_model(self):
+        transcriber = BatchTranscriber(num_workers=3, pool=self.pool)
+        self.addCleanup(transcriber.close)
+        audios = [np.zeros(n, dtype=np.float32) for n in (100, 200, 300)]
+
+        results = transcriber.transcribe(audios, language="pl")
+
+        self.assertEqual(
+            [(language, [s.text for s in segments]) for language, segments in results],
+            [
+                ("pl", [" 100 samples"]),
+                ("pl", [" 200 samples"]),
+                ("pl", [" 300 samples"]),
+            ],
+        )
+        self.loader.assert_called_once()
+        self.assertEqual(self.loader.call_args.kwargs["num_workers"], 3)
+        self.assertEqual(self.model.transcribe.call_count, 3)
+
+    def test_cached_input_skips_model(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        transcriber = BatchTranscriber(
+            num_workers=2, cache=TranscriptionCache(directory.name), pool=self.pool
+        )
+        self.addCleanup(transcriber.close)
+        audio = np.ones(100, dtype=np.float32)
+
+        first = transcriber.submit(audio).result()
+        second = transcriber.submit(audio.copy()).result()
+
+        self.assertEqual(first, second)
+        self.model.transcribe.assert_called_once()
+
+    def test_failed_input_raises(self):
+        self.model.transcribe.side_effect = RuntimeError("boom")
+        transcriber = BatchTranscriber(num_workers=2, pool=self.pool)
+        self.addCleanup(transcriber.close)
+
+        with self.assertRaises(RuntimeError):
+            transcriber.transcribe([np.zeros(10, dtype=np.float32)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from app.transcriber.cache import TranscriptionCache, hash_audio
+from app.transcriber.segments import Segment, Word
+
+
+class TestTranscriptionCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = TranscriptionCache(self.directory.name)
+        self.audio = np.linspace(-1, 1, 1600, dtype=np.float32)
+        self.segments = [
+            Segment(0.0, 1.5, " Hello", [Word(0.1, 0.5, " Hello", 0.9)]),
+            Segment(1.5, 3.0, " world", []),
+        ]
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_key_depends_on_audio_and_parameters(self):
+        key = self.cache.key(self.audio, "large-v3", "int8", "pl", 5)
+
+        self.assertEqual(
+            key, self.cache.key(self.audio.copy(), "large-v3", "int8", "pl", 5)
+        )
+        self.assertNotEqual(key, self.cache.key(self.audio, "small", "int8", "pl", 5))
+        self.assertNotEqual(
+            key, self.cache.key(self.audio, "large-v3", "int8", "en", 5)
+        )
+        self.assertNotEqual(
+            key, self.cache.key(self.audio, "large-v3", "int8", "pl", 1)
+        )
+        self.assertNotEqual(
+            key, self.cache.key(self.audio[1:], "large-v3", "int8", "pl", 5)
+        )
+
+    def test_hash_audio_file(self):
+        path = os.path.join(self.directory.name, "audio.wav")
+        with open(path, "wb") as f:
+            f.write(b"RIFF")
+
+        self.assertEqual(hash_audio(path), hash_audio(path))
+
+    def test_round_trip(self):
+        self.assertIsNone(self.cache.get("missing"))
+
+        self.cache.put("key", "pl", self.segments)
+
+        self.assertEqual(self.cache.get("key"), ("pl", self.segments))
+        self.assertEqual(self.cache.stats, {"hits": 1, "misses": 1})
+
+    def test_record_stores_after_consumption(self):
+        recorded = self.cache.record("key", "pl", iter(self.segments))
+
+        self.assertEqual(next(recorded), self.segments[0])
+        self.assertIsNone(self.cache.get("key"))
+
+        self.assertEqual(list(recorded), self.segments[1:])
+        self.assertEqual(self.cache.get("key"), ("pl", self.segments))
+
+    def test_least_recently_used_entries_evicted(self):
+        self.cache.max_size_mb = 1
+        text = "x" * 400_000
+        for index, key in enumerate(["a", "b"]):
+            self.cache.put(key, "pl", [Segment(0.0, 1.0, text)])
+            path = os.path.join(self.directory.name, f"{key}.json")
+            os.utime(path, (index, index))
+
+        self.assertIsNotNone(self.cache.get("a"))
+        self.cache.put("c", "pl", [Segment(0.0, 1.0, text)])
+
+        self.assertIsNotNone(self.cache.get("a"))
+        self.assertIsNone(self.cache.get("b"))
+        self.assertIsNotNone(self.cache.get("c"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+import numpy as np
+
+from app.transcriber.chunking import (
+    Chunk,
+    ChunkedTranscriber,
+    merge_chunk_segments,
+    plan_chunks,
+)
+from app.transcriber.segments import Segment
+
+
+class TestPlanChunks(unittest.TestCase):
+    def test_cuts_in_middle_of_silence(self):
+        speech = [
+            {"start": 0, "end": 90},
+            {"start": 110, "end": 150},
+            {"start": 170, "end": 260},
+            {"start": 280, "end": 300},
+        ]
+
+        chunks = plan_chunks(speech, total_samples=320, chunk_samples=100)
+
+        self.assertEqual(
+            [(chunk.start, chunk.end) for chunk in chunks],
+            [(0, 160), (160, 270), (270, 320)],
+        )
+
+    def test_long_speech_cut_at_fixed_intervals_with_overlap(self):
+        chunks = plan_chunks(
+            [], total_samples=500, chunk_samples=100, overlap_samples=10
+        )
+
+        self.assertEqual(
+            chunks,
+            [
+                Chunk(0, 167, 0, 177),
+                Chunk(167, 334, 157, 344),
+                Chunk(334, 500, 324, 500),
+            ],
+        )
+
+    def test_empty_audio_has_no_chunks(self):
+        self.assertEqual(plan_chunks([], total_samples=0, chunk_samples=16000), [])
+
+    def test_short_audio_is_single_chunk(self):
+        chunks = plan_chunks([{"start": 0, "end": 50}], 60, chunk_samples=100)
+
+        self.assertEqual(chunks, [Chunk(0, 60, 0, 60)])
+
+
+class TestMergeChunkSegments(unittest.TestCase):
+    def test_overlapping_segments_kept_once(self):
+        chunks = [Chunk(0, 16000, 0, 24000), Chunk(16000, 32000, 8000, 32000)]
+        results = [
+            [Segment(0.0, 0.8, "a"), Segment(0.9, 1.3, "b")],
+            [Segment(0.9, 1.3, "b"), Segment(1.2, 1.9, "c")],
+        ]
+
+        merged = merge_chunk_segments(chunks, results)
+
+        self.assertEqual([segment.text for segment in merged], ["a", "b", "c"])
+
+
+class TestChunkedTranscriber(unittest.TestCase):
+    @patch("app.transcriber.chunking.detect_speech")
+    @patch("app.transcriber.chunking.model_pool")
+    def test_transcribe_offsets_segments(self, mock_pool, mock_detect_speech):
+        mock_detect_speech.return_value = [
+            {"start": 0, "end": 16000},
+            {"start": 32000, "end": 48000},
+        ]
+
+        def fake_transcribe(audio, **options):
+            duration = len(audio) / 16000
+            words = [SimpleNamespace(start=0.1, end=0.4, word=" hi", probability=0.9)]
+            segment = SimpleNamespace(
+                start=0.0, end=duration, text=f" {duration:.0f}s", words=words
+            )
+            return iter([segment]), SimpleNamespace(language="pl")
+
+        model = Mock()
+        model.transcribe.side_effect = fake_transcribe
+        mock_pool.get.return_value = model
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            transcriber = ChunkedTranscriber(
+                workers=2, chunk_length_s=1.0, overlap_s=0.0, executor=executor
+            )
+            language, segments = transcriber.transcribe(
+                np.zeros(48000, dtype=np.float32), "small", beam_size=5
+            )
+
+        self.assertEqual(language, "pl")
+        self.assertEqual([(s.start, s.end) for s in segments], [(0.0, 1.5), (1.5, 3.0)])
+        self.assertAlmostEqual(segments[1].words[0].start, 1.6)
+        self.assertEqual(model.transcribe.call_args.kwargs, {"beam_size": 5})
+
+    @patch("app.transcriber.chunking.model_pool")
+    def test_empty_audio_has_nothing_to_transcribe(self, mock_pool):
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            transcriber = ChunkedTranscriber(workers=2, executor=executor)
+            result = transcriber.transcribe(np.zeros(0, dtype=np.float32), "small")
+
+        self.assertEqual(result, (None, []))
+        mock_pool.get.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
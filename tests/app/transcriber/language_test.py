@@ -0,0 +1,92 @@
+import unittest
+from unittest.mock import Mock, patch
+
+import numpy as np
+from faster_whisper.feature_extractor import FeatureExtractor
+from faster_whisper.vad import get_speech_timestamps
+
+from app.ffmpeg_utils import SAMPLE_RATE
+from app.transcriber.language import LanguageDetector
+from app.transcriber.model_pool import WhisperModelPool
+
+
+class TestLanguageDetector(unittest.TestCase):
+    def setUp(self):
+        self.model = Mock(spec=["feature_extractor", "encode", "model"])
+        self.model.feature_extractor = FeatureExtractor()
+        self.model.model.detect_language.return_value = [
+            [("<|en|>", 0.93), ("<|pl|>", 0.05)]
+        ]
+        self.loader = Mock(return_value=self.model)
+        self.detector = LanguageDetector(
+            threshold=0.6, pool=WhisperModelPool(loader=self.loader)
+        )
+        self.probe = np.zeros(45 * SAMPLE_RATE, dtype=np.float32)
+
+        # Silero finds 40 seconds of speech in the probe.
+        self.vad = Mock(return_value=[{"start": SAMPLE_RATE, "end": 41 * SAMPLE_RATE}])
+        patcher = patch("app.transcriber.language.get_speech_timestamps", self.vad)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_confident_guess(self):
+        detected = self.detector.detect(self.probe, fallback="pl")
+
+        self.assertEqual(detected.language, "en")
+        self.assertAlmostEqual(detected.probability, 0.93)
+        self.assertTrue(detected.detected)
+        self.assertEqual(self.loader.call_args.args, ("tiny",))
+        self.model.encode.assert_called_once()
+        self.assertEqual(self.model.encode.call_args.args[0].shape, (80, 3000))
+
+    def test_model_loaded_once(self):
+        self.detector.detect(self.probe, fallback="pl")
+        self.detector.detect(self.probe, fallback="pl")
+
+        self.loader.assert_called_once()
+
+    def test_unconfident_guess_falls_back(self):
+        self.model.model.detect_language.side_effect = [
+            [[("<|de|>", 0.4)]],
+            [[("<|de|>", 0.3)]],
+        ]
+
+        detected = self.detector.detect(self.probe, fallback="pl")
+
+        self.assertEqual(detected.language, "pl")
+        self.assertAlmostEqual(detected.probability, 0.4)
+        self.assertFalse(detected.detected)
+        # 40 seconds of speech fill two windows, the second one padded.
+        self.assertEqual(
+            [c.args[0].shape for c in self.model.encode.call_args_list],
+            [(80, 3000), (80, 3000)],
+        )
+
+    def test_short_probe_falls_back_without_model(self):
+        detected = self.detector.detect(np.zeros(100, dtype=np.float32), "pl")
+
+        self.assertEqual(detected.language, "pl")
+        self.loader.assert_not_called()
+
+    def test_probe_without_speech_falls_back(self):
+        rng = np.random.default_rng(0)
+        hiss = (rng.standard_normal(10 * SAMPLE_RATE) * 1e-3).astype(np.float32)
+
+        with patch.object(self.vad, "side_effect", get_speech_timestamps):
+            for probe in (self.probe, hiss):
+                detected = self.detector.detect(probe, fallback="pl")
+
+                self.assertEqual(detected.language, "pl")
+                self.assertFalse(detected.detected)
+
+        self.loader.assert_not_called()
+
+    def test_too_little_speech_falls_back(self):
+        self.vad.return_value = [{"start": 0, "end": SAMPLE_RATE // 2}]
+
+        self.assertEqual(self.detector.detect(self.probe, "pl").language, "pl")
+        self.loader.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
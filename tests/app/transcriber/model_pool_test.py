@@ -0,0 +1,70 @@
+import unittest
+from unittest.mock import Mock
+
+from app.transcriber.model_pool import WhisperModelPool, estimate_model_memory_mb
+
+
+class TestWhisperModelPool(unittest.TestCase):
+    def setUp(self):
+        self.loader = Mock(side_effect=lambda *args, **kwargs: Mock())
+
+    def test_model_loaded_once(self):
+        pool = WhisperModelPool(loader=self.loader)
+
+        first = pool.get("small")
+        second = pool.get("small")
+
+        self.assertIs(first, second)
+        self.loader.assert_called_once_with(
+            "small",
+            device="cpu",
+            compute_type="int8",
+            cpu_threads=0,
+            num_workers=1,
+        )
+        self.assertEqual(pool.loads, 1)
+        self.assertEqual(pool.hits, 1)
+
+    def test_different_parameters_load_separately(self):
+        pool = WhisperModelPool(loader=self.loader)
+
+        first = pool.get("small", cpu_threads=4)
+        second = pool.get("small", cpu_threads=8)
+
+        self.assertIsNot(first, second)
+        self.assertEqual(pool.loads, 2)
+
+    def test_least_recently_used_model_evicted(self):
+        budget = estimate_model_memory_mb("small", "int8") * 2
+        pool = WhisperModelPool(memory_budget_mb=budget, loader=self.loader)
+
+        pool.get("small", cpu_threads=1)
+        pool.get("small", cpu_threads=2)
+        pool.get("small", cpu_threads=1)
+        pool.get("small", cpu_threads=3)
+
+        self.assertEqual(pool.evictions, 1)
+        self.assertEqual(pool.stats["models"], ["small", "small"])
+        self.assertLessEqual(pool.resident_mb, budget)
+
+        pool.get("small", cpu_threads=1)
+        self.assertEqual(pool.loads, 3)
+
+    def test_oversized_model_still_loaded(self):
+        pool = WhisperModelPool(memory_budget_mb=1, loader=self.loader)
+
+        pool.get("large-v3")
+        pool.get("small")
+
+        self.assertEqual(pool.loads, 2)
+        self.assertEqual(pool.evictions, 1)
+        self.assertEqual(pool.stats["models"], ["small"])
+
+    def test_estimate_model_memory_mb(self):
+        self.assertEqual(estimate_model_memory_mb("large-v3", "float32"), 6200)
+        self.assertEqual(estimate_model_memory_mb("large-v3", "int8"), 1550)
+        self.assertEqual(estimate_model_memory_mb("/models/custom", "int8"), 2048)
+
+
+if __name__ == "__main__":
+    unittest.main()
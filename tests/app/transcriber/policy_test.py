@@ -0,0 +1,64 @@
+import unittest
+
+from app.transcriber.policy import TierPolicy
+
+
+class TestTierPolicy(unittest.TestCase):
+    def test_default_tier_without_pressure(self):
+        decision = TierPolicy().select(duration=600, queue_depth=0)
+
+        self.assertEqual(decision.tier.name, "high")
+        self.assertEqual(decision.tier.model_name, "large-v3")
+        self.assertEqual(decision.tier.beam_size, 5)
+        self.assertEqual(decision.reasons, [])
+
+    def test_locale_sets_starting_tier(self):
+        policy = TierPolicy(locale_tiers={"en": "medium"})
+
+        self.assertEqual(policy.select(locale="en").tier.name, "medium")
+        self.assertEqual(policy.select(locale="pl").tier.name, "high")
+
+    def test_long_clip_downgraded_once(self):
+        policy = TierPolicy(long_clip_seconds=1800)
+
+        self.assertEqual(policy.select(duration=1200).tier.name, "high")
+        decision = policy.select(duration=3600)
+        self.assertEqual(decision.tier.name, "medium")
+        self.assertEqual(decision.reasons, ["long clip 3600s"])
+
+    def test_backlog_downgrades_per_threshold(self):
+        policy = TierPolicy(backlog_thresholds=(30, 10))
+
+        self.assertEqual(policy.select(queue_depth=9).tier.name, "high")
+        self.assertEqual(policy.select(queue_depth=10).tier.name, "medium")
+        self.assertEqual(policy.select(queue_depth=100).tier.name, "low")
+
+    def test_downgrades_stop_at_fastest_tier(self):
+        policy = TierPolicy(
+            default_tier="medium", long_clip_seconds=60, backlog_thresholds=(1, 2)
+        )
+
+        decision = policy.select(duration=120, queue_depth=5)
+
+        self.assertEqual(decision.tier.name, "low")
+        self.assertEqual(decision.reasons, ["long clip 120s", "backlog 5"])
+
+    def test_deadline_picks_first_tier_that_fits(self):
+        policy = TierPolicy()
+
+        self.assertEqual(policy.select(duration=600, time_left=900).tier.name, "high")
+        decision = policy.select(duration=600, time_left=400)
+        self.assertEqual(decision.tier.name, "medium")
+        self.assertEqual(decision.reasons, ["deadline"])
+        self.assertEqual(policy.select(duration=600, time_left=10).tier.name, "low")
+
+    def test_deadline_ignored_without_duration(self):
+        self.assertEqual(TierPolicy().select(time_left=1).tier.name, "high")
+
+    def test_unknown_tier(self):
+        with self.assertRaises(ValueError):
+            TierPolicy(locale_tiers={"en": "ultra"})
+
+
+if __name__ == "__main__":
+    unittest.main()
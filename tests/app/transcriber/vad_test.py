@@ -0,0 +1,140 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from app.ffmpeg_utils import SAMPLE_RATE
+from app.transcriber.segments import Segment, Word
+from app.transcriber.vad import SpeechMap, VoiceActivityDetector, frame_energy_db
+
+
+def tone(seconds: float) -> np.ndarray:
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (0.3 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+
+def silence(seconds: float) -> np.ndarray:
+    return np.zeros(int(seconds * SAMPLE_RATE), dtype=np.float32)
+
+
+class TestFrameEnergy(unittest.TestCase):
+    def test_levels_in_dbfs(self):
+        samples = np.concatenate([np.full(160, 0.1, np.float32), silence(0.01)])
+
+        levels = frame_energy_db(samples, 160)
+
+        self.assertAlmostEqual(levels[0], -20.0, places=3)
+        self.assertLess(levels[1], -150)
+
+
+class TestVoiceActivityDetector(unittest.TestCase):
+    def setUp(self):
+        self.audio = np.concatenate(
+            [silence(5), tone(2), silence(5), tone(1), silence(3)]
+        )
+        self.detector = VoiceActivityDetector(pad_ms=300, use_silero=False)
+
+    def test_energy_gate_keeps_loud_stretches_with_padding(self):
+        speech_map, speech = self.detector.detect(self.audio)
+
+        self.assertEqual(len(speech_map.regions), 2)
+        first, second = speech_map.regions
+        self.assertLessEqual(first[0], 5 * SAMPLE_RATE)
+        self.assertGreaterEqual(first[0], 4.6 * SAMPLE_RATE)
+        self.assertGreaterEqual(first[1], 7 * SAMPLE_RATE)
+        self.assertLessEqual(second[1], 13.4 * SAMPLE_RATE)
+        self.assertEqual(len(speech), speech_map.speech_samples)
+        self.assertEqual(speech_map.total_samples, len(self.audio))
+        np.testing.assert_array_equal(speech, speech_map.compact(self.audio))
+
+    def test_streamed_blocks_match_whole_audio(self):
+        whole_map, whole = self.detector.detect(self.audio)
+
+        streamed_map, streamed = self.detector.detect_stream(
+            np.array_split(self.audio, 13)
+        )
+
+        self.assertEqual(streamed_map.regions, whole_map.regions)
+        np.testing.assert_array_equal(streamed, whole)
+
+    def test_silence_only(self):
+        speech_map, speech = self.detector.detect(silence(3))
+
+        self.assertEqual(speech_map.regions, [])
+        self.assertEqual(len(speech), 0)
+
+    def test_silero_confirms_loud_stretches(self):
+        detector = VoiceActivityDetector(pad_ms=300)
+        with patch(
+            "app.transcriber.vad.get_speech_timestamps",
+            return_value=[{"start": 100, "end": 1100}],
+        ) as silero:
+            speech_map, speech = detector.detect(self.audio)
+
+        self.assertEqual(silero.call_count, 2)
+        start = speech_map.regions[0][0]
+        self.assertEqual(speech_map.regions[0][1] - start, 1000)
+        self.assertEqual(len(speech), 2000)
+
+    def test_long_loud_stretch_confirmed_in_bounded_pieces(self):
+        audio = np.concatenate([silence(1), tone(100), silence(2)])
+        detector = VoiceActivityDetector(pad_ms=300, max_stretch_ms=10000)
+        with patch(
+            "app.transcriber.vad.get_speech_timestamps",
+            side_effect=lambda samples, **options: [{"start": 0, "end": len(samples)}],
+        ) as silero:
+            speech_map, speech = detector.detect_stream(np.array_split(audio, 50))
+
+        pieces = [len(c.args[0]) for c in silero.call_args_list]
+        self.assertGreaterEqual(len(pieces), 10)
+        self.assertLessEqual(max(pieces), 10 * SAMPLE_RATE)
+        self.assertEqual(len(speech_map.regions), 1)
+        start, end = speech_map.regions[0]
+        self.assertLessEqual(start, SAMPLE_RATE)
+        self.assertGreaterEqual(end, 101 * SAMPLE_RATE)
+        np.testing.assert_array_equal(speech, speech_map.compact(audio))
+
+
+class TestSpeechMap(unittest.TestCase):
+    def setUp(self):
+        self.map = SpeechMap([(16000, 32000), (80000, 96000)], total_samples=160000)
+
+    def test_time_conversion(self):
+        self.assertEqual(self.map.source_time(0.5), 1.5)
+        self.assertEqual(self.map.source_time(1.0), 5.0)
+        self.assertEqual(self.map.source_time(1.0, is_end=True), 2.0)
+        self.assertEqual(self.map.source_time(1.5), 5.5)
+        self.assertEqual(self.map.compact_time(5.5), 1.5)
+        self.assertEqual(self.map.compact_time(3.0), 1.0)
+        self.assertEqual(self.map.compact_time(0.5), 0.0)
+
+    def test_restore_segment(self):
+        segment = Segment(0.5, 1.5, " Hi there", [Word(0.5, 1.0, " Hi", 0.9)])
+
+        restored = self.map.restore(segment)
+
+        self.assertEqual((restored.start, restored.end), (1.5, 5.5))
+        self.assertEqual((restored.words[0].start, restored.words[0].end), (1.5, 2.0))
+
+    def test_compacted_regions_for_chunking(self):
+        self.assertEqual(
+            self.map.compacted_regions(),
+            [{"start": 0, "end": 16000}, {"start": 16000, "end": 32000}],
+        )
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "speech.json")
+            self.map.save(path)
+
+            loaded = SpeechMap.load(path)
+
+        self.assertEqual(loaded.regions, self.map.regions)
+        self.assertEqual(loaded.total_samples, 160000)
+        self.assertEqual(loaded.source_time(1.5), 5.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
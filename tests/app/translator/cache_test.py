@@ -0,0 +1,59 @@
+import itertools
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from app.translator.cache import PhraseCache
+
+
+class TestPhraseCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "phrases.sqlite3")
+        self.cache = PhraseCache(self.path)
+
+    def tearDown(self):
+        self.cache.close()
+        self.directory.cleanup()
+
+    def test_stores_translations_per_language_pair(self):
+        self.cache.put_many({"Cześć": "Hello", "Dzięki": "Thanks"}, "pl", "en")
+
+        self.assertEqual(
+            self.cache.get_many(["Cześć", "Pa"], "pl", "en"), {"Cześć": "Hello"}
+        )
+        self.assertEqual(self.cache.get_many(["Cześć"], "pl", "de"), {})
+        self.assertEqual(self.cache.stats, {"hits": 1, "misses": 2})
+
+    def test_persists_between_instances(self):
+        self.cache.put_many({"Cześć": "Hello"}, "pl", "en")
+        self.cache.close()
+
+        reopened = PhraseCache(self.path)
+        self.addCleanup(reopened.close)
+        self.assertEqual(reopened.get_many(["Cześć"], "pl", "en"), {"Cześć": "Hello"})
+
+    def test_evicts_least_recently_used_phrases(self):
+        cache = PhraseCache(":memory:", max_entries=2)
+        self.addCleanup(cache.close)
+
+        with patch("app.translator.cache.time.time", side_effect=itertools.count()):
+            cache.put_many({"a": "A"}, "pl", "en")
+            cache.put_many({"b": "B"}, "pl", "en")
+            cache.get_many(["a"], "pl", "en")
+            cache.put_many({"c": "C"}, "pl", "en")
+
+        self.assertEqual(
+            cache.get_many(["a", "b", "c"], "pl", "en"), {"a": "A", "c": "C"}
+        )
+
+    def test_looks_up_more_phrases_than_a_query_holds(self):
+        phrases = {f"phrase {i}": f"fraza {i}" for i in range(1200)}
+        self.cache.put_many(phrases, "en", "pl")
+
+        self.assertEqual(self.cache.get_many(phrases, "en", "pl"), phrases)
+
+
+if __name__ == "__main__":
+    unittest.main()
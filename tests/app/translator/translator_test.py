@@ -0,0 +1,68 @@
+import unittest
+
+from app.translator.backends import FakeTranslationBackend, get_backend
+from app.translator.cache import PhraseCache
+from app.translator.translator import Translator, pack_batches
+
+
+class TestPackBatches(unittest.TestCase):
+    def test_bounds_batches_by_characters(self):
+        batches = list(pack_batches(["aaaa", "bbbb", "cccc", "dd"], max_chars=9))
+
+        self.assertEqual(batches, [["aaaa", "bbbb"], ["cccc", "dd"]])
+
+    def test_bounds_batches_by_texts(self):
+        batches = list(pack_batches(["a", "b", "c"], max_chars=100, max_texts=2))
+
+        self.assertEqual(batches, [["a", "b"], ["c"]])
+
+    def test_oversized_text_forms_its_own_batch(self):
+        batches = list(pack_batches(["a", "x" * 20, "b"], max_chars=5))
+
+        self.assertEqual(batches, [["a"], ["x" * 20], ["b"]])
+
+
+class TestTranslator(unittest.TestCase):
+    def setUp(self):
+        self.backend = FakeTranslationBackend()
+        self.cache = PhraseCache(":memory:")
+        self.addCleanup(self.cache.close)
+
+    def test_translates_repeated_texts_once(self):
+        translator = Translator(self.backend, max_batch_chars=12, workers=3)
+
+        texts = ["Cześć", "Subskrybuj", "", "Cześć", "Pa"]
+        translated = translator.translate(texts, "pl", "en")
+
+        self.assertEqual(
+            translated,
+            ["[en] Cześć", "[en] Subskrybuj", "", "[en] Cześć", "[en] Pa"],
+        )
+        self.assertEqual(
+            sorted(text for batch in self.backend.batches for text in batch),
+            ["Cześć", "Pa", "Subskrybuj"],
+        )
+        self.assertGreater(len(self.backend.batches), 1)
+
+    def test_cached_phrases_are_not_sent_again(self):
+        translator = Translator(self.backend, cache=self.cache)
+
+        translator.translate(["Cześć", "Subskrybuj"], "pl", "en")
+        translated = translator.translate(["Subskrybuj", "Nowe"], "pl", "en")
+
+        self.assertEqual(translated, ["[en] Subskrybuj", "[en] Nowe"])
+        self.assertEqual(self.backend.batches, [["Cześć", "Subskrybuj"], ["Nowe"]])
+
+    def test_same_language_is_not_translated(self):
+        translator = Translator(self.backend)
+
+        self.assertEqual(translator.translate(["Hi"], "en", "en"), ["Hi"])
+        self.assertEqual(self.backend.batches, [])
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            get_backend("babelfish")
+
+
+if __name__ == "__main__":
+    unittest.main()
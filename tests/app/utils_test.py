@@ -1,16 +1,20 @@
 import os
 import tempfile
+import threading
 import unittest
 
 from app.utils import (
     DirectoryManager,
+    JobWorkspace,
     clean_file_name,
     create_directory,
     create_directory_for_file,
     delete_file,
     format_time,
     get_file_name_without_extension,
+    is_audio_file,
     is_video_file,
+    sweep_workspaces,
 )
 
 
@@ -107,6 +111,11 @@ class UtilsTests(unittest.TestCase):
         self.assertFalse(is_video_file("audio.mp3"))
         self.assertFalse(is_video_file("text.txt"))
 
+    def test_is_audio_file(self):
+        self.assertTrue(is_audio_file("audio.m4a"))
+        self.assertTrue(is_audio_file("audio.MP3"))
+        self.assertFalse(is_audio_file("video.mp4"))
+
 
 class TestDirectoryManager(unittest.TestCase):
     def setUp(self):
@@ -145,5 +154,97 @@ class TestDirectoryManager(unittest.TestCase):
             self.assertEqual(sorted(file_paths), sorted(self.files))
 
 
+class TestJobWorkspace(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.root.cleanup()
+
+    def test_workspaces_are_private_and_removed(self):
+        with JobWorkspace(self.root.name) as first:
+            with JobWorkspace(self.root.name) as second:
+                self.assertNotEqual(first, second)
+                self.assertEqual(os.path.dirname(first), self.root.name)
+
+                with open(os.path.join(first, "video.mp4"), "w") as f:
+                    f.write("Test content")
+
+        self.assertEqual(os.listdir(self.root.name), [])
+
+    def test_workspace_removed_on_error(self):
+        with self.assertRaises(RuntimeError):
+            with JobWorkspace(self.root.name) as workspace:
+                raise RuntimeError("job failed")
+
+        self.assertFalse(os.path.exists(workspace))
+
+    def test_named_workspace_kept_on_error(self):
+        with self.assertRaises(RuntimeError):
+            with JobWorkspace(self.root.name, name="abc", keep_on_error=True) as path:
+                with open(os.path.join(path, "manifest.json"), "w") as f:
+                    f.write("{}")
+                raise RuntimeError("job failed")
+
+        with JobWorkspace(self.root.name, name="abc", keep_on_error=True) as retry:
+            self.assertEqual(retry, path)
+            self.assertTrue(os.path.exists(os.path.join(retry, "manifest.json")))
+
+        self.assertFalse(os.path.exists(path))
+
+    def test_duplicate_named_workspace_waits_for_the_running_one(self):
+        entered = threading.Event()
+        release = threading.Event()
+        seen = []
+
+        def run_first():
+            with JobWorkspace(self.root.name, name="abc") as path:
+                with open(os.path.join(path, "video.mp4"), "w") as f:
+                    f.write("first")
+                entered.set()
+                release.wait(5)
+                seen.append(os.listdir(path))
+
+        def run_second():
+            entered.wait(5)
+            with JobWorkspace(self.root.name, name="abc") as path:
+                seen.append(os.listdir(path))
+
+        first = threading.Thread(target=run_first)
+        second = threading.Thread(target=run_second)
+        first.start()
+        second.start()
+        entered.wait(5)
+        second.join(0.2)
+        self.assertTrue(second.is_alive(), "the duplicate must wait for the lock")
+
+        release.set()
+        first.join(5)
+        second.join(5)
+
+        self.assertEqual(seen, [["video.mp4"], []])
+        self.assertEqual(os.listdir(self.root.name), [])
+
+    def test_sweep_removes_only_stale_idle_workspaces(self):
+        with self.assertRaises(RuntimeError):
+            with JobWorkspace(self.root.name, name="old", keep_on_error=True) as old:
+                raise RuntimeError("rejected for good")
+        os.utime(old, (0, 0))
+
+        with JobWorkspace(self.root.name, name="busy") as busy:
+            os.utime(busy, (0, 0))
+            removed = sweep_workspaces(self.root.name, max_age=3600)
+            self.assertTrue(os.path.isdir(busy))
+
+        self.assertEqual(removed, 1)
+        self.assertEqual(os.listdir(self.root.name), [])
+
+    def test_missing_root_is_created(self):
+        root = os.path.join(self.root.name, "scratch")
+
+        with JobWorkspace(root) as workspace:
+            self.assertTrue(os.path.isdir(workspace))
+
+
 if __name__ == "__main__":
     unittest.main()